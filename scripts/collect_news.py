@@ -14,10 +14,10 @@ from pathlib import Path
 # プロジェクトルートをパスに追加
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.cli.base import build_llm, report_llm
 from src.config import Settings
 from src.domain.news import NewsItem, ReporterConfig
 from src.infrastructure.external import ArticleFetcher, ArticleSummarizer, RSSClient, TrendScraper
-from src.infrastructure.llm import OllamaProvider
 from src.infrastructure.storage.bulletin_repo import BulletinRepository
 
 # 記者設定
@@ -206,7 +206,7 @@ async def main():
 
     # LLM初期化
     print(f"  Initializing LLM ({settings.ollama_model})...")
-    llm = OllamaProvider(settings.ollama_host, settings.ollama_model)
+    llm = build_llm(settings)
     summarizer = ArticleSummarizer(llm)
 
     # 期限切れニュースを削除
@@ -239,6 +239,7 @@ async def main():
         total_added += 1
 
     print(f"\n✅ Added {total_added} news items")
+    report_llm(llm)
 
     # 最新ニュースを表示
     recent = bulletin_repo.get_recent_news(5)
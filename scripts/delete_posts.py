@@ -14,87 +14,113 @@
 
   # 全NPCの全投稿を削除（危険）
   python scripts/delete_posts.py delete-all --confirm
+
+投稿済みエントリーは設定どおりのキュー（json / sqlite / journal）から読み、
+アーカイブに移った古い投稿も対象にする。削除できたものだけをキューから消す。
+
+一括削除は、削除イベントをスレッドプールでまとめて署名し、署名できたものから並列に送る。
 """
 
 import argparse
 import asyncio
-import json
+import os
+import sys
+from functools import partial
 from pathlib import Path
-from typing import Any
 
 from dotenv import load_dotenv
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def load_posted_entries() -> list[dict[str, Any]]:
-    """posted.jsonから投稿済みエントリーを読み込む"""
-    posted_file = Path("npcs/data/queue/posted.json")
-    if not posted_file.exists():
-        return []
+from src.application import ServiceFactory
+from src.config import Settings
+from src.domain import QueueEntry
+from src.infrastructure import QueueRepository
 
-    with open(posted_file) as f:
-        data: list[dict[str, Any]] = json.load(f)
-        return data
+# 一括削除で同時に送る上限
+MAX_CONCURRENT_DELETES = 8
 
 
-def save_posted_entries(entries: list[dict[str, Any]]) -> None:
-    """posted.jsonを保存"""
-    posted_file = Path("npcs/data/queue/posted.json")
-    with open(posted_file, "w") as f:
-        json.dump(entries, f, ensure_ascii=False, indent=2, default=str)
+def open_factory() -> ServiceFactory:
+    """設定どおりのキューを使うファクトリーを作成"""
+    return ServiceFactory(Settings())
 
 
-async def delete_event(event_id: str, npc_id: int) -> bool:
-    """Nostrイベントを削除（kind:5）"""
-    import httpx
-    from nostr_sdk import EventBuilder, Keys, Kind, Tag
+def load_posted_entries(queue_repo: QueueRepository) -> list[QueueEntry]:
+    """アーカイブ済みも含めた投稿済みエントリーを古い順に読み込む"""
+    return queue_repo.get_all_posted()
 
-    from src.domain import NpcKey
 
-    load_dotenv()
-    load_dotenv(".env.keys")
-
-    try:
-        npc_key = NpcKey.from_env(npc_id)
-        keys = Keys.parse(npc_key.nsec)
-    except ValueError as e:
-        print(f"  ❌ 鍵取得エラー: {e}")
-        return False
+def remove_posted_entries(factory: ServiceFactory, entries: list[QueueEntry]) -> None:
+    """削除できた投稿済みエントリーをキュー（アーカイブを含む）から消す"""
+    if not entries:
+        return
+    factory.queue_repo.remove_posted({entry.id for entry in entries})
+    factory.commit()
 
-    # kind:5 削除イベントを作成
-    tags = [Tag.parse(["e", event_id])]
-    event = EventBuilder(Kind(5), "").tags(tags).sign_with_keys(keys)
 
-    # MYPACE APIに送信
-    import os
+async def delete_events(targets: list[tuple[str, int]]) -> set[str]:
+    """
+    Nostrイベントをまとめて削除（kind:5）
 
-    api_endpoint = os.getenv("API_ENDPOINT", "https://api.mypace.llll-ll.com")
+    Args:
+        targets: (削除するイベントID, 投稿したNPC ID) の並び
 
-    event_json = json.loads(event.as_json())
+    Returns:
+        削除できたイベントID
+    """
+    from src.infrastructure import KeyRegistry, NostrPublisher
 
-    try:
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-            response = await client.post(
-                f"{api_endpoint}/api/publish",
-                json={"event": event_json},
-                headers={"Content-Type": "application/json"},
-            )
+    load_dotenv()
+    load_dotenv(".env.keys")
 
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("success"):
-                    return True
+    api_endpoint = os.getenv("API_ENDPOINT", "https://api.mypace.llll-ll.com")
+    registry = KeyRegistry()
+    deleted: set[str] = set()
+
+    async with NostrPublisher(api_endpoint, max_connections=MAX_CONCURRENT_DELETES) as publisher:
+        builds = []
+        for event_id, npc_id in targets:
+            try:
+                keys = registry.keys_for(npc_id)
+            except ValueError as e:
+                print(f"  ❌ {event_id[:16]}... 鍵取得エラー: {e}")
+                continue
+            builds.append((event_id, partial(publisher.build_deletion, keys, event_id)))
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DELETES)
+
+        async def send(event_id: str, event_json: str) -> None:
+            async with semaphore:
+                try:
+                    await publisher.send_event_json(event_json)
+                except Exception as e:
+                    print(f"  ❌ {event_id[:16]}... 送信エラー: {e}")
+                    return
+            deleted.add(event_id)
+            print(f"  ✅ {event_id[:16]}...")
+
+        # 署名できたものから送り始める
+        sends = []
+        async for signed in publisher.sign_many(builds):
+            if signed.event is None:
+                print(f"  ❌ {signed.tag[:16]}... 署名エラー: {signed.error}")
+                continue
+            sends.append(asyncio.create_task(send(signed.tag, signed.event.as_json())))
+        await asyncio.gather(*sends)
+
+    return deleted
 
-            print(f"  ⚠️  API応答: {response.status_code}")
-            return False
 
-    except Exception as e:
-        print(f"  ❌ 送信エラー: {e}")
-        return False
+async def delete_event(event_id: str, npc_id: int) -> bool:
+    """Nostrイベントを削除（kind:5）"""
+    return event_id in await delete_events([(event_id, npc_id)])
 
 
 def cmd_list(args: argparse.Namespace) -> None:
     """投稿済みエントリーを一覧表示"""
-    entries = load_posted_entries()
+    entries = load_posted_entries(open_factory().queue_repo)
 
     if not entries:
         print("投稿済みエントリーはありません")
@@ -103,17 +129,17 @@ def cmd_list(args: argparse.Namespace) -> None:
     # フィルタ
     if args.bot:
         npc_id = int(args.bot.replace("bot", ""))
-        entries = [e for e in entries if e.get("npc_id") == npc_id]
+        entries = [e for e in entries if e.npc_id == npc_id]
 
     # 最新N件
     entries = entries[-args.limit :]
 
     print(f"\n📋 投稿済み ({len(entries)}件):\n")
     for entry in entries:
-        event_id = entry.get("event_id", "???")[:16]
-        npc_name = entry.get("npc_name", "???")
-        content = entry.get("content", "")[:40]
-        posted_at = entry.get("posted_at", "???")[:16]
+        event_id = (entry.event_id or "???")[:16]
+        npc_name = entry.npc_name
+        content = entry.content[:40]
+        posted_at = entry.posted_at.strftime("%Y-%m-%d %H:%M") if entry.posted_at else "???"
 
         print(f"[{event_id}...] {npc_name} ({posted_at})")
         print(f"    {content}...")
@@ -122,23 +148,24 @@ def cmd_list(args: argparse.Namespace) -> None:
 
 def cmd_delete(args: argparse.Namespace) -> None:
     """特定の投稿を削除"""
-    entries = load_posted_entries()
+    factory = open_factory()
+    entries = load_posted_entries(factory.queue_repo)
 
     # event_idで検索
     target = None
     for entry in entries:
-        if entry.get("event_id", "").startswith(args.event_id):
+        if entry.event_id and entry.event_id.startswith(args.event_id):
             target = entry
             break
 
-    if not target:
+    if not target or not target.event_id:
         print(f"❌ イベントが見つかりません: {args.event_id}")
         return
 
     print("削除対象:")
-    print(f"  NPC: {target.get('npc_name')}")
-    print(f"  内容: {target.get('content', '')[:60]}...")
-    print(f"  event_id: {target.get('event_id')}")
+    print(f"  NPC: {target.npc_name}")
+    print(f"  内容: {target.content[:60]}...")
+    print(f"  event_id: {target.event_id}")
     print()
 
     if not args.yes:
@@ -148,12 +175,10 @@ def cmd_delete(args: argparse.Namespace) -> None:
             return
 
     # 削除実行
-    success = asyncio.run(delete_event(target["event_id"], target["npc_id"]))
+    success = asyncio.run(delete_event(target.event_id, target.npc_id))
 
     if success:
-        # posted.jsonから削除
-        entries = [e for e in entries if e.get("event_id") != target["event_id"]]
-        save_posted_entries(entries)
+        remove_posted_entries(factory, [target])
         print("✅ 削除しました")
     else:
         print("❌ 削除に失敗しました")
@@ -161,11 +186,12 @@ def cmd_delete(args: argparse.Namespace) -> None:
 
 def cmd_delete_all(args: argparse.Namespace) -> None:
     """複数の投稿を一括削除"""
-    entries = load_posted_entries()
+    factory = open_factory()
+    entries = load_posted_entries(factory.queue_repo)
 
     if args.bot:
         npc_id = int(args.bot.replace("bot", ""))
-        targets = [e for e in entries if e.get("npc_id") == npc_id]
+        targets = [e for e in entries if e.npc_id == npc_id]
         print(f"削除対象: {args.bot} の {len(targets)}件")
     else:
         targets = entries
@@ -180,30 +206,14 @@ def cmd_delete_all(args: argparse.Namespace) -> None:
         print("例: python scripts/delete_posts.py delete-all --bot bot001 --confirm")
         return
 
-    # 削除実行
-    deleted = 0
-    for target in targets:
-        event_id = target.get("event_id")
-        if not event_id:
-            continue
-
-        print(f"  削除中: {event_id[:16]}... ", end="")
-        success = asyncio.run(delete_event(event_id, target["npc_id"]))
-
-        if success:
-            deleted += 1
-            print("✅")
-        else:
-            print("❌")
-
-    # posted.jsonを更新
-    if args.bot:
-        remaining = [e for e in entries if e.get("npc_id") != npc_id]
-    else:
-        remaining = []
+    # 削除実行（まとめて署名して並列に送る）
+    deleted_ids = asyncio.run(
+        delete_events([(t.event_id, t.npc_id) for t in targets if t.event_id])
+    )
 
-    save_posted_entries(remaining)
-    print(f"\n✅ {deleted}/{len(targets)}件 削除完了")
+    # 削除できたものだけキューから消す（失敗したものは再実行で消せるように残す）
+    remove_posted_entries(factory, [t for t in targets if t.event_id in deleted_ids])
+    print(f"\n✅ {len(deleted_ids)}/{len(targets)}件 削除完了")
 
 
 def main() -> None:
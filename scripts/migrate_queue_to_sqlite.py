@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+キューのSQLite移行スクリプト
+
+旧構造:
+  npcs/data/queue/pending.json
+  npcs/data/queue/approved.json
+  npcs/data/queue/posted.json
+  ...
+
+新構造:
+  npcs/data/queue/queue.db
+
+移行後は .env に QUEUE_BACKEND=sqlite を設定する。
+JSONファイルは削除しないので、問題があれば設定を戻すだけで元に戻せる。
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import Settings
+from src.infrastructure.storage import SqliteQueueRepository
+
+
+def migrate() -> None:
+    settings = Settings()
+    repo = SqliteQueueRepository(settings.queue_dir)
+
+    print(f"Migrating {settings.queue_dir}/*.json -> {repo.db_path}")
+    imported = repo.import_from_json()
+    for status, count in imported.items():
+        print(f"  {status}: {count}")
+
+    repo.close()
+    print("\nMigration complete!")
+    print("Set QUEUE_BACKEND=sqlite in .env to use the new queue.")
+
+
+if __name__ == "__main__":
+    migrate()
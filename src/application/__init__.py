@@ -5,6 +5,7 @@ from .external_reaction_service import ExternalReactionService
 from .factory import ServiceFactory
 from .interaction_service import InteractionService
 from .npc_service import NpcService
+from .publish_service import PublishResult, PublishService
 from .stalker_service import StalkerService
 
 __all__ = [
@@ -13,5 +14,7 @@ __all__ = [
     "ExternalReactionService",
     "InteractionService",
     "StalkerService",
+    "PublishService",
+    "PublishResult",
     "ServiceFactory",
 ]
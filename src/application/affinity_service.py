@@ -111,44 +111,19 @@ class AffinityService:
         Returns:
             減衰が発生した関係の数
         """
-        decayed_count = 0
-        now = datetime.now()
-        one_week_ago = now - timedelta(weeks=1)
+        one_week_ago = datetime.now() - timedelta(weeks=1)
 
+        # 関係のある住人ごとに、1週間以上相互作用がない関係を減衰
+        related: dict[str, list[str]] = {}
         for npc_id in target_npc_ids:
             if npc_id not in npcs:
                 continue
-
             npc_name = format_npc_name(npc_id)
-            affinity = self.relationship_repo.load_affinity(npc_name)
-            updated = False
-
-            # 関係のある住人を取得
-            related_members = self.relationship_data.get_related_members(npc_name)
+            related[npc_name] = self.relationship_data.get_related_members(npc_name)
 
-            for target_name in related_members:
-                # 最後の相互作用日時を確認
-                last_interaction = affinity.get_last_interaction(target_name)
-
-                if last_interaction:
-                    try:
-                        last_dt = datetime.fromisoformat(last_interaction)
-                        if last_dt < one_week_ago:
-                            # 1週間以上相互作用がない → 減衰
-                            old_value = affinity.get_affinity(target_name)
-                            new_value = affinity.update_affinity(
-                                target_name, self.affinity_settings.decay_weekly
-                            )
-                            if new_value != old_value:
-                                decayed_count += 1
-                                updated = True
-                    except ValueError:
-                        pass
-
-            if updated:
-                self.relationship_repo.save_affinity(affinity)
-
-        return decayed_count
+        return self.relationship_repo.decay_stale_affinities(
+            related, one_week_ago, self.affinity_settings.decay_weekly
+        )
 
     def process_ignored_posts(self, target_npc_ids: list[int]) -> int:
         """
@@ -163,8 +138,6 @@ class AffinityService:
         Returns:
             減衰が発生した数
         """
-        decayed_count = 0
-
         # 投稿済みエントリーを取得（通常投稿のみ）
         posted_entries = self.queue_repo.get_all(QueueStatus.POSTED)
         normal_posts = [
@@ -173,46 +146,25 @@ class AffinityService:
             if e.post_type == PostType.NORMAL and e.npc_id in target_npc_ids
         ]
 
+        # 反応がなかった投稿ごとに (投稿者, 関係者) の組を集める
+        pairs: list[tuple[str, str]] = []
         for entry in normal_posts:
             if not entry.event_id:
                 continue
 
-            npc_name = format_npc_name(entry.npc_id)
-
             # この投稿へのリプライ/リアクションがあるかチェック
-            has_reaction = self._has_any_reaction(entry.event_id)
-
-            if has_reaction:
+            if self._has_any_reaction(entry.event_id):
                 continue
 
-            # 反応がない場合、関係者への好感度を微減
+            npc_name = format_npc_name(entry.npc_id)
             related_members = self.relationship_data.get_related_members(npc_name)
+            pairs.extend((npc_name, target_name) for target_name in related_members)
 
-            if not related_members:
-                continue
-
-            affinity = self.relationship_repo.load_affinity(npc_name)
-            updated = False
-
-            for target_name in related_members:
-                old_value = affinity.get_affinity(target_name)
-                new_value = affinity.update_affinity(
-                    target_name, self.affinity_settings.delta_ignored
-                )
-                if new_value != old_value:
-                    decayed_count += 1
-                    updated = True
-
-            if updated:
-                self.relationship_repo.save_affinity(affinity)
-
-        return decayed_count
+        # 反応がない場合、関係者への好感度を微減
+        return self.relationship_repo.penalize_affinities(
+            pairs, self.affinity_settings.delta_ignored
+        )
 
     def _has_any_reaction(self, event_id: str) -> bool:
         """指定イベントへの反応（リプライ/リアクション）があるかチェック"""
-        for status in [QueueStatus.PENDING, QueueStatus.APPROVED, QueueStatus.POSTED]:
-            entries = self.queue_repo.get_all(status)
-            for entry in entries:
-                if entry.reply_to and entry.reply_to.event_id == event_id:
-                    return True
-        return False
+        return self.queue_repo.has_any_reaction(event_id)
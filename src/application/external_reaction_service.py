@@ -23,7 +23,14 @@ from ..domain import (
     ReplyTarget,
     TextProcessor,
 )
-from ..infrastructure import LLMProvider, LogRepository, QueueRepository
+from ..infrastructure import (
+    KeyRegistry,
+    LLMProvider,
+    LLMPurpose,
+    LogRepository,
+    QueueRepository,
+    llm_npc,
+)
 
 
 class ExternalReactionService:
@@ -36,12 +43,18 @@ class ExternalReactionService:
         content_strategy: ContentStrategy,
         npcs: dict[int, tuple[NpcKey, NpcProfile, NpcState]],
         log_repo: LogRepository | None = None,
+        key_registry: KeyRegistry | None = None,
     ):
         self.llm_provider = llm_provider
         self.queue_repo = queue_repo
         self.content_strategy = content_strategy
         self.npcs = npcs
         self.log_repo = log_repo
+        if key_registry is None:
+            key_registry = KeyRegistry()
+            for npc_key, _, _ in npcs.values():
+                key_registry.register(npc_key)
+        self.key_registry = key_registry
         self.api_endpoint = os.getenv("API_ENDPOINT", "https://api.mypace.llll-ll.com")
         # 反応済みイベントIDのキャッシュ（重複防止）
         self._reacted_events: set[str] = set()
@@ -85,8 +98,7 @@ class ExternalReactionService:
             print("  📭 外部投稿なし")
             return []
 
-        resident_pubkeys = {key.pubkey for _, (key, _, _) in self.npcs.items()}
-        filtered = [p for p in posts if p.get("pubkey") not in resident_pubkeys]
+        filtered = [p for p in posts if not self.key_registry.is_resident(p.get("pubkey"))]
 
         if not filtered:
             print("  📭 外部投稿なし（フィルタ後）")
@@ -377,9 +389,10 @@ class ExternalReactionService:
 返信:"""
 
         # LLMで生成
-        content = await self.llm_provider.generate(
-            prompt, max_length=profile.behavior.post_length_max
-        )
+        with llm_npc(profile.id):
+            content = await self.llm_provider.generate(
+                prompt, max_length=profile.behavior.post_length_max, purpose=LLMPurpose.REPLY
+            )
         content = self.content_strategy.clean_content(content)
 
         # 文章スタイル加工
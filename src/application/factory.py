@@ -5,20 +5,30 @@
 """
 
 from ..config import Settings
-from ..domain import ContentStrategy
+from ..domain import ContentStrategy, PromptStats
 from ..infrastructure import (
+    JournaledQueueRepository,
+    KeyRegistry,
     LLMProvider,
+    LLMStatsRepository,
     LogRepository,
     MemoryRepository,
+    NostrPublisher,
+    OutboxRepository,
     ProfileRepository,
+    PromptStatsRepository,
     QueueRepository,
     RelationshipRepository,
+    SnapshotCache,
+    SqliteQueueRepository,
     StateRepository,
     TickStateRepository,
+    UnitOfWork,
 )
 from .external_reaction_service import ExternalReactionService
 from .interaction_service import InteractionService
 from .npc_service import NpcService
+from .publish_service import PublishService
 
 
 class ServiceFactory:
@@ -32,6 +42,14 @@ class ServiceFactory:
         self.settings = settings
         self.llm_provider = llm_provider
 
+        # tick中の state / memory / affinity の読み書きをまとめる（commitで書き出し）
+        self.unit_of_work = UnitOfWork()
+
+        # プロフィール・状態のパース結果キャッシュ（起動高速化）
+        self.snapshot_cache = (
+            SnapshotCache(settings.snapshot_cache_file) if settings.snapshot_cache_enabled else None
+        )
+
         # リポジトリの初期化
         self._profile_repo: ProfileRepository | None = None
         self._state_repo: StateRepository | None = None
@@ -40,6 +58,10 @@ class ServiceFactory:
         self._log_repo: LogRepository | None = None
         self._relationship_repo: RelationshipRepository | None = None
         self._tick_state_repo: TickStateRepository | None = None
+        self._prompt_stats_repo: PromptStatsRepository | None = None
+        self._llm_stats_repo: LLMStatsRepository | None = None
+        self._outbox_repo: OutboxRepository | None = None
+        self._key_registry: KeyRegistry | None = None
 
         # サービスのキャッシュ
         self._npc_service: NpcService | None = None
@@ -52,6 +74,7 @@ class ServiceFactory:
             self._profile_repo = ProfileRepository(
                 self.settings.residents_dir,
                 backend_dir=self.settings.backend_dir,
+                snapshot_cache=self.snapshot_cache,
             )
         return self._profile_repo
 
@@ -59,37 +82,64 @@ class ServiceFactory:
     def state_repo(self) -> StateRepository:
         """StateRepositoryを取得（遅延初期化）"""
         if self._state_repo is None:
-            self._state_repo = StateRepository(self.settings.residents_dir)
+            self._state_repo = StateRepository(
+                self.settings.residents_dir, self.unit_of_work, self.snapshot_cache
+            )
         return self._state_repo
 
     @property
     def memory_repo(self) -> MemoryRepository:
         """MemoryRepositoryを取得（遅延初期化）"""
         if self._memory_repo is None:
-            self._memory_repo = MemoryRepository(self.settings.residents_dir)
+            self._memory_repo = MemoryRepository(self.settings.residents_dir, self.unit_of_work)
         return self._memory_repo
 
     @property
     def queue_repo(self) -> QueueRepository:
         """QueueRepositoryを取得（遅延初期化）"""
         if self._queue_repo is None:
-            self._queue_repo = QueueRepository(self.settings.queue_dir)
+            queue_dir = self.settings.queue_dir
+            compress = self.settings.queue_archive_compress
+            if self.settings.queue_backend == "sqlite":
+                self._queue_repo = SqliteQueueRepository(queue_dir, archive_compress=compress)
+            elif self.settings.queue_backend == "journal":
+                self._queue_repo = JournaledQueueRepository(
+                    queue_dir, self.settings.queue_journal_compact_bytes, archive_compress=compress
+                )
+            else:
+                self._queue_repo = QueueRepository(queue_dir, archive_compress=compress)
         return self._queue_repo
 
     @property
     def log_repo(self) -> LogRepository:
         """LogRepositoryを取得（遅延初期化）"""
         if self._log_repo is None:
-            self._log_repo = LogRepository(str(self.settings.residents_dir))
+            self._log_repo = LogRepository(str(self.settings.residents_dir), buffered=True)
         return self._log_repo
 
     @property
     def relationship_repo(self) -> RelationshipRepository:
         """RelationshipRepositoryを取得（遅延初期化）"""
         if self._relationship_repo is None:
-            self._relationship_repo = RelationshipRepository(self.settings.relationships_dir)
+            if self.settings.affinity_store == "matrix":
+                self._relationship_repo = self._create_matrix_relationship_repo()
+            else:
+                self._relationship_repo = RelationshipRepository(
+                    self.settings.relationships_dir, self.unit_of_work
+                )
         return self._relationship_repo
 
+    def _create_matrix_relationship_repo(self) -> RelationshipRepository:
+        """行列版のRelationshipRepositoryを作成（numpyがなければJSON版）"""
+        try:
+            from ..infrastructure.storage.matrix_relationship_repo import (
+                MatrixRelationshipRepository,
+            )
+        except ImportError:
+            print('⚠️  numpy is not installed (pip install "sinov[matrix]"), using JSON affinity')
+            return RelationshipRepository(self.settings.relationships_dir, self.unit_of_work)
+        return MatrixRelationshipRepository(self.settings.relationships_dir, self.unit_of_work)
+
     @property
     def tick_state_repo(self) -> TickStateRepository:
         """TickStateRepositoryを取得（遅延初期化）"""
@@ -97,33 +147,127 @@ class ServiceFactory:
             self._tick_state_repo = TickStateRepository(self.settings.tick_state_file)
         return self._tick_state_repo
 
+    @property
+    def prompt_stats_repo(self) -> PromptStatsRepository:
+        """PromptStatsRepositoryを取得（遅延初期化）"""
+        if self._prompt_stats_repo is None:
+            self._prompt_stats_repo = PromptStatsRepository(self.settings.prompt_stats_file)
+        return self._prompt_stats_repo
+
+    @property
+    def llm_stats_repo(self) -> LLMStatsRepository:
+        """LLMStatsRepositoryを取得（遅延初期化）"""
+        if self._llm_stats_repo is None:
+            self._llm_stats_repo = LLMStatsRepository(
+                self.settings.llm_stats_file, self.settings.llm_stats_max_ticks
+            )
+        return self._llm_stats_repo
+
+    @property
+    def outbox_repo(self) -> OutboxRepository:
+        """OutboxRepositoryを取得（遅延初期化）"""
+        if self._outbox_repo is None:
+            self._outbox_repo = OutboxRepository(self.settings.outbox_file)
+        return self._outbox_repo
+
+    @property
+    def key_registry(self) -> KeyRegistry:
+        """KeyRegistryを取得（遅延初期化、鍵の変換はNPCごとに1回だけ）"""
+        if self._key_registry is None:
+            self._key_registry = KeyRegistry()
+        return self._key_registry
+
     @property
     def content_strategy(self) -> ContentStrategy:
         """ContentStrategyを取得（遅延初期化）"""
         if self._content_strategy is None:
-            self._content_strategy = ContentStrategy(self.settings.content)
+            self._content_strategy = ContentStrategy(
+                self.settings.content, self.profile_repo.load_common_prompts()
+            )
         return self._content_strategy
 
-    async def create_npc_service(self) -> NpcService:
-        """NpcServiceを作成して初期化"""
-        from ..infrastructure.nostr import NostrPublisher
+    def commit(self) -> int:
+        """
+        tick中に変更された state / memory / affinity とためた活動ログ、
+        キューの逆引きインデックス、プロンプトサイズを書き出す
+
+        Returns:
+            書き出したファイル数
+        """
+        written = self.unit_of_work.commit()
+        if self._log_repo:
+            written += self._log_repo.flush()
+        if self._queue_repo:
+            written += self._queue_repo.flush()
+
+        # プロンプトサイズの集計を足し込む（書き出した分はリセット）
+        for strategy in self._content_strategies():
+            if strategy.prompt_stats.npcs:
+                self.prompt_stats_repo.add(strategy.prompt_stats)
+                strategy.prompt_stats = PromptStats()
+                written += 1
+        return written
+
+    def _content_strategies(self) -> list[ContentStrategy]:
+        """作成済みのContentStrategy"""
+        strategies = [self._content_strategy] if self._content_strategy else []
+        if self._npc_service:
+            strategies.append(self._npc_service.content_strategy)
+        return strategies
 
-        publisher = NostrPublisher(self.settings.api_endpoint)
+    def create_publisher(self, dry_run: bool = False) -> NostrPublisher:
+        """
+        NostrPublisherを作成
 
+        async with で開いている間は接続プールを使い回す。
+        """
+        publish = self.settings.publish
+        return NostrPublisher(
+            self.settings.api_endpoint,
+            dry_run=dry_run,
+            http2=publish.http2,
+            max_connections=publish.max_connections,
+            max_keepalive_connections=publish.max_keepalive_connections,
+            keepalive_expiry=publish.keepalive_expiry,
+            timeout=publish.timeout,
+            sign_workers=publish.sign_workers or None,
+        )
+
+    def create_publish_service(self, publisher: NostrPublisher) -> PublishService:
+        """PublishServiceを作成（publisherは呼び出し側で開いて閉じる）"""
+        publish = self.settings.publish
+        return PublishService(
+            publisher,
+            self.queue_repo,
+            self.key_registry,
+            max_concurrency=publish.max_concurrency,
+            outbox_repo=self.outbox_repo,
+            retry_base_seconds=publish.retry_base_seconds,
+            retry_max_seconds=publish.retry_max_seconds,
+            max_attempts=publish.max_attempts,
+        )
+
+    async def create_npc_service(self) -> NpcService:
+        """NpcServiceを作成して初期化"""
         service = NpcService(
             settings=self.settings,
             llm_provider=self.llm_provider,
-            publisher=publisher,
+            publisher=self.create_publisher(),
             profile_repo=self.profile_repo,
             state_repo=self.state_repo,
             memory_repo=self.memory_repo,
             queue_repo=self.queue_repo,
             log_repo=self.log_repo,
+            key_registry=self.key_registry,
         )
 
         await service.load_bots()
         await service.initialize_keys()
 
+        if self.snapshot_cache:
+            self.snapshot_cache.save()
+            print(f"📦 {self.snapshot_cache.report()}")
+
         self._npc_service = service
         return service
 
@@ -149,4 +293,5 @@ class ServiceFactory:
             content_strategy=npc_service.content_strategy,
             npcs=npc_service.npcs,
             log_repo=self.log_repo,
+            key_registry=self.key_registry,
         )
@@ -12,7 +12,7 @@ from ...domain import (
     ReplyTarget,
     TextProcessor,
 )
-from ...infrastructure import LLMProvider, ProfileRepository
+from ...infrastructure import LLMProvider, LLMPurpose, ProfileRepository, llm_npc
 
 
 class ReplyGenerator:
@@ -63,9 +63,10 @@ class ReplyGenerator:
         )
 
         # LLMで生成
-        content = await self.llm_provider.generate(
-            prompt, max_length=profile.behavior.post_length_max
-        )
+        with llm_npc(profile.id):
+            content = await self.llm_provider.generate(
+                prompt, max_length=profile.behavior.post_length_max, purpose=LLMPurpose.REPLY
+            )
         content = self.content_strategy.clean_content(content)
 
         # 文章スタイル加工
@@ -150,9 +151,10 @@ class ReplyGenerator:
         )
 
         # LLMで生成
-        content = await self.llm_provider.generate(
-            prompt, max_length=profile.behavior.post_length_max
-        )
+        with llm_npc(profile.id):
+            content = await self.llm_provider.generate(
+                prompt, max_length=profile.behavior.post_length_max, purpose=LLMPurpose.REPLY
+            )
         content = self.content_strategy.clean_content(content)
 
         # 文章スタイル加工
@@ -6,6 +6,8 @@
 
 from __future__ import annotations
 
+import asyncio
+
 from ..config import AffinitySettings
 from ..domain import (
     Affinity,
@@ -102,14 +104,32 @@ class InteractionService:
         if not posted_entries:
             return 0
 
+        # NPCごとの処理は並列に行う（1NPCの中では投稿を順番に見る）。
+        # キュー・好感度・記憶の更新はawaitを挟まない同期処理なので、NPC間で混ざらない
+        results = await asyncio.gather(
+            *(self.process_npc_interactions(npc_id, posted_entries) for npc_id in target_npc_ids),
+            return_exceptions=True,
+        )
         generated = 0
-        for npc_id in target_npc_ids:
-            generated += await self._process_npc_interactions(npc_id, posted_entries)
+        for npc_id, result in zip(target_npc_ids, results, strict=True):
+            if isinstance(result, BaseException):
+                print(f"      ⚠️  {format_npc_name(npc_id)}: {result}")
+                continue
+            generated += result
         return generated
 
-    async def _process_npc_interactions(self, npc_id: int, posted_entries: list[QueueEntry]) -> int:
-        """単一NPCの相互作用処理"""
-        if npc_id not in self.npcs:
+    async def process_npc_interactions(self, npc_id: int, posted_entries: list[QueueEntry]) -> int:
+        """
+        単一NPCの相互作用処理（投稿を順番に見る）
+
+        Args:
+            npc_id: 処理する住人のID
+            posted_entries: 反応する候補の投稿済みエントリー
+
+        Returns:
+            生成されたリプライ/リアクション数
+        """
+        if not self.llm_provider or npc_id not in self.npcs:
             return 0
 
         _, profile, _ = self.npcs[npc_id]
@@ -296,17 +316,8 @@ class InteractionService:
         if not event_id:
             return False
 
-        # pending, approved, posted を全てチェック
-        for status in [QueueStatus.PENDING, QueueStatus.APPROVED, QueueStatus.POSTED]:
-            entries = self.queue_repo.get_all(status)
-            for entry in entries:
-                if (
-                    entry.npc_id == npc_id
-                    and entry.reply_to
-                    and entry.reply_to.event_id == event_id
-                ):
-                    return True
-        return False
+        # pending, approved, posted を逆引きインデックスでチェック
+        return self.queue_repo.has_replied(npc_id, event_id)
 
     def _get_relationship_type(self, from_bot: str, to_bot: str) -> str:
         """2人の関係タイプを取得"""
@@ -352,6 +363,8 @@ class InteractionService:
 
         posted_entries = self.queue_repo.get_all(QueueStatus.POSTED)
         reply_entries = [e for e in posted_entries if e.post_type == PostType.REPLY]
+        # 返信する住人ごとにまとめて処理する（同じ住人のプロンプト前半の読み込みを使い回せる）
+        reply_entries.sort(key=lambda e: self._extract_target_bot_id(e) or 0)
 
         generated = 0
         for entry in reply_entries:
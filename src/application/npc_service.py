@@ -2,6 +2,7 @@
 NPCサービス（アプリケーションユースケース）
 """
 
+import asyncio
 import difflib
 import json
 import random
@@ -19,24 +20,41 @@ from ..domain import (
     NpcMemory,
     NpcProfile,
     NpcState,
+    PreReviewer,
+    ReviewJudge,
     Scheduler,
     TextProcessor,
     format_npc_name,
 )
 from ..infrastructure import (
+    KeyRegistry,
     LLMProvider,
+    LLMPurpose,
     LogRepository,
     MemoryRepository,
     NostrPublisher,
     ProfileRepository,
     QueueRepository,
     StateRepository,
+    llm_npc,
 )
 
 
 class NpcService:
     """NPC管理サービス"""
 
+    # バッチレビューの回答に見込む1件あたりの文字数（「3: NG 理由」の1行分）
+    BATCH_REVIEW_LENGTH_PER_ITEM = 60
+
+    # 投稿候補の1件あたりに足す文字数（「[3] 」と改行の分）
+    CANDIDATE_LENGTH_MARGIN = 8
+
+    # 最近の投稿との類似度がこれを超えたら使わない
+    SIMILARITY_THRESHOLD = 0.6
+
+    # 最大長を超えて切り詰めた候補の減点
+    OVERFLOW_PENALTY = 0.1
+
     def __init__(
         self,
         settings: Settings,
@@ -47,6 +65,7 @@ class NpcService:
         memory_repo: MemoryRepository,
         queue_repo: QueueRepository | None = None,
         log_repo: LogRepository | None = None,
+        key_registry: KeyRegistry | None = None,
     ):
         self.settings = settings
         self.llm_provider = llm_provider
@@ -56,7 +75,23 @@ class NpcService:
         self.memory_repo = memory_repo
         self.queue_repo = queue_repo
         self.log_repo = log_repo
-        self.content_strategy = ContentStrategy(settings.content)
+        self.key_registry = key_registry or KeyRegistry()
+        self.content_strategy = ContentStrategy(
+            settings.content, profile_repo.load_common_prompts()
+        )
+
+        # 事前レビュー（NGワードがなくリスクの低い投稿はLLMに回さない）
+        review = settings.review
+        self.pre_reviewer: PreReviewer | None = None
+        if review.pre_review_enabled:
+            self.pre_reviewer = PreReviewer(
+                {
+                    "celebrity": review.ng_celebrities,
+                    "political": review.ng_political,
+                    "religious": review.ng_religious,
+                },
+                risk_threshold=review.risk_threshold,
+            )
 
         # NPCデータ
         self.npcs: dict[int, tuple[NpcKey, NpcProfile, NpcState]] = {}
@@ -74,7 +109,7 @@ class NpcService:
 
             # 環境変数から鍵を読み込み
             try:
-                npc_key = NpcKey.from_env(npc_id)
+                npc_key = self.key_registry.npc_key(npc_id)
             except Exception as e:
                 print(f"⚠️  Keys not found for {format_npc_name(npc_id)}: {e}, skipping...")
                 continue
@@ -90,12 +125,9 @@ class NpcService:
         """Nostr署名鍵を初期化"""
         print("Initializing Nostr keys...")
 
-        for npc_id, (key, _, _) in self.npcs.items():
-            try:
-                keys = Keys.parse(key.nsec)
-                self.keys[npc_id] = keys
-            except Exception as e:
-                print(f"⚠️  Failed to parse key for bot {npc_id}: {e}")
+        # 変換は登録簿で1回だけ（投稿・リプライのたびにやり直さない）
+        self.key_registry.load(self.npcs)
+        self.keys = self.key_registry.keys
 
         print(f"✅ Initialized {len(self.keys)} bot keys")
 
@@ -130,8 +162,12 @@ class NpcService:
         # 共通プロンプト + 個人プロンプトをマージ
         merged_prompts = self.profile_repo.get_merged_prompts(profile)
 
-        # 最大リトライ回数
-        for attempt in range(self.settings.content.llm_retry_count):
+        recent_posts = memory.recent_posts if memory else state.post_history
+        retry_count = self.settings.content.llm_retry_count
+        candidate_count = self.settings.content.candidate_count
+
+        # 最大リトライ回数（候補をまとめて書かせる場合は、全候補がダメだったときだけやり直す）
+        for attempt in range(retry_count):
             # プロンプト生成（記憶を含む）
             prompt = self.content_strategy.create_prompt(
                 profile,
@@ -144,42 +180,25 @@ class NpcService:
             )
 
             # LLMで生成
-            content = await self.llm_provider.generate(
-                prompt, max_length=profile.behavior.post_length_max
-            )
-
-            # クリーンアップ（use_markdown/use_code_blocks設定を考慮）
-            use_markdown = profile.behavior.use_markdown
-            use_code_blocks = profile.behavior.use_code_blocks
-            content = self.content_strategy.clean_content(content, use_markdown, use_code_blocks)
-
-            # バリデーション（use_markdown/use_code_blocks設定を考慮）
-            if not self.content_strategy.validate_content(content, use_markdown, use_code_blocks):
-                print(
-                    f"⚠️  Retry {attempt + 1}/{self.settings.content.llm_retry_count}: "
-                    "Invalid content detected"
-                )
-                continue
-
-            # 長さ調整
-            content = self.content_strategy.adjust_length(
-                content,
-                profile.behavior.post_length_min,
-                profile.behavior.post_length_max,
-            )
-
-            # 文章スタイル加工（誤字、改行、句読点、癖）
-            if profile.writing_style:
-                text_processor = TextProcessor(profile.writing_style)
-                content = text_processor.process(content)
-
-            # 類似投稿チェック（セルフチェック）
-            recent_posts = memory.recent_posts if memory else state.post_history
-            if self._is_too_similar(content, recent_posts):
-                print(
-                    f"⚠️  Retry {attempt + 1}/{self.settings.content.llm_retry_count}: "
-                    "Too similar to recent posts"
-                )
+            max_length = profile.behavior.post_length_max
+            with llm_npc(npc_id):
+                if candidate_count > 1:
+                    response = await self.llm_provider.generate(
+                        self.content_strategy.create_candidates_prompt(prompt, candidate_count),
+                        max_length=(max_length + self.CANDIDATE_LENGTH_MARGIN) * candidate_count,
+                        purpose=LLMPurpose.POST,
+                    )
+                    candidates = self.content_strategy.split_candidates(response, candidate_count)
+                else:
+                    candidates = [
+                        await self.llm_provider.generate(
+                            prompt, max_length=max_length, purpose=LLMPurpose.POST
+                        )
+                    ]
+
+            content, reason = self._select_candidate(profile, candidates, recent_posts)
+            if content is None:
+                print(f"⚠️  Retry {attempt + 1}/{retry_count}: {reason}")
                 continue
 
             # 記憶を更新
@@ -201,10 +220,68 @@ class NpcService:
 
             return content
 
-        raise RuntimeError(
-            f"Failed to generate valid content after "
-            f"{self.settings.content.llm_retry_count} attempts"
-        )
+        raise RuntimeError(f"Failed to generate valid content after {retry_count} attempts")
+
+    def _select_candidate(
+        self, profile: NpcProfile, candidates: list[str], recent_posts: list[str]
+    ) -> tuple[str | None, str]:
+        """
+        候補を仕上げて（クリーンアップ・バリデーション・長さ調整・文体加工）、一番良いものを選ぶ
+
+        最近の投稿と似ていないほど良く、長さ調整で切り詰めずに済んだものを優先する。
+
+        Args:
+            profile: NPCのプロフィール
+            candidates: LLMが書いた候補
+            recent_posts: 最近の投稿（類似チェック用）
+
+        Returns:
+            (content, reason): 選んだ投稿（全部ダメならNone）と、ダメだった理由
+        """
+        behavior = profile.behavior
+        best: tuple[float, str] | None = None
+        reasons: list[str] = []
+
+        for candidate in candidates:
+            # クリーンアップ（use_markdown/use_code_blocks設定を考慮）
+            content = self.content_strategy.clean_content(
+                candidate, behavior.use_markdown, behavior.use_code_blocks
+            )
+
+            # バリデーション（use_markdown/use_code_blocks設定を考慮）
+            if not self.content_strategy.validate_content(
+                content, behavior.use_markdown, behavior.use_code_blocks
+            ):
+                reasons.append("Invalid content detected")
+                continue
+
+            # 長さ調整
+            overflow = len(content) > behavior.post_length_max
+            content = self.content_strategy.adjust_length(
+                content, behavior.post_length_min, behavior.post_length_max
+            )
+
+            # 文章スタイル加工（誤字、改行、句読点、癖）
+            if profile.writing_style:
+                content = TextProcessor(profile.writing_style).process(content)
+
+            # 類似投稿チェック（セルフチェック）
+            similarity = self._max_similarity(content, recent_posts)
+            if similarity > self.SIMILARITY_THRESHOLD:
+                reasons.append("Too similar to recent posts")
+                continue
+
+            score = 1.0 - similarity - (self.OVERFLOW_PENALTY if overflow else 0.0)
+            if best is None or score > best[0]:
+                best = (score, content)
+
+        if best is not None:
+            return best[1], ""
+        if not reasons:
+            return None, "Empty response"
+        if len(reasons) == 1:
+            return None, reasons[0]
+        return None, f"All {len(reasons)} candidates rejected ({', '.join(dict.fromkeys(reasons))})"
 
     def _update_memory_after_generate(self, npc_id: int, content: str, memory: NpcMemory) -> None:
         """投稿生成後に記憶を更新"""
@@ -351,25 +428,13 @@ class NpcService:
             print(f"⚠️  Failed to load events: {e}")
             return []
 
-    def _is_too_similar(
-        self, content: str, recent_posts: list[str], threshold: float = 0.6
-    ) -> bool:
-        """
-        生成したコンテンツが最近の投稿と類似しすぎていないかチェック
-
-        Args:
-            content: 新しく生成したコンテンツ
-            recent_posts: 最近の投稿リスト
-            threshold: 類似度の閾値（0.0-1.0、デフォルト0.6）
-
-        Returns:
-            類似しすぎている場合はTrue
-        """
-        for old_post in recent_posts[-5:]:
-            ratio = difflib.SequenceMatcher(None, content, old_post).ratio()
-            if ratio > threshold:
-                return True
-        return False
+    @staticmethod
+    def _max_similarity(content: str, recent_posts: list[str]) -> float:
+        """最近の投稿（直近5件）との類似度の最大値（0.0-1.0）"""
+        return max(
+            (difflib.SequenceMatcher(None, content, old).ratio() for old in recent_posts[-5:]),
+            default=0.0,
+        )
 
     def _load_rejected_posts(self, npc_id: int) -> list[dict[str, str]]:
         """過去にrejectされた投稿を読み込む（反省のため）"""
@@ -390,39 +455,82 @@ class NpcService:
         Returns:
             (is_approved, reason): 承認されたかどうかと理由
         """
+        if self._pre_approve(content):
+            return True, None
+        return await self._review_with_llm(content)
+
+    def _pre_approve(self, content: str) -> bool:
+        """事前レビューで承認できるか（NGワードがなくリスクが低い）"""
+        return self.pre_reviewer is not None and self.pre_reviewer.check(content).auto_approved
+
+    async def _review_with_llm(self, content: str) -> tuple[bool, str | None]:
+        """LLMで1件レビュー"""
         if not self.llm_provider:
             raise RuntimeError("LLM provider is not available")
 
-        review_prompt = f"""この投稿にNGワードがあるか？
+        response = await self.llm_provider.generate(
+            ReviewJudge.create_prompt(content), max_length=100, purpose=LLMPurpose.REVIEW
+        )
+        return ReviewJudge.judge(response)
 
-投稿: {content[:200]}
+    async def review_contents(
+        self, contents: list[str]
+    ) -> list[tuple[bool, str | None] | BaseException]:
+        """
+        複数の投稿内容をまとめてレビュー
 
-NGワード:
-- 実在の有名人の名前（田中太郎、山田花子など）
-- 政党名、宗教団体名
-- 「死ね」「殺す」などの暴力的な言葉
+        事前レビューで承認できなかった投稿を settings.review.batch_size 件ずつ
+        1回のプロンプトにまとめ、回答から判定を読み取れなかった投稿だけ1件ずつレビューし直す。
 
-OKなもの:
-- 技術用語（Python, React, AIなど）
-- ゲーム名、アニメ名
-- 普通の日常会話
+        Args:
+            contents: 投稿内容のリスト
 
-回答は「OK」か「NG」の一言だけ。
-"""
+        Returns:
+            contentsと同じ順番の (is_approved, reason)。レビューに失敗した投稿は例外
+        """
+        # 事前レビューで承認できなかった投稿だけLLMに回す
+        escalated = [i for i, content in enumerate(contents) if not self._pre_approve(content)]
+
+        batch_size = self.settings.review.batch_size
+        batches = [
+            [contents[i] for i in escalated[start : start + batch_size]]
+            for start in range(0, len(escalated), batch_size)
+        ]
+        results = await asyncio.gather(*(self._review_batch(batch) for batch in batches))
+        llm_verdicts = dict(
+            zip(escalated, [verdict for batch in results for verdict in batch], strict=True)
+        )
 
-        response = await self.llm_provider.generate(review_prompt, max_length=100)
-        response = response.strip().upper()
+        return [llm_verdicts.get(i, (True, None)) for i in range(len(contents))]
 
-        # 明確にNGと判定された場合のみNG（具体的な理由がある場合）
-        # 「NG」だけでなく、NGワードに関する具体的な言及があればNG
-        ng_keywords = ["実在", "有名人", "政治", "宗教", "暴力", "死ね", "殺"]
-        has_ng_reason = any(kw in response for kw in ng_keywords)
+    async def _review_batch(
+        self, contents: list[str]
+    ) -> list[tuple[bool, str | None] | BaseException]:
+        """1バッチ分をレビュー（読み取れなかった分は1件ずつのレビューで補う）"""
+        if not self.llm_provider:
+            raise RuntimeError("LLM provider is not available")
 
-        if "NG" in response and has_ng_reason:
-            return False, response[:100]
+        verdicts: dict[int, tuple[bool, str | None]] = {}
+        if len(contents) > 1:
+            try:
+                response = await self.llm_provider.generate(
+                    ReviewJudge.create_batch_prompt(contents),
+                    max_length=self.BATCH_REVIEW_LENGTH_PER_ITEM * len(contents),
+                    purpose=LLMPurpose.REVIEW,
+                )
+                verdicts = ReviewJudge.parse_batch(response, len(contents))
+            except Exception as e:
+                print(f"⚠️  Batch review failed, reviewing one by one: {e}")
+
+        missing = [i for i in range(len(contents)) if i not in verdicts]
+        if missing and len(contents) > 1:
+            print(f"      🔁 Re-reviewing {len(missing)}/{len(contents)} entries one by one")
+        fallback = await asyncio.gather(
+            *(self._review_with_llm(contents[i]) for i in missing), return_exceptions=True
+        )
 
-        # それ以外はすべてOK（デフォルトOK）
-        return True, None
+        retried = dict(zip(missing, fallback, strict=True))
+        return [verdicts[i] if i in verdicts else retried[i] for i in range(len(contents))]
 
     def log_review(self, npc_id: int, content: str, approved: bool, reason: str | None) -> None:
         """レビュー結果をログに記録"""
@@ -0,0 +1,408 @@
+"""
+投稿サービス（approved キューの投稿）
+
+エントリーを並列に送り、HTTPの往復を待つ時間を重ねる。
+ただし同じNPCの投稿と、同じ投稿へのリプライ・リアクション（同じスレッド）は、
+キューの順番どおりに1件ずつ送る（前のエントリーが終わってから次を送る）。
+投稿済みへの移動は、全件の送信が終わってからまとめて1回で書き込む。
+
+アウトボックスがあれば、送る前にまとめて署名して署名済みのイベントを保存し（stage）、
+送信はそこから行う（drain）。失敗したら同じイベントを間隔を空けて送り直すので、
+送信後に落ちても二重投稿にならない（APIが重複と返したら成功として扱う）。
+drain_loop を別タスクで回しておけば、送信の遅さが生成を止めない。
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+
+from nostr_sdk import Event
+
+from ..domain import PostType, QueueEntry, QueueStatus
+from ..infrastructure import (
+    KeyRegistry,
+    NostrPublisher,
+    OutboxRecord,
+    OutboxRepository,
+    QueueRepository,
+)
+
+
+def ordering_keys(npc_id: int, thread: str | None) -> list[str]:
+    """順番を守る単位（同じキーを持つエントリーどうしはキューの順に送る）"""
+    keys = [f"npc:{npc_id}"]
+    if thread:
+        keys.append(f"thread:{thread}")
+    return keys
+
+
+def backoff_seconds(attempts: int, base: float, maximum: float) -> float:
+    """
+    attempts回失敗したあと、次に送るまでの待ち時間
+
+    base から失敗のたびに倍にして maximum で止め、その後半をランダムにずらす
+    （同時に失敗したエントリーが同じ時刻に送り直さないように）。
+    """
+    delay = min(maximum, base * 2.0 ** max(attempts - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+@dataclass
+class PublishResult:
+    """1エントリーの投稿結果"""
+
+    entry: QueueEntry
+    event_id: str | None = None  # dry_run・スキップならNone
+    error: Exception | None = None
+
+
+class PublishService:
+    """approved キューのエントリーを、NPC・スレッドごとの順番を守って並列に投稿"""
+
+    def __init__(
+        self,
+        publisher: NostrPublisher,
+        queue_repo: QueueRepository,
+        key_registry: KeyRegistry,
+        max_concurrency: int = 8,
+        outbox_repo: OutboxRepository | None = None,
+        retry_base_seconds: float = 5.0,
+        retry_max_seconds: float = 600.0,
+        max_attempts: int = 8,
+    ):
+        """
+        Args:
+            publisher: 開いた（async with 済みの）パブリッシャー
+            queue_repo: 投稿済みに移すキュー
+            key_registry: 署名用の鍵と、返信・リアクション先の住人のpubkeyを引く登録簿
+            max_concurrency: 同時に送るエントリーの上限
+            outbox_repo: 署名済みのイベントを送る前に保存するアウトボックス（Noneなら直接送る）
+            retry_base_seconds: 送信に失敗してから送り直すまでの最初の待ち時間
+            retry_max_seconds: 送り直すまでの待ち時間の上限
+            max_attempts: これだけ失敗したエントリーは送り直さずにrejectedに移す
+        """
+        self.publisher = publisher
+        self.queue_repo = queue_repo
+        self.key_registry = key_registry
+        self.max_concurrency = max_concurrency
+        self.outbox_repo = outbox_repo
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_attempts = max_attempts
+        self._drain_lock = asyncio.Lock()
+
+    @staticmethod
+    def ordering_keys(entry: QueueEntry) -> list[str]:
+        """順番を守る単位（同じキーを持つエントリーどうしはキューの順に送る）"""
+        return ordering_keys(entry.npc_id, entry.reply_to.event_id if entry.reply_to else None)
+
+    @property
+    def uses_outbox(self) -> bool:
+        """アウトボックス経由で送るか（dry_runでは使わない）"""
+        return self.outbox_repo is not None and not self.publisher.dry_run
+
+    async def publish_all(
+        self,
+        entries: list[QueueEntry],
+        aurora_tags: dict[str, list[str]] | None = None,
+    ) -> list[PublishResult]:
+        """
+        エントリーを並列に投稿し、成功したものをまとめて投稿済みにする
+
+        Args:
+            entries: 投稿するエントリー（キューの順）
+            aurora_tags: エントリーID → ウィンドウカラーのauroraタグ
+
+        Returns:
+            エントリーごとの結果（entriesの順。アウトボックスから一緒に送り直したものは後ろに付く）
+        """
+        aurora_tags = aurora_tags or {}
+        if self.uses_outbox:
+            await self.stage(entries, aurora_tags)
+            sent = {result.entry.id: result for result in await self.drain()}
+            results = [sent.pop(entry.id, PublishResult(entry)) for entry in entries]
+            return results + list(sent.values())
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        last: dict[str, asyncio.Task[PublishResult]] = {}
+        tasks: list[asyncio.Task[PublishResult]] = []
+
+        for entry in entries:
+            keys = self.ordering_keys(entry)
+            previous = {last[key] for key in keys if key in last}
+            task = asyncio.create_task(
+                self._publish_after(entry, previous, semaphore, aurora_tags.get(entry.id))
+            )
+            for key in keys:
+                last[key] = task
+            tasks.append(task)
+
+        results = list(await asyncio.gather(*tasks))
+
+        event_ids = {r.entry.id: r.event_id for r in results if r.event_id}
+        if event_ids:
+            self.queue_repo.mark_posted_many(event_ids)
+        return results
+
+    async def _publish_after(
+        self,
+        entry: QueueEntry,
+        previous: set[asyncio.Task[PublishResult]],
+        semaphore: asyncio.Semaphore,
+        aurora_tag: list[str] | None,
+    ) -> PublishResult:
+        """同じNPC・スレッドの前のエントリーが終わってから送る（例外は結果に入れる）"""
+        if previous:
+            await asyncio.wait(previous)
+        async with semaphore:
+            try:
+                event_id = await self.publish_entry(entry, aurora_tag)
+            except Exception as e:
+                return PublishResult(entry, error=e)
+        return PublishResult(entry, event_id)
+
+    async def stage(
+        self, entries: list[QueueEntry], aurora_tags: dict[str, list[str]] | None = None
+    ) -> list[OutboxRecord]:
+        """
+        エントリーを署名してアウトボックスに保存（送る前に1回だけ）
+
+        署名はパブリッシャーのスレッドプールでまとめて行う。
+        すでにアウトボックスにあるエントリーは署名し直さない（同じイベントIDのまま送り直す）。
+
+        Returns:
+            新しく保存したイベント（entriesの順）
+        """
+        assert self.outbox_repo is not None
+        aurora_tags = aurora_tags or {}
+        staged = self.outbox_repo.entry_ids()
+        builds: list[tuple[QueueEntry, Callable[[], Event]]] = []
+        for entry in entries:
+            if entry.id in staged:
+                continue
+            try:
+                build = self.event_builder(entry, aurora_tags.get(entry.id))
+            except Exception as e:
+                print(f"      ⚠️  {entry.npc_name}: {e}")
+                continue
+            if build is not None:
+                builds.append((entry, build))
+
+        signed: dict[str, OutboxRecord] = {}
+        async for result in self.publisher.sign_many(builds):
+            entry = result.tag
+            if result.event is None:
+                print(f"      ⚠️  {entry.npc_name}: {result.error}")
+                continue
+            signed[entry.id] = OutboxRecord(
+                entry_id=entry.id,
+                npc_id=entry.npc_id,
+                thread=entry.reply_to.event_id if entry.reply_to else None,
+                event_id=result.event.id().to_hex(),
+                event_json=result.event.as_json(),
+            )
+
+        # 署名は終わった順なので、キューの順に並べ直して保存する
+        records = [signed[entry.id] for entry, _ in builds if entry.id in signed]
+        self.outbox_repo.add_many(records)
+        return records
+
+    async def drain(self) -> list[PublishResult]:
+        """
+        アウトボックスの送ってよいイベントを並列に送る
+
+        送り直しを待っているイベントがあれば、同じNPC・スレッドの後のイベントも待たせる。
+        成功したものはまとめて投稿済みにしてからアウトボックスから消し、
+        失敗したものは次に送ってよい時刻を先に延ばす。
+        max_attempts回失敗したものはrejectedに移してアウトボックスから消す。
+
+        Returns:
+            送ったイベントごとの結果（アウトボックスの順）
+        """
+        if not self.uses_outbox:
+            return []
+        assert self.outbox_repo is not None
+
+        async with self._drain_lock:
+            records = self.outbox_repo.get_all()
+            if not records:
+                return []
+
+            # 投稿済みになった（送った直後に落ちた）・approvedから外れたものは捨てる
+            approved = {e.id: e for e in self.queue_repo.get_all(QueueStatus.APPROVED)}
+            stale = [r.entry_id for r in records if r.entry_id not in approved]
+            self.outbox_repo.remove_many(stale)
+
+            now = time.time()
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            waiting: set[str] = set()  # 送り直しを待っている順番のキー
+            last: dict[str, asyncio.Task[PublishResult]] = {}
+            tasks: list[tuple[OutboxRecord, asyncio.Task[PublishResult]]] = []
+            for record in records:
+                entry = approved.get(record.entry_id)
+                if entry is None:
+                    continue
+                keys = ordering_keys(record.npc_id, record.thread)
+                if not record.is_due(now) or waiting.intersection(keys):
+                    waiting.update(keys)
+                    continue
+                previous = {last[key] for key in keys if key in last}
+                task = asyncio.create_task(self._send_after(record, entry, previous, semaphore))
+                for key in keys:
+                    last[key] = task
+                tasks.append((record, task))
+
+            results = list(await asyncio.gather(*(task for _, task in tasks)))
+
+            event_ids = {r.entry.id: r.event_id for r in results if r.event_id}
+            if event_ids:
+                self.queue_repo.mark_posted_many(event_ids)
+                self.outbox_repo.remove_many(list(event_ids))
+
+            given_up: list[str] = []
+            for record, result in zip((record for record, _ in tasks), results, strict=True):
+                if result.error is None:
+                    continue
+                if record.attempts + 1 >= self.max_attempts:
+                    # 送っても受け付けられないイベントで、同じNPC・スレッドを止め続けない
+                    self.queue_repo.mark_failed(
+                        record.entry_id, f"publish failed: {result.error}"[:200]
+                    )
+                    given_up.append(record.entry_id)
+                    print(
+                        f"      🚫 {result.entry.npc_name}: gave up after "
+                        f"{record.attempts + 1} attempts ({result.error})"
+                    )
+                    continue
+                delay = backoff_seconds(
+                    record.attempts + 1, self.retry_base_seconds, self.retry_max_seconds
+                )
+                self.outbox_repo.record_failure(record.entry_id, str(result.error), now + delay)
+                print(f"      ⏳ {result.entry.npc_name}: retry in {delay:.0f}s ({result.error})")
+            self.outbox_repo.remove_many(given_up)
+            return results
+
+    async def drain_loop(
+        self,
+        stop: asyncio.Event,
+        interval: float,
+        on_results: Callable[[list[PublishResult]], object] | None = None,
+    ) -> None:
+        """
+        stopがセットされるまで、interval秒ごとにアウトボックスを送る（別タスクで回す）
+
+        Args:
+            stop: 止めるときにセットするイベント
+            interval: アウトボックスを見に行く間隔（秒）
+            on_results: 送った結果を受け取る関数
+        """
+        while not stop.is_set():
+            try:
+                results = await self.drain()
+            except Exception as e:
+                print(f"⚠️ Outbox drain failed: {e}")
+                results = []
+            if results and on_results:
+                on_results(results)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except TimeoutError:
+                pass
+
+    async def _send_after(
+        self,
+        record: OutboxRecord,
+        entry: QueueEntry,
+        previous: set[asyncio.Task[PublishResult]],
+        semaphore: asyncio.Semaphore,
+    ) -> PublishResult:
+        """同じNPC・スレッドの前のイベントが送れてから送る（前が失敗したら送らない）"""
+        if previous:
+            await asyncio.wait(previous)
+            if any(task.result().event_id is None for task in previous):
+                return PublishResult(entry)
+        async with semaphore:
+            try:
+                await self.publisher.send_event_json(record.event_json)
+            except Exception as e:
+                return PublishResult(entry, error=e)
+        return PublishResult(entry, record.event_id)
+
+    def event_builder(
+        self, entry: QueueEntry, aurora_tag: list[str] | None = None
+    ) -> Callable[[], Event] | None:
+        """
+        1エントリーを投稿タイプに応じて署名する関数（署名そのものは呼んだときに行う）
+
+        Returns:
+            署名したイベントを返す関数（返信先のpubkeyが分からずスキップしたときはNone）
+
+        Raises:
+            ValueError: NPCの鍵がない
+        """
+        keys = self.key_registry.keys_for(entry.npc_id)
+
+        if entry.post_type == PostType.REPLY and entry.reply_to:
+            pubkey = self._resolve_target_pubkey(entry)
+            if not pubkey:
+                print(f"      ⏭️  {entry.npc_name}: Reply skipped (pubkey not found)")
+                return None
+            return partial(
+                self.publisher.build_reply,
+                keys,
+                entry.content,
+                entry.reply_to.event_id,
+                pubkey,
+                aurora_tag,
+            )
+
+        if entry.post_type == PostType.REACTION and entry.reply_to:
+            pubkey = self._resolve_target_pubkey(entry)
+            if not pubkey:
+                print(f"      ⏭️  {entry.npc_name}: Reaction skipped (pubkey not found)")
+                return None
+            return partial(
+                self.publisher.build_reaction, keys, entry.content, entry.reply_to.event_id, pubkey
+            )
+
+        return partial(self.publisher.build_post, keys, entry.content, aurora_tag)
+
+    async def publish_entry(
+        self, entry: QueueEntry, aurora_tag: list[str] | None = None
+    ) -> str | None:
+        """
+        1エントリーを投稿タイプに応じて署名して投稿（アウトボックスを使わない経路）
+
+        Returns:
+            イベントID（dry_run・返信先のpubkeyが分からずスキップしたときはNone）
+        """
+        build = self.event_builder(entry, aurora_tag)
+        if build is None:
+            return None
+
+        event = build()
+        if self.publisher.dry_run:
+            target = f" → {entry.reply_to.event_id[:8]}..." if entry.reply_to else ""
+            print(f"[DRY RUN] {entry.npc_name} ({entry.post_type.value}{target}):")
+            print(f"  {entry.content}")
+            if aurora_tag:
+                print(f"  aurora: {aurora_tag[1:]}")
+            print()
+            return None
+
+        await self.publisher.send_event_json(event.as_json())
+        event_id: str = event.id().to_hex()
+        return event_id
+
+    def _resolve_target_pubkey(self, entry: QueueEntry) -> str | None:
+        """返信・リアクション先のpubkey（エントリーになければ住人名から引く）"""
+        if not entry.reply_to:
+            return None
+        if entry.reply_to.pubkey:
+            return entry.reply_to.pubkey
+        if entry.reply_to.resident.startswith("external:"):
+            return None
+        return self.key_registry.target_pubkey(entry.reply_to.resident)
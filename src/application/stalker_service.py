@@ -21,7 +21,13 @@ from ..domain import (
     TextProcessor,
     extract_npc_id,
 )
-from ..infrastructure import LLMProvider, QueueRepository, RelationshipRepository
+from ..infrastructure import (
+    LLMProvider,
+    LLMPurpose,
+    QueueRepository,
+    RelationshipRepository,
+    llm_npc,
+)
 
 
 class StalkerService:
@@ -141,9 +147,10 @@ class StalkerService:
         prompt = self._create_mumble_prompt(profile, stalker, external_posts, reaction_type)
 
         # LLMで生成
-        content = await self.llm_provider.generate(
-            prompt, max_length=profile.behavior.post_length_max
-        )
+        with llm_npc(profile.id):
+            content = await self.llm_provider.generate(
+                prompt, max_length=profile.behavior.post_length_max, purpose=LLMPurpose.MUMBLE
+            )
         content = self.content_strategy.clean_content(content)
 
         # 文章スタイル加工
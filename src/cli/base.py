@@ -6,8 +6,18 @@ from dotenv import load_dotenv
 
 from ..application import ServiceFactory
 from ..config import Settings
-from ..domain import NpcKey, extract_npc_id
-from ..infrastructure import OllamaProvider
+from ..infrastructure import (
+    CachedLLMProvider,
+    InstrumentedLLMProvider,
+    LLMProvider,
+    LLMPurpose,
+    ModelRoute,
+    OllamaProvider,
+    PooledLLMProvider,
+    RecordingLLMProvider,
+    ReplayLLMProvider,
+    SyntheticLLMProvider,
+)
 
 
 def init_env() -> Settings:
@@ -17,34 +27,135 @@ def init_env() -> Settings:
     return Settings()
 
 
-def init_llm(settings: Settings) -> OllamaProvider | None:
+def init_llm(settings: Settings) -> LLMProvider | None:
     """LLMプロバイダーを初期化"""
     print("Initializing LLM...")
     try:
-        llm = OllamaProvider(settings.ollama_host, settings.ollama_model)
+        llm = build_llm(settings)
         if not llm.is_available():
-            print("⚠️  Ollama is not available")
+            if settings.llm.provider == "replay":
+                print(f"⚠️  No recorded responses in {settings.llm.cassette_file}")
+            else:
+                print("⚠️  Ollama is not available")
             return None
-        print(f"  Model: {settings.ollama_model}")
+        if settings.llm.provider in ("ollama", "record"):
+            print(f"  Model: {settings.ollama_model} (concurrency: {settings.llm.max_concurrency})")
         return llm
     except Exception as e:
         print(f"⚠️  Could not connect to Ollama: {e}")
         return None
 
 
-def create_factory(settings: Settings, llm: OllamaProvider | None = None) -> ServiceFactory:
-    """ServiceFactoryを作成"""
-    return ServiceFactory(settings, llm)
+def build_llm(settings: Settings) -> InstrumentedLLMProvider:
+    """設定からLLMプロバイダーを組み立て、呼び出しごとの計測で包む"""
+    return InstrumentedLLMProvider(build_provider(settings))
 
 
-def get_target_pubkey(resident: str) -> str | None:
-    """住人名（npc001形式）からpubkeyを取得"""
-    npc_id = extract_npc_id(resident)
-    if npc_id is None:
-        return None
+def build_provider(settings: Settings) -> LLMProvider:
+    """
+    設定からLLMプロバイダーを組み立てる
 
-    try:
-        target_key = NpcKey.from_env(npc_id)
-        return target_key.pubkey
-    except ValueError:
-        return None
+    LLM_PROVIDER が synthetic / replay ならOllamaを使わない。
+    それ以外は複数ホストならプール、有効ならキャッシュで包み、record なら最後に記録用で包む。
+    """
+    mode = settings.llm.provider
+    if mode == "synthetic":
+        print(f"  Provider: synthetic ({settings.llm.synthetic_length} chars)")
+        return SyntheticLLMProvider(
+            settings.llm.synthetic_length, latency=settings.llm.synthetic_latency
+        )
+    if mode == "replay":
+        print(f"  Provider: replay ({settings.llm.cassette_file})")
+        return ReplayLLMProvider(
+            settings.llm.cassette_file, simulate_latency=settings.llm.replay_latency
+        )
+
+    llm = with_cache(build_ollama(settings), settings)
+    if mode == "record":
+        print(f"  Provider: record → {settings.llm.cassette_file}")
+        return RecordingLLMProvider(llm, settings.llm.cassette_file)
+    if mode != "ollama":
+        print(f"⚠️  Unknown LLM provider: {mode}, using ollama")
+    return llm
+
+
+def build_ollama(settings: Settings) -> LLMProvider:
+    """Ollamaのプロバイダーを作成（複数ホストならプール）"""
+    hosts = settings.llm.hosts or [settings.ollama_host]
+    routes = build_routes(settings)
+    providers = [
+        OllamaProvider(
+            host,
+            settings.ollama_model,
+            max_concurrency=settings.llm.max_concurrency,
+            stream=settings.llm.stream,
+            routes=routes,
+            keep_alive=settings.llm.keep_alive,
+        )
+        for host in hosts
+    ]
+
+    llm: LLMProvider = providers[0]
+    if len(providers) > 1:
+        print(f"  Hosts: {', '.join(hosts)}")
+        llm = PooledLLMProvider(
+            providers,
+            backoff_seconds=settings.llm.host_backoff_seconds,
+            max_backoff_seconds=settings.llm.host_max_backoff_seconds,
+        )
+    return llm
+
+
+def build_routes(settings: Settings) -> dict[LLMPurpose, ModelRoute]:
+    """設定から用途ごとのモデルと生成オプションを作る"""
+    routes: dict[LLMPurpose, ModelRoute] = {}
+    for purpose, route in settings.llm.routes.items():
+        try:
+            routes[LLMPurpose(purpose)] = ModelRoute(
+                model=route.model, num_ctx=route.num_ctx, num_predict=route.num_predict
+            )
+        except ValueError:
+            print(f"⚠️  Unknown LLM purpose in LLM_ROUTES: {purpose}")
+            continue
+        if route.model:
+            print(f"  Route: {purpose} → {route.model}")
+    return routes
+
+
+def with_cache(llm: LLMProvider, settings: Settings) -> LLMProvider:
+    """設定で有効なら応答キャッシュで包む"""
+    if not settings.llm.cache_enabled:
+        return llm
+
+    ttl_hours: dict[LLMPurpose, float] = {}
+    for purpose, hours in settings.llm.cache_ttl_hours.items():
+        try:
+            ttl_hours[LLMPurpose(purpose)] = hours
+        except ValueError:
+            print(f"⚠️  Unknown LLM purpose in LLM_CACHE_TTL_HOURS: {purpose}")
+
+    return CachedLLMProvider(
+        llm, settings.llm.cache_file, ttl_hours, max_bytes=settings.llm.cache_max_bytes
+    )
+
+
+def report_llm(llm: LLMProvider | None) -> None:
+    """呼び出しの計測、記録・再生の件数、応答キャッシュのヒット/ミス、ホストごとのレイテンシを表示"""
+    if isinstance(llm, InstrumentedLLMProvider):
+        print(f"⏱️  {llm.report()}")
+        llm = llm.provider
+    if isinstance(llm, ReplayLLMProvider):
+        print(f"📼 Replayed {llm.exact_hits} exact, {llm.purpose_hits} by purpose")
+    if isinstance(llm, RecordingLLMProvider):
+        print(f"📼 Recorded {llm.recorded} calls → {llm.cassette_file}")
+        llm = llm.provider
+    if isinstance(llm, CachedLLMProvider):
+        print(f"🗄️  {llm.report()}")
+        llm = llm.provider
+    if isinstance(llm, PooledLLMProvider):
+        print(f"🖥️  {llm.report()}")
+
+
+def create_factory(settings: Settings, llm: LLMProvider | None = None) -> ServiceFactory:
+    """ServiceFactoryを作成"""
+    return ServiceFactory(settings, llm)
@@ -4,6 +4,7 @@ from .generate import cmd_generate
 from .post import cmd_post
 from .queue import cmd_queue
 from .review import cmd_review
+from .stats import cmd_stats
 from .tick import cmd_tick
 
-__all__ = ["cmd_generate", "cmd_queue", "cmd_review", "cmd_post", "cmd_tick"]
+__all__ = ["cmd_generate", "cmd_queue", "cmd_review", "cmd_post", "cmd_tick", "cmd_stats"]
@@ -3,10 +3,11 @@ generate コマンド - 投稿を生成してキューに追加
 """
 
 import argparse
+import asyncio
 
 from ...application import ServiceFactory
 from ...domain import QueueEntry, QueueStatus, extract_npc_id
-from ..base import init_env, init_llm
+from ..base import init_env, init_llm, report_llm
 
 
 async def cmd_generate(args: argparse.Namespace) -> None:
@@ -18,6 +19,16 @@ async def cmd_generate(args: argparse.Namespace) -> None:
 
     # ServiceFactoryを使ってサービスを構築
     factory = ServiceFactory(settings, llm)
+    try:
+        await _generate(args, factory)
+    finally:
+        # 生成中に変更された state / memory をまとめて書き出す
+        factory.commit()
+        report_llm(llm)
+
+
+async def _generate(args: argparse.Namespace, factory: ServiceFactory) -> None:
+    """投稿生成の本体（書き出しは呼び出し側のcommitで行う）"""
     service = await factory.create_npc_service()
 
     # dry_run の場合は dry_run.json に追加
@@ -37,24 +48,28 @@ async def cmd_generate(args: argparse.Namespace) -> None:
         return
 
     print(f"\nGenerating posts ({target_status.value})...")
+    # LLM呼び出しは並列に行い、キューへの追加はNPCの順番どおりに行う
+    results = await asyncio.gather(
+        *(service.generate_post_content(npc_id) for npc_id in npc_ids),
+        return_exceptions=True,
+    )
     generated = 0
 
-    for npc_id in npc_ids:
+    for npc_id, result in zip(npc_ids, results, strict=True):
         _, profile, _ = service.npcs[npc_id]
-        try:
-            content = await service.generate_post_content(npc_id)
-
-            entry = QueueEntry(
-                npc_id=npc_id,
-                npc_name=profile.name,
-                content=content,
-                status=target_status,
-            )
-            factory.queue_repo.add(entry)
-
-            print(f"  [{entry.id}] {profile.name}: {content[:40]}...")
-            generated += 1
-        except Exception as e:
-            print(f"  ⚠️  {profile.name}: {e}")
+        if isinstance(result, BaseException):
+            print(f"  ⚠️  {profile.name}: {result}")
+            continue
+
+        entry = QueueEntry(
+            npc_id=npc_id,
+            npc_name=profile.name,
+            content=result,
+            status=target_status,
+        )
+        factory.queue_repo.add(entry)
+
+        print(f"  [{entry.id}] {profile.name}: {result[:40]}...")
+        generated += 1
 
     print(f"\n✅ Generated {generated} posts → {target_status.value}.json")
@@ -3,109 +3,47 @@ post コマンド - approvedのエントリーを投稿
 """
 
 import argparse
-from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from nostr_sdk import Keys
-
-from ...domain import NpcKey, PostType, QueueEntry, QueueStatus
-from ...infrastructure import NostrPublisher, QueueRepository
-from ..base import get_target_pubkey, init_env
-
-if TYPE_CHECKING:
-    pass
-
-
-def _get_target_pubkey_for_entry(entry: QueueEntry) -> str | None:
-    """エントリーから対象のpubkeyを取得"""
-    if not entry.reply_to:
-        return None
-    if entry.reply_to.resident.startswith("external:"):
-        return entry.reply_to.pubkey
-    return get_target_pubkey(entry.reply_to.resident)
-
-
-async def _post_reply(
-    publisher: NostrPublisher,
-    keys: Keys,
-    entry: QueueEntry,
-    target_pubkey: str,
-) -> str | None:
-    """リプライを投稿"""
-    if not entry.reply_to:
-        return None
-    event_id = await publisher.publish_reply(
-        keys=keys,
-        content=entry.content,
-        npc_name=entry.npc_name,
-        reply_to_event_id=entry.reply_to.event_id,
-        reply_to_pubkey=target_pubkey,
-    )
-    print(f"  💬 {entry.npc_name}: {entry.content[:40]}... → {entry.reply_to.resident}")
-    return event_id
-
-
-async def _post_reaction(
-    publisher: NostrPublisher,
-    keys: Keys,
-    entry: QueueEntry,
-    target_pubkey: str,
-) -> str | None:
-    """リアクションを投稿"""
-    if not entry.reply_to:
-        return None
-    event_id = await publisher.publish_reaction(
-        keys=keys,
-        emoji=entry.content,
-        npc_name=entry.npc_name,
-        target_event_id=entry.reply_to.event_id,
-        target_pubkey=target_pubkey,
-    )
-    print(f"  ❤️  {entry.npc_name}: {entry.content} → {entry.reply_to.resident}")
-    return event_id
-
-
-async def _post_normal(
-    publisher: NostrPublisher,
-    keys: Keys,
-    entry: QueueEntry,
-) -> str | None:
-    """通常投稿"""
-    event_id = await publisher.publish(keys, entry.content, entry.npc_name)
-    print(f"  ✅ {entry.npc_name}: {entry.content[:40]}...")
-    return event_id
-
-
-async def _post_entry(
-    publisher: NostrPublisher,
-    entry: QueueEntry,
-) -> str | None:
-    """エントリーを投稿"""
-    npc_key = NpcKey.from_env(entry.npc_id)
-    keys = Keys.parse(npc_key.nsec)
 
-    if entry.post_type == PostType.REPLY and entry.reply_to:
-        target_pubkey = _get_target_pubkey_for_entry(entry)
-        if not target_pubkey:
-            print(f"  ⏭️  {entry.npc_name}: Reply skipped (pubkey not found)")
-            return None
-        return await _post_reply(publisher, keys, entry, target_pubkey)
+from ...application import PublishResult, ServiceFactory
+from ...config import Settings
+from ...domain import PostType, QueueStatus
+from ..base import create_factory, init_env
+
 
-    if entry.post_type == PostType.REACTION and entry.reply_to:
-        target_pubkey = _get_target_pubkey_for_entry(entry)
-        if not target_pubkey:
-            print(f"  ⏭️  {entry.npc_name}: Reaction skipped (pubkey not found)")
-            return None
-        return await _post_reaction(publisher, keys, entry, target_pubkey)
+def _print_result(result: PublishResult) -> bool:
+    """投稿結果を表示（投稿できたらTrue）"""
+    entry = result.entry
+    if result.error:
+        print(f"  ❌ {entry.npc_name}: {result.error}")
+        return False
+    if not result.event_id:
+        return False
 
-    return await _post_normal(publisher, keys, entry)
+    if entry.post_type == PostType.REPLY and entry.reply_to:
+        print(f"  💬 {entry.npc_name}: {entry.content[:40]}... → {entry.reply_to.resident}")
+    elif entry.post_type == PostType.REACTION and entry.reply_to:
+        print(f"  ❤️  {entry.npc_name}: {entry.content} → {entry.reply_to.resident}")
+    else:
+        print(f"  ✅ {entry.npc_name}: {entry.content[:40]}...")
+    return True
 
 
 async def cmd_post(args: argparse.Namespace) -> None:
     """approvedのエントリーを投稿"""
     settings = init_env()
-    queue_repo = QueueRepository(settings.queue_dir)
-    entries = queue_repo.get_all(QueueStatus.APPROVED)
+    factory = create_factory(settings)
+    try:
+        await _post(args, settings, factory)
+    finally:
+        # 投稿済みにした分の逆引きインデックスを書き出す
+        factory.commit()
+
+
+async def _post(args: argparse.Namespace, settings: Settings, factory: ServiceFactory) -> None:
+    """投稿の本体"""
+    entries = factory.queue_repo.get_all(QueueStatus.APPROVED)
 
     if not entries:
         print("No approved entries to post")
@@ -119,18 +57,13 @@ async def cmd_post(args: argparse.Namespace) -> None:
         return
 
     load_dotenv(".env.keys")
-    publisher = NostrPublisher(settings.api_endpoint, dry_run=settings.dry_run)
 
     print(f"\n📤 Posting {len(entries)} entries...\n")
-    posted = 0
 
-    for entry in entries:
-        try:
-            event_id = await _post_entry(publisher, entry)
-            if event_id:
-                queue_repo.mark_posted(entry.id, event_id)
-                posted += 1
-        except Exception as e:
-            print(f"  ❌ {entry.npc_name}: {e}")
+    # 接続プールはこの実行の間だけ開いて使い回す
+    async with factory.create_publisher(dry_run=settings.dry_run) as publisher:
+        publish_service = factory.create_publish_service(publisher)
+        results = await publish_service.publish_all(entries)
 
+    posted = sum(1 for result in results if _print_result(result))
     print(f"\n✅ Posted {posted}/{len(entries)} entries")
@@ -6,14 +6,22 @@ import argparse
 
 from ...domain import QueueStatus
 from ...infrastructure import QueueRepository
-from ..base import init_env
+from ..base import create_factory, init_env
 
 
 def cmd_queue(args: argparse.Namespace) -> None:
     """キューの状態を表示"""
     settings = init_env()
-    queue_repo = QueueRepository(settings.queue_dir)
+    factory = create_factory(settings)
+    try:
+        _show_queue(args, factory.queue_repo)
+    finally:
+        # 読み込み時に作り直した逆引きインデックスがあれば書き出す
+        factory.commit()
+
 
+def _show_queue(args: argparse.Namespace, queue_repo: QueueRepository) -> None:
+    """キューの表示の本体"""
     if args.summary:
         # サマリー表示
         summary = queue_repo.summary()
@@ -6,7 +6,7 @@ import argparse
 
 from ...domain import QueueStatus
 from ...infrastructure import QueueRepository
-from ..base import init_env
+from ..base import create_factory, init_env
 from .queue import cmd_queue
 
 
@@ -48,15 +48,23 @@ def _handle_reject(queue_repo: QueueRepository, entry_id: str, note: str | None)
 
 def cmd_review(args: argparse.Namespace) -> None:
     """エントリーをレビュー（approve/reject）"""
-    settings = init_env()
-    queue_repo = QueueRepository(settings.queue_dir)
-
     if args.action == "list":
         args.status = "pending"
         args.summary = False
         cmd_queue(args)
         return
 
+    settings = init_env()
+    factory = create_factory(settings)
+    try:
+        _review(args, factory.queue_repo)
+    finally:
+        # 逆引きインデックスの変更を書き出す
+        factory.commit()
+
+
+def _review(args: argparse.Namespace, queue_repo: QueueRepository) -> None:
+    """レビューの本体"""
     if args.dry_run:
         _handle_dry_run(queue_repo, args.id, args.action)
         return
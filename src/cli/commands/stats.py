@@ -0,0 +1,108 @@
+"""
+stats コマンド - 計測した統計を表示
+"""
+
+import argparse
+
+from ...domain import PromptStats, format_npc_name
+from ...infrastructure import LLMCallRecord, LLMTickReport, summarize_calls
+from ..base import create_factory, init_env
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    """統計を表示"""
+    settings = init_env()
+    factory = create_factory(settings)
+
+    if args.target == "prompts":
+        show_prompt_stats(factory.prompt_stats_repo.load(), args.top)
+    elif args.target == "llm":
+        show_llm_stats(factory.llm_stats_repo.load(args.ticks), args.top)
+
+
+def show_prompt_stats(stats: PromptStats, top: int) -> None:
+    """NPC・用途ごとのプロンプトサイズを、平均トークン数の大きい順に表示"""
+    rows = [
+        (npc_id, purpose, size)
+        for npc_id, purposes in stats.npcs.items()
+        for purpose, size in purposes.items()
+    ]
+    if not rows:
+        print("\nNo prompt stats yet (run tick or generate first)")
+        return
+
+    rows.sort(key=lambda row: row[2].avg_tokens, reverse=True)
+
+    print(f"\n📏 Prompt sizes (estimated tokens, top {min(top, len(rows))} of {len(rows)}):\n")
+    print(
+        f"  {'NPC':<8} {'purpose':<8} {'count':>6} {'avg':>6} {'max':>6} {'last':>6} {'trimmed':>8}"
+    )
+    for npc_id, purpose, size in rows[:top]:
+        print(
+            f"  {format_npc_name(npc_id):<8} {purpose:<8} {size.count:>6} "
+            f"{size.avg_tokens:>6.0f} {size.max_tokens:>6} {size.last_tokens:>6} {size.trimmed:>8}"
+        )
+
+    # 用途ごとの合計
+    print()
+    for purpose in sorted({purpose for _, purpose, _ in rows}):
+        sizes = [size for _, p, size in rows if p == purpose]
+        count = sum(s.count for s in sizes)
+        avg = sum(s.total_tokens for s in sizes) / count if count else 0.0
+        trimmed = sum(s.trimmed for s in sizes)
+        print(f"  {purpose}: {count} prompts, avg {avg:.0f} tokens, {trimmed} trimmed")
+
+
+def show_llm_stats(reports: list[LLMTickReport], top: int) -> None:
+    """直近のtickのLLM呼び出しを、用途ごと・NPCごとのパーセンタイルで表示"""
+    calls = [call for report in reports for call in report.calls]
+    if not calls:
+        print("\nNo LLM stats yet (run tick first)")
+        return
+
+    total = summarize_calls(calls)
+    tick_seconds = sum(report.seconds for report in reports)
+    print(f"\n⏱️  LLM calls in the last {len(reports)} ticks:")
+    print(
+        f"  {total['calls']} calls, {total['errors']} errors, {total['cached']} cached, "
+        f"{total['seconds']:.0f}s in LLM / {tick_seconds:.0f}s in ticks"
+    )
+
+    # 用途ごと（時間は秒、速度はトークン/秒）
+    by_purpose: dict[str, list[LLMCallRecord]] = {}
+    for call in calls:
+        by_purpose.setdefault(call.purpose or "-", []).append(call)
+
+    print(
+        f"\n  {'purpose':<8} {'calls':>6} {'p50':>6} {'p90':>6} {'p99':>6} "
+        f"{'wait90':>7} {'tok/s':>6} {'pp/s':>6} {'prompt':>7}"
+    )
+    for purpose, records in sorted(by_purpose.items()):
+        s = summarize_calls(records)
+        print(
+            f"  {purpose:<8} {s['calls']:>6} {s['latency']['p50']:>6.1f} "
+            f"{s['latency']['p90']:>6.1f} {s['latency']['p99']:>6.1f} "
+            f"{s['queue_wait']['p90']:>7.1f} {s['tokens_per_second']['p50']:>6.1f} "
+            f"{s['prompt_tokens_per_second']['p50']:>6.0f} {s['prompt_tokens']:>7}"
+        )
+
+    # NPCごと（LLMの合計時間が長い順）
+    by_npc: dict[int, list[LLMCallRecord]] = {}
+    for call in calls:
+        if call.npc_id is not None:
+            by_npc.setdefault(call.npc_id, []).append(call)
+    if not by_npc:
+        return
+
+    rows = sorted(
+        ((npc_id, summarize_calls(records)) for npc_id, records in by_npc.items()),
+        key=lambda row: row[1]["seconds"],
+        reverse=True,
+    )
+    print(f"\n  {'NPC':<8} {'calls':>6} {'total':>7} {'p50':>6} {'p90':>6} {'tok/s':>6}")
+    for npc_id, s in rows[:top]:
+        print(
+            f"  {format_npc_name(npc_id):<8} {s['calls']:>6} {s['seconds']:>7.1f} "
+            f"{s['latency']['p50']:>6.1f} {s['latency']['p90']:>6.1f} "
+            f"{s['tokens_per_second']['p50']:>6.1f}"
+        )
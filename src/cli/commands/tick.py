@@ -5,15 +5,25 @@ tick コマンド - 活動時刻のNPCを処理 + 相互作用 + レビュー +
 from __future__ import annotations
 
 import argparse
+import asyncio
 import random
+import time
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from ...application import NpcService, ServiceFactory
+from ...application import (
+    InteractionService,
+    NpcService,
+    PublishResult,
+    PublishService,
+    ServiceFactory,
+)
 from ...domain import QueueEntry, QueueStatus, Scheduler
-from ..base import init_env, init_llm
+from ...infrastructure import InstrumentedLLMProvider, LLMProvider
+from ..base import init_env, init_llm, report_llm
 
 if TYPE_CHECKING:
+    from ...config import Settings
     from ...infrastructure import QueueRepository
 
 # キューの上限（これ以上たまったら生成しない）
@@ -29,8 +39,70 @@ async def cmd_tick(args: argparse.Namespace) -> None:
 
     # ServiceFactoryを使ってサービスを構築
     factory = ServiceFactory(settings, llm)
+    started = time.monotonic()
+    try:
+        await _run_tick_with_outbox(args, settings, factory)
+    finally:
+        # tick中に変更された state / memory / affinity をまとめて書き出す
+        factory.commit()
+        save_llm_stats(llm, factory, time.monotonic() - started)
+        report_llm(llm)
+
+
+def save_llm_stats(llm: LLMProvider, factory: ServiceFactory, seconds: float) -> None:
+    """tick中のLLM呼び出しの計測結果を1tick分として保存"""
+    if not isinstance(llm, InstrumentedLLMProvider) or not llm.records:
+        return
+    tick = factory.tick_state_repo.load().total_ticks
+    factory.llm_stats_repo.append(llm.tick_report(tick, seconds))
+
+
+async def _run_tick_with_outbox(
+    args: argparse.Namespace, settings: Settings, factory: ServiceFactory
+) -> None:
+    """
+    アウトボックスの送信を別タスクで回しながらtickを実行
+
+    送り直し待ちのイベントはtickの間も送り続け、API呼び出しの遅さで生成を止めない。
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(".env.keys")
     service = await factory.create_npc_service()
 
+    # 接続プールはこのtickの間だけ開いて使い回す
+    async with factory.create_publisher(dry_run=settings.dry_run) as publisher:
+        publish_service = factory.create_publish_service(publisher)
+        stop = asyncio.Event()
+        drainer = asyncio.create_task(
+            publish_service.drain_loop(
+                stop,
+                settings.publish.drain_interval_seconds,
+                on_results=lambda results: apply_publish_results(service, factory, results),
+            )
+        )
+        try:
+            await _run_tick(args, settings, factory, service, publish_service)
+        finally:
+            stop.set()
+            await drainer
+
+
+async def _run_tick(
+    args: argparse.Namespace,
+    settings: Settings,
+    factory: ServiceFactory,
+    service: NpcService,
+    publish_service: PublishService,
+) -> None:
+    """tick本体（書き出しは呼び出し側のcommitで行う）"""
+
+    # 古い投稿済みエントリーをアーカイブへ（posted の読み込み量を一定に保つ）
+    if settings.queue_hot_window_hours > 0:
+        archived = factory.queue_repo.archive_posted(settings.queue_hot_window_hours)
+        if archived > 0:
+            print(f"📦 Archived {archived} posted entries")
+
     # approved キューの件数をチェック
     approved_count = len(factory.queue_repo.get_all(QueueStatus.APPROVED))
     if approved_count >= MAX_APPROVED_QUEUE:
@@ -38,7 +110,7 @@ async def cmd_tick(args: argparse.Namespace) -> None:
             f"⏸️  Approved queue full ({approved_count}/{MAX_APPROVED_QUEUE}), skipping generation"
         )
         # 投稿処理だけ行う
-        posted = await post_approved(service, factory)
+        posted = await post_approved(service, factory, publish_service)
         print(f"✅ Posted {posted} entries")
         return
 
@@ -60,30 +132,43 @@ async def cmd_tick(args: argparse.Namespace) -> None:
     print(f"\n🔄 Tick #{tick_state.total_ticks + 1}")
     print(f"   {len(target_ids)} NPCs ready to post (hour: {current_hour}:00)")
 
-    # --- 住人の処理（順番に） ---
+    # --- 住人の処理（投稿の生成 → その住人の相互作用） ---
+    # 同じ住人のLLM呼び出しを続けて投げ、プロンプト前半（共通ルール・人物設定）の
+    # 読み込みをサーバーに使い回させる。住人どうしは並列、投稿のキューへの追加は順番に
+    print("\n   💬 Generating posts and processing interactions...")
+    interaction_service = factory.create_interaction_service(service)
+    posted_entries = factory.queue_repo.get_all(QueueStatus.POSTED)
+    lanes = await asyncio.gather(
+        *(
+            _run_npc_lane(service, interaction_service, npc_id, posted_entries)
+            for npc_id in target_ids
+        )
+    )
     generated = 0
-    for npc_id in target_ids:
+    interactions = 0
+    for npc_id, (result, interaction_result) in zip(target_ids, lanes, strict=True):
         _, profile, _ = service.npcs[npc_id]
-        try:
-            content = await service.generate_post_content(npc_id)
+        if isinstance(interaction_result, BaseException):
+            print(f"   ⚠️  {profile.name} (interactions): {interaction_result}")
+        else:
+            interactions += interaction_result
 
-            entry = QueueEntry(
-                npc_id=npc_id,
-                npc_name=profile.name,
-                content=content,
-                status=QueueStatus.PENDING,
-            )
-            factory.queue_repo.add(entry)
+        if isinstance(result, BaseException):
+            print(f"   ⚠️  {profile.name}: {result}")
+            continue
 
-            print(f"   ✏️  {profile.name}: {content[:40]}...")
-            generated += 1
-        except Exception as e:
-            print(f"   ⚠️  {profile.name}: {e}")
+        entry = QueueEntry(
+            npc_id=npc_id,
+            npc_name=profile.name,
+            content=result,
+            status=QueueStatus.PENDING,
+        )
+        factory.queue_repo.add(entry)
+
+        print(f"   ✏️  {profile.name}: {result[:40]}...")
+        generated += 1
 
     # --- 相互作用処理 ---
-    print("\n   💬 Processing interactions...")
-    interaction_service = factory.create_interaction_service(service)
-    interactions = await interaction_service.process_interactions(target_ids)
     # リプライチェーンは全NPC対象（target_ids関係なく返信可能）
     chain_replies = await interaction_service.process_reply_chains()
     total_interactions = interactions + chain_replies
@@ -110,7 +195,7 @@ async def cmd_tick(args: argparse.Namespace) -> None:
 
     # --- 投稿処理（approved キューから投稿）---
     print("\n   📤 Posting approved entries...")
-    posted = await post_approved(service, factory)
+    posted = await post_approved(service, factory, publish_service)
 
     print(
         f"\n✅ Tick complete: {generated} generated, {total_interactions} interactions, "
@@ -118,6 +203,31 @@ async def cmd_tick(args: argparse.Namespace) -> None:
     )
 
 
+async def _run_npc_lane(
+    service: NpcService,
+    interaction_service: InteractionService,
+    npc_id: int,
+    posted_entries: list[QueueEntry],
+) -> tuple[str | BaseException, int | BaseException]:
+    """
+    1人分の投稿生成と相互作用を続けて行う
+
+    Returns:
+        (投稿内容, 相互作用の数)。それぞれ失敗したらその例外
+    """
+    content: str | BaseException
+    interactions: int | BaseException
+    try:
+        content = await service.generate_post_content(npc_id)
+    except Exception as e:
+        content = e
+    try:
+        interactions = await interaction_service.process_npc_interactions(npc_id, posted_entries)
+    except Exception as e:
+        interactions = e
+    return content, interactions
+
+
 REVIEWER_NPC_ID = 101  # レビューアのNPC ID
 
 
@@ -129,11 +239,15 @@ async def run_reviewer(service: NpcService, queue_repo: QueueRepository) -> int:
         print("      No pending entries")
         return 0
 
+    # LLMでのレビューはまとめて行い、結果の反映はキューの順番どおりに行う
+    results = await service.review_contents([entry.content for entry in pending_entries])
+
     reviewed = 0
-    for entry in pending_entries:
+    for entry, result in zip(pending_entries, results, strict=True):
         try:
-            # LLMでレビュー
-            is_approved, reason = await service.review_content(entry.content)
+            if isinstance(result, BaseException):
+                raise result
+            is_approved, reason = result
 
             if is_approved:
                 queue_repo.approve(entry.id, reason)
@@ -153,29 +267,28 @@ async def run_reviewer(service: NpcService, queue_repo: QueueRepository) -> int:
         except Exception as e:
             print(f"      ⚠️  {entry.npc_name}: {e}")
 
+    if service.pre_reviewer:
+        print(f"      📊 {service.pre_reviewer.report()}")
     return reviewed
 
 
-async def post_approved(service: NpcService, factory: "ServiceFactory") -> int:
+async def post_approved(
+    service: NpcService, factory: ServiceFactory, publish_service: PublishService
+) -> int:
     """approved キューから投稿（活動時刻のNPCのみ）"""
-    from dotenv import load_dotenv
-    from nostr_sdk import Keys
-
-    from ...domain import NpcKey, PostType, Scheduler
-    from ...infrastructure import NostrPublisher
-
-    load_dotenv(".env.keys")
+    from ...domain import PostType, Scheduler
 
     approved_entries = factory.queue_repo.get_all(QueueStatus.APPROVED)
     if not approved_entries:
         print("      No approved entries")
         return 0
 
-    publisher = NostrPublisher(factory.settings.api_endpoint, dry_run=factory.settings.dry_run)
-    posted = 0
-
+    # 今投稿するエントリーを選ぶ（送るのは後でまとめて並列に）
+    now = datetime.now()
+    selected: list[QueueEntry] = []
+    aurora_tags: dict[str, list[str]] = {}
+    scheduled_npcs: set[int] = set()  # 通常投稿・リプライを選んだNPC
     for entry in approved_entries:
-        # このNPCが今投稿すべき時刻かチェック
         if entry.npc_id not in service.npcs:
             continue
 
@@ -185,64 +298,50 @@ async def post_approved(service: NpcService, factory: "ServiceFactory") -> int:
         # 通常投稿・リプライはnext_post_timeもチェック
         if entry.post_type == PostType.REACTION:
             # 活動時間・曜日のみチェック
-            current_hour = datetime.now().hour
-            current_weekday = datetime.now().weekday()
-            if current_hour not in profile.behavior.active_hours:
+            if now.hour not in profile.behavior.active_hours:
                 continue
             if hasattr(profile.behavior, "active_days") and profile.behavior.active_days:
-                if current_weekday not in profile.behavior.active_days:
+                if now.weekday() not in profile.behavior.active_days:
                     continue
         else:
-            # 通常投稿・リプライは完全チェック
-            if not Scheduler.should_post_now(profile, state):
+            # 通常投稿・リプライは完全チェック。投稿すると次回投稿時刻が先に進むので1人1件まで
+            if entry.npc_id in scheduled_npcs or not Scheduler.should_post_now(profile, state):
                 continue
+            scheduled_npcs.add(entry.npc_id)
 
-        try:
-            npc_key = NpcKey.from_env(entry.npc_id)
-            keys = Keys.parse(npc_key.nsec)
-
-            # ウィンドウカラーのauroraタグを取得
-            aurora_tag = None
-            if profile.window_color:
-                aurora_tag = profile.window_color.to_aurora_tag()
-
-            # 投稿タイプに応じて投稿
-            if entry.post_type == PostType.NORMAL:
-                event_id = await publisher.publish(
-                    keys, entry.content, entry.npc_name, aurora_tag=aurora_tag
-                )
-            elif entry.post_type == PostType.REACTION and entry.reply_to:
-                event_id = await publisher.publish_reaction(
-                    keys=keys,
-                    emoji=entry.content,
-                    npc_name=entry.npc_name,
-                    target_event_id=entry.reply_to.event_id,
-                    target_pubkey=entry.reply_to.pubkey or "",
-                )
-            elif entry.post_type == PostType.REPLY and entry.reply_to:
-                event_id = await publisher.publish_reply(
-                    keys=keys,
-                    content=entry.content,
-                    npc_name=entry.npc_name,
-                    reply_to_event_id=entry.reply_to.event_id,
-                    reply_to_pubkey=entry.reply_to.pubkey or "",
-                    aurora_tag=aurora_tag,
-                )
-            else:
-                event_id = await publisher.publish(
-                    keys, entry.content, entry.npc_name, aurora_tag=aurora_tag
-                )
-
-            if event_id:
-                factory.queue_repo.mark_posted(entry.id, event_id)
-                # リアクション以外は次回投稿時刻を更新
-                if entry.post_type != PostType.REACTION:
-                    state.next_post_time = Scheduler.calculate_next_post_time(profile)
-                    factory.state_repo.save(state)
-                print(f"      ✅ {entry.npc_name}: {entry.content[:30]}...")
-                posted += 1
+        selected.append(entry)
+        aurora_tag = profile.window_color.to_aurora_tag() if profile.window_color else None
+        if aurora_tag:
+            aurora_tags[entry.id] = aurora_tag
 
-        except Exception as e:
-            print(f"      ❌ {entry.npc_name}: {e}")
+    if not selected:
+        return 0
+
+    results = await publish_service.publish_all(selected, aurora_tags)
+    return apply_publish_results(service, factory, results)
+
+
+def apply_publish_results(
+    service: NpcService, factory: ServiceFactory, results: list[PublishResult]
+) -> int:
+    """投稿結果を表示し、投稿できたNPCの次回投稿時刻を進める（投稿できた数を返す）"""
+    from ...domain import PostType, Scheduler
+
+    posted = 0
+    for result in results:
+        entry = result.entry
+        if result.error:
+            print(f"      ❌ {entry.npc_name}: {result.error}")
+            continue
+        if not result.event_id:
+            continue
+
+        # リアクション以外は次回投稿時刻を更新（書き出しはtick終わりのcommitでまとめて）
+        if entry.post_type != PostType.REACTION and entry.npc_id in service.npcs:
+            _, profile, state = service.npcs[entry.npc_id]
+            state.next_post_time = Scheduler.calculate_next_post_time(profile)
+            factory.state_repo.save(state)
+        print(f"      ✅ {entry.npc_name}: {entry.content[:30]}...")
+        posted += 1
 
     return posted
@@ -5,7 +5,7 @@ CLIツール - NPC投稿管理（メインエントリーポイント）
 import argparse
 import asyncio
 
-from .commands import cmd_generate, cmd_post, cmd_queue, cmd_review, cmd_tick
+from .commands import cmd_generate, cmd_post, cmd_queue, cmd_review, cmd_stats, cmd_tick
 
 
 def main() -> None:
@@ -46,6 +46,16 @@ def main() -> None:
         "--count", "-c", type=int, default=10, help="Number of NPCs to process (default: 10)"
     )
 
+    # stats コマンド
+    stats_parser = subparsers.add_parser("stats", help="Show measured stats")
+    stats_parser.add_argument("target", choices=["prompts", "llm"], help="What to show")
+    stats_parser.add_argument(
+        "--top", "-t", type=int, default=20, help="Number of rows to show (default: 20)"
+    )
+    stats_parser.add_argument(
+        "--ticks", type=int, default=20, help="Number of recent ticks for llm (default: 20)"
+    )
+
     # 旧 preview コマンド（後方互換）
     preview_parser = subparsers.add_parser(
         "preview", help="(Legacy) Preview posts - use 'generate --dry-run' instead"
@@ -69,6 +79,8 @@ def main() -> None:
         asyncio.run(cmd_post(args))
     elif args.command == "tick":
         asyncio.run(cmd_tick(args))
+    elif args.command == "stats":
+        cmd_stats(args)
     elif args.command == "preview":
         # 後方互換: generate --dry-run にリダイレクト
         args.dry_run = True
@@ -1,5 +1,23 @@
 """設定モジュール"""
 
-from .settings import AffinitySettings, ContentSettings, MemorySettings, Settings
+from .settings import (
+    AffinitySettings,
+    ContentSettings,
+    LLMSettings,
+    MemorySettings,
+    ModelRouteSettings,
+    PublishSettings,
+    ReviewSettings,
+    Settings,
+)
 
-__all__ = ["Settings", "ContentSettings", "AffinitySettings", "MemorySettings"]
+__all__ = [
+    "Settings",
+    "ContentSettings",
+    "AffinitySettings",
+    "MemorySettings",
+    "LLMSettings",
+    "ReviewSettings",
+    "ModelRouteSettings",
+    "PublishSettings",
+]
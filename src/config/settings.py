@@ -4,7 +4,7 @@
 
 from pathlib import Path
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
@@ -49,6 +49,20 @@ class ContentSettings(BaseSettings):
         description="LLM生成失敗時のリトライ回数",
     )
 
+    # 1回のLLM呼び出しで書かせる投稿候補の数
+    candidate_count: int = Field(
+        default=1,
+        ge=1,
+        le=10,
+        description="1回の生成で書かせる投稿候補の数（2以上なら候補から良いものを選ぶ）",
+    )
+
+    # プロンプトのトークン予算（用途ごと）
+    prompt_token_budget: dict[str, int] = Field(
+        default={"post": 800, "reply": 800},
+        description="用途（post/reply）→ プロンプトのトークン数の上限（超えたら優先度の低い部分から削る、0で無制限）",
+    )
+
     # 重複防止で参照する過去投稿数
     history_check_count: int = Field(
         default=5,
@@ -148,6 +162,219 @@ class MemorySettings(BaseSettings):
     )
 
 
+class ReviewSettings(BaseSettings):
+    """投稿レビューの設定（環境変数は REVIEW_ で始まる）"""
+
+    model_config = {"env_prefix": "REVIEW_"}
+
+    # 1回のLLM呼び出しでまとめてレビューする件数
+    batch_size: int = Field(
+        default=8,
+        ge=1,
+        description="1回のプロンプトにまとめてレビューする投稿数（1で1件ずつ）",
+    )
+
+    # 事前レビュー（NGワード照合で問題ない投稿はLLMに回さない）
+    pre_review_enabled: bool = Field(
+        default=True,
+        description="NGワードがなくリスクの低い投稿をLLMに回さずに承認する",
+    )
+    risk_threshold: float = Field(
+        default=0.5,
+        ge=0.0,
+        le=1.0,
+        description="これ以上のリスク（人名らしき表記など）ならNGワードがなくてもLLMに回す",
+    )
+    ng_celebrities: list[str] = Field(
+        default=["芸能人", "俳優", "女優", "タレント", "政治家", "首相", "総理", "大統領"],
+        description="有名人に関するNGワード（名前を追加する）",
+    )
+    ng_political: list[str] = Field(
+        default=[
+            "自民党",
+            "立憲民主党",
+            "公明党",
+            "共産党",
+            "維新の会",
+            "国民民主党",
+            "れいわ",
+            "参政党",
+            "社民党",
+            "政党",
+            "選挙",
+            "与党",
+            "野党",
+            "政権",
+        ],
+        description="政治に関するNGワード",
+    )
+    ng_religious: list[str] = Field(
+        default=["創価学会", "統一教会", "幸福の科学", "エホバ", "オウム", "宗教団体", "教祖"],
+        description="宗教に関するNGワード",
+    )
+
+
+class ModelRouteSettings(BaseModel):
+    """用途ごとのモデルと生成オプション（未指定の項目は既定値）"""
+
+    model: str | None = Field(default=None, description="使用するモデル（未指定ならOLLAMA_MODEL）")
+    num_ctx: int | None = Field(default=None, gt=0, description="コンテキスト長")
+    num_predict: int | None = Field(
+        default=None, gt=0, description="生成トークン数の上限（最大文字数からの見積もりより優先）"
+    )
+
+
+class LLMSettings(BaseSettings):
+    """LLM呼び出しの設定（環境変数は LLM_ で始まる）"""
+
+    model_config = {"env_prefix": "LLM_"}
+
+    # 同時に投げる生成リクエストの上限
+    max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Ollamaに同時に投げる生成リクエストの上限（サーバーのOLLAMA_NUM_PARALLELに合わせる）",
+    )
+
+    # プロバイダーの種類（ベンチマーク用の記録・再生・合成）
+    provider: str = Field(
+        default="ollama",
+        description="ollama: Ollamaで生成, record: 生成しつつカセットに記録, replay: カセットを再生, synthetic: 合成した文章",
+    )
+    cassette_file: Path = Field(
+        default=Path("npcs/data/llm_cassette.jsonl"),
+        description="record / replay で使うカセット（JSONL）",
+    )
+    replay_latency: bool = Field(
+        default=False,
+        description="replay で記録時のレイテンシを再現する",
+    )
+    synthetic_length: int = Field(
+        default=80,
+        gt=0,
+        description="synthetic で生成する文章の文字数",
+    )
+    synthetic_latency: float = Field(
+        default=0.0,
+        ge=0.0,
+        description="synthetic で1回の生成ごとに待つ秒数",
+    )
+
+    # 複数ホストへの振り分け
+    hosts: list[str] = Field(
+        default=[],
+        description="生成を振り分けるOllamaホストURLのリスト（空ならOLLAMA_HOSTの1台だけ使う）",
+    )
+    host_backoff_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        description="失敗したホストを外してから死活確認を再開するまでの最初の待ち時間（秒）",
+    )
+    host_max_backoff_seconds: float = Field(
+        default=600.0,
+        gt=0,
+        description="失敗が続いたときの待ち時間の上限（秒）",
+    )
+
+    # 用途ごとのモデルの振り分け
+    routes: dict[str, ModelRouteSettings] = Field(
+        default={},
+        description="用途（post, mumble, reply, review, summary）ごとのモデルと生成オプション",
+    )
+
+    # ストリーミングで受け取り、最大長に達したら生成を打ち切るか
+    stream: bool = Field(
+        default=True,
+        description="ストリーミングで生成し、最大長を超えた時点で打ち切る",
+    )
+
+    # 生成後もモデルをメモリに載せておく時間
+    keep_alive: str = Field(
+        default="30m",
+        description="生成後にOllamaがモデル（とプロンプトのKVキャッシュ）を保持する時間（例: 30m, 1h。負の値（-1m）で無期限）",
+    )
+
+    # 応答キャッシュ
+    cache_enabled: bool = Field(
+        default=True,
+        description="同じプロンプトへの応答をキャッシュして再利用する",
+    )
+    cache_file: Path = Field(
+        default=Path("npcs/data/llm_cache.db"),
+        description="応答キャッシュのSQLiteファイル",
+    )
+    cache_ttl_hours: dict[str, float] = Field(
+        default={"review": 168, "summary": 720},
+        description="用途ごとのキャッシュ有効期間（時間）。含まれない用途（post, reply）はキャッシュしない",
+    )
+    cache_max_bytes: int = Field(
+        default=50_000_000,
+        gt=0,
+        description="キャッシュする応答の合計サイズの上限（超えたら使われていないものから捨てる）",
+    )
+
+
+class PublishSettings(BaseSettings):
+    """MYPACE APIへの投稿の設定（環境変数は PUBLISH_ で始まる）"""
+
+    model_config = {"env_prefix": "PUBLISH_"}
+
+    http2: bool = Field(
+        default=False,
+        description='HTTP/2で接続する（要 h2: pip install "sinov[http2]"、なければHTTP/1.1）',
+    )
+    max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="同時に送るエントリーの上限（同じNPC・同じスレッドは順番に送る）",
+    )
+    max_connections: int = Field(
+        default=10,
+        ge=1,
+        description="同時に張る接続の上限",
+    )
+    max_keepalive_connections: int = Field(
+        default=10,
+        ge=0,
+        description="使い終わった後も張ったままにしておく接続の上限",
+    )
+    keepalive_expiry: float = Field(
+        default=30.0,
+        ge=0.0,
+        description="使っていない接続を閉じるまでの秒数",
+    )
+    timeout: float = Field(
+        default=30.0,
+        gt=0.0,
+        description="1回の送信のタイムアウト（秒）",
+    )
+    sign_workers: int = Field(
+        default=0,
+        ge=0,
+        description="まとめて署名するときのスレッド数（0ならコア数）",
+    )
+    retry_base_seconds: float = Field(
+        default=5.0,
+        gt=0.0,
+        description="送信に失敗したエントリーを送り直すまでの最初の待ち時間（失敗のたびに倍）",
+    )
+    retry_max_seconds: float = Field(
+        default=600.0,
+        gt=0.0,
+        description="送り直すまでの待ち時間の上限",
+    )
+    max_attempts: int = Field(
+        default=8,
+        ge=1,
+        description="これだけ送信に失敗したエントリーは送り直さずにrejectedに移す",
+    )
+    drain_interval_seconds: float = Field(
+        default=5.0,
+        gt=0.0,
+        description="tick中にアウトボックスを見に行く間隔",
+    )
+
+
 class Settings(BaseSettings):
     """アプリケーション全体の設定"""
 
@@ -168,18 +395,63 @@ class Settings(BaseSettings):
         default=Path("npcs/data"),
         description="共有データのディレクトリ",
     )
+    snapshot_cache_enabled: bool = Field(
+        default=True,
+        description="プロフィール・状態のパース結果をキャッシュして起動を速くするか",
+    )
+    snapshot_cache_file: Path = Field(
+        default=Path("npcs/data/world_snapshot.pickle"),
+        description="パース結果キャッシュのファイル",
+    )
     queue_dir: Path = Field(
         default=Path("npcs/data/queue"),
         description="キューファイルのディレクトリ",
     )
+    queue_backend: str = Field(
+        default="json",
+        description="キューの保存方式（json: ステータスごとのJSONファイル, sqlite: queue.db, journal: 追記型ジャーナル）",
+    )
+    queue_journal_compact_bytes: int = Field(
+        default=1_000_000,
+        description="journal方式でスナップショットに畳み込むジャーナルのサイズ（バイト）",
+    )
+    queue_hot_window_hours: int = Field(
+        default=72,
+        description="posted に残す時間幅（これより古いものは archive/ に移す、0で無効）",
+    )
+    queue_archive_compress: bool = Field(
+        default=False,
+        description="アーカイブをgzip圧縮（.json.gz）で保存するか",
+    )
     tick_state_file: Path = Field(
         default=Path("npcs/data/tick_state.json"),
         description="tick状態ファイルのパス",
     )
+    prompt_stats_file: Path = Field(
+        default=Path("npcs/data/prompt_stats.json"),
+        description="NPC・用途ごとのプロンプトサイズの集計ファイル",
+    )
+    outbox_file: Path = Field(
+        default=Path("npcs/data/outbox.db"),
+        description="署名済みで送信待ちのイベント（アウトボックス）",
+    )
+    llm_stats_file: Path = Field(
+        default=Path("npcs/data/llm_stats.jsonl"),
+        description="tickごとのLLM呼び出しの計測結果（1行1tick）",
+    )
+    llm_stats_max_ticks: int = Field(
+        default=200,
+        ge=1,
+        description="LLM呼び出しの計測結果を残すtickの数",
+    )
     relationships_dir: Path = Field(
         default=Path("npcs/data/relationships"),
         description="関係性ファイルのディレクトリ",
     )
+    affinity_store: str = Field(
+        default="json",
+        description="好感度の保存方式（json: NPCごとのJSON, matrix: affinity.npz、要numpy）",
+    )
     bulletin_dir: Path = Field(
         default=Path("npcs/data/bulletin_board"),
         description="掲示板ディレクトリ",
@@ -190,6 +462,7 @@ class Settings(BaseSettings):
         default="http://localhost:8787",
         description="MYPACE APIエンドポイント",
     )
+    publish: PublishSettings = Field(default_factory=PublishSettings)
 
     # 実行モード
     dry_run: bool = Field(
@@ -207,6 +480,12 @@ class Settings(BaseSettings):
         description="使用するOllamaモデル",
     )
 
+    # LLM呼び出し設定
+    llm: LLMSettings = Field(default_factory=LLMSettings)
+
+    # レビュー設定
+    review: ReviewSettings = Field(default_factory=ReviewSettings)
+
     # コンテンツ設定
     content: ContentSettings = Field(default_factory=ContentSettings)
 
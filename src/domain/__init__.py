@@ -10,7 +10,7 @@ from .activity_log import (
 )
 
 # --- コンテンツ生成 ---
-from .content import ContentStrategy
+from .content import ContentStrategy, PromptAssembler, PromptStats, estimate_tokens
 
 # --- 制作物 ---
 from .creative_works import CreativeWorksManager
@@ -82,6 +82,9 @@ from .relationships import (
     StalkerTarget,
 )
 
+# --- レビュー ---
+from .review import PreReviewer, PreReviewResult, ReviewJudge
+
 # --- スケジューラ ---
 from .scheduler import Scheduler
 
@@ -120,7 +123,13 @@ __all__ = [
     "NpcMemory",
     # スケジューラ・コンテンツ
     "Scheduler",
+    "ReviewJudge",
+    "PreReviewer",
+    "PreReviewResult",
     "ContentStrategy",
+    "PromptAssembler",
+    "PromptStats",
+    "estimate_tokens",
     # 制作物
     "CreativeWork",
     "CreativeWorks",
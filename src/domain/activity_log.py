@@ -5,7 +5,7 @@
 キャラ自身はこのログを入力として使用しない。
 """
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
@@ -55,6 +55,16 @@ class LogEntry:
     details: dict[str, Any] = field(default_factory=dict)  # 詳細情報
     parameter_changes: list[ParameterChange] = field(default_factory=list)
 
+    def to_dict(self) -> dict[str, Any]:
+        """機械可読な形式（JSONL用）に変換"""
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "event_type": self.event_type.value,
+            "summary": self.summary,
+            "details": self.details,
+            "parameter_changes": [asdict(change) for change in self.parameter_changes],
+        }
+
     def to_markdown(self) -> str:
         """Markdown形式に変換"""
         lines = []
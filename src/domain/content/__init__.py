@@ -3,6 +3,13 @@
 """
 
 from .content_processor import ContentProcessor
+from .prompt_assembler import (
+    AssembledPrompt,
+    PromptAssembler,
+    PromptSize,
+    PromptStats,
+    estimate_tokens,
+)
 from .prompt_builder import PromptBuilder
 from .strategy import ContentStrategy
 
@@ -10,4 +17,9 @@ __all__ = [
     "ContentStrategy",
     "PromptBuilder",
     "ContentProcessor",
+    "PromptAssembler",
+    "AssembledPrompt",
+    "PromptSize",
+    "PromptStats",
+    "estimate_tokens",
 ]
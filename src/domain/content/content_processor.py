@@ -4,6 +4,9 @@
 
 import re
 
+# 候補リストの番号（「[1] 本文」「1. 本文」「1: 本文」など）
+CANDIDATE_LINE_PATTERN = re.compile(r"^\s*[\[［]?(\d+)[\]］.．:：)）]\s*(.*)$")
+
 
 class ContentProcessor:
     """生成されたコンテンツの処理を担当"""
@@ -103,3 +106,30 @@ class ContentProcessor:
             content = truncated
 
         return content
+
+    @staticmethod
+    def split_candidates(response: str, count: int) -> list[str]:
+        """
+        番号付きの候補リストを1件ずつに分ける
+
+        番号は1から順に数え、続きの番号でない行は直前の候補の続きとして扱う（本文中の「2.」などで切らない）。
+        番号付きの行がひとつもなければ、応答全体を1つの候補とする。
+
+        Args:
+            response: LLMの応答
+            count: 頼んだ候補の数（これを超える番号は直前の候補の続き）
+
+        Returns:
+            候補のリスト（空の候補は含まない）
+        """
+        candidates: list[list[str]] = []
+        for line in response.splitlines():
+            match = CANDIDATE_LINE_PATTERN.match(line)
+            if match and int(match.group(1)) == len(candidates) + 1 <= count:
+                candidates.append([match.group(2)])
+            elif candidates:
+                candidates[-1].append(line)
+
+        if not candidates:
+            return [response.strip()] if response.strip() else []
+        return [text for lines in candidates if (text := "\n".join(lines).strip())]
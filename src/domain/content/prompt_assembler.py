@@ -0,0 +1,173 @@
+"""
+トークン予算つきのプロンプト組み立て
+
+プロンプトをセクション（文体・ニュース・過去の投稿など）に分けて積み、
+見積もったトークン数が予算を超えたら優先度の低いセクションから削る。
+CPU推論ではプロンプトの長さがそのまま読み込み（prefill）の時間になるので、長さに上限を設ける。
+"""
+
+from dataclasses import dataclass, field
+
+from pydantic import BaseModel, Field
+
+# 削らないセクションの優先度
+REQUIRED = 1_000_000
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    トークン数を見積もる（トークナイザーを使わない概算）
+
+    日本語などASCII以外は1文字≒1トークン、ASCIIは4文字≒1トークンとして数える。
+    """
+    ascii_chars = sum(1 for c in text if c.isascii())
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+
+@dataclass
+class PromptSection:
+    """プロンプトの1セクション"""
+
+    name: str
+    parts: list[str]  # 削るときは先頭（古いもの）から1つずつ外す
+    priority: int = REQUIRED  # 小さいほど先に削る
+    prefix: str = ""  # partsが残っているときだけ付ける見出し
+    suffix: str = ""
+
+    def render(self) -> str:
+        """セクションの文字列（partsが空なら空文字列）"""
+        if not self.parts:
+            return ""
+        return self.prefix + "".join(self.parts) + self.suffix
+
+
+@dataclass
+class AssembledPrompt:
+    """組み立てたプロンプトとそのサイズ"""
+
+    text: str
+    tokens: int
+    budget: int
+    section_tokens: dict[str, int] = field(default_factory=dict)
+    trimmed: list[str] = field(default_factory=list)  # 削ったセクション（一部だけでも）
+
+    @property
+    def over_budget(self) -> bool:
+        """必須セクションだけで予算を超えているか"""
+        return self.budget > 0 and self.tokens > self.budget
+
+
+class PromptAssembler:
+    """セクションを積んで、予算内のプロンプトにする"""
+
+    def __init__(self, budget: int = 0):
+        """
+        Args:
+            budget: トークン数の上限（0なら削らない）
+        """
+        self.budget = budget
+        self.sections: list[PromptSection] = []
+
+    def add(self, name: str, text: str, priority: int = REQUIRED) -> None:
+        """セクションを追加（空文字列なら何もしない）"""
+        if text:
+            self.sections.append(PromptSection(name, [text], priority))
+
+    def add_items(
+        self,
+        name: str,
+        items: list[str],
+        priority: int,
+        prefix: str = "",
+        suffix: str = "",
+    ) -> None:
+        """
+        項目のリストを1セクションとして追加（予算が足りなければ先頭の項目から削る）
+
+        Args:
+            name: セクション名
+            items: 項目（古いものから順に）
+            priority: 優先度（小さいほど先に削る）
+            prefix: 見出し（項目が1つも残らなければ付けない）
+            suffix: 末尾の文
+        """
+        if items:
+            self.sections.append(PromptSection(name, list(items), priority, prefix, suffix))
+
+    def build(self) -> AssembledPrompt:
+        """予算に収まるまで優先度の低いセクションを削り、追加した順に連結する"""
+        sizes = {id(s): estimate_tokens(s.render()) for s in self.sections}
+        total = sum(sizes.values())
+        trimmed: list[str] = []
+
+        if self.budget > 0 and total > self.budget:
+            trimmable = [s for s in self.sections if s.priority < REQUIRED]
+            for section in sorted(trimmable, key=lambda s: s.priority):
+                if total <= self.budget:
+                    break
+                while total > self.budget and section.parts:
+                    section.parts.pop(0)
+                    size = estimate_tokens(section.render())
+                    total -= sizes[id(section)] - size
+                    sizes[id(section)] = size
+                trimmed.append(section.name)
+
+        text = "".join(s.render() for s in self.sections)
+        section_tokens: dict[str, int] = {}
+        for section in self.sections:
+            if section.parts:
+                section_tokens[section.name] = (
+                    section_tokens.get(section.name, 0) + sizes[id(section)]
+                )
+        return AssembledPrompt(text, estimate_tokens(text), self.budget, section_tokens, trimmed)
+
+
+class PromptSize(BaseModel):
+    """プロンプトサイズの集計（1NPC・1用途分）"""
+
+    count: int = Field(default=0, ge=0, description="プロンプトの数")
+    total_tokens: int = Field(default=0, ge=0, description="トークン数の合計")
+    max_tokens: int = Field(default=0, ge=0, description="最大のトークン数")
+    last_tokens: int = Field(default=0, ge=0, description="最後のトークン数")
+    trimmed: int = Field(default=0, ge=0, description="予算に合わせて削った回数")
+
+    @property
+    def avg_tokens(self) -> float:
+        """平均のトークン数"""
+        return self.total_tokens / self.count if self.count else 0.0
+
+    def add(self, prompt: AssembledPrompt) -> None:
+        """1件分を加える"""
+        self.count += 1
+        self.total_tokens += prompt.tokens
+        self.max_tokens = max(self.max_tokens, prompt.tokens)
+        self.last_tokens = prompt.tokens
+        if prompt.trimmed:
+            self.trimmed += 1
+
+    def merge(self, other: "PromptSize") -> None:
+        """別の集計を足し込む（otherの方が新しい）"""
+        self.count += other.count
+        self.total_tokens += other.total_tokens
+        self.max_tokens = max(self.max_tokens, other.max_tokens)
+        self.last_tokens = other.last_tokens or self.last_tokens
+        self.trimmed += other.trimmed
+
+
+class PromptStats(BaseModel):
+    """NPC・用途ごとのプロンプトサイズ"""
+
+    npcs: dict[int, dict[str, PromptSize]] = Field(
+        default_factory=dict, description="NPC ID → 用途 → 集計"
+    )
+
+    def record(self, npc_id: int, purpose: str, prompt: AssembledPrompt) -> None:
+        """組み立てたプロンプトのサイズを記録"""
+        self.npcs.setdefault(npc_id, {}).setdefault(purpose, PromptSize()).add(prompt)
+
+    def merge(self, other: "PromptStats") -> None:
+        """別の集計を足し込む"""
+        for npc_id, purposes in other.npcs.items():
+            mine = self.npcs.setdefault(npc_id, {})
+            for purpose, size in purposes.items():
+                mine.setdefault(purpose, PromptSize()).merge(size)
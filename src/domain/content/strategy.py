@@ -11,19 +11,37 @@ from ..memory import NpcMemory
 from ..models import HabitType, NpcProfile, NpcState, Prompts, StyleType
 from ..queue import ConversationContext, ReplyTarget
 from .content_processor import ContentProcessor
+from .prompt_assembler import PromptAssembler, PromptStats
 from .prompt_builder import PromptBuilder
 
 # 連作を開始する確率
 SERIES_START_PROBABILITY = 0.2
 
+# プロンプトのセクションの優先度（トークン予算を超えたら小さいものから削る）
+# （前半の共通ルール・人物設定は削らない）
+PRIORITY_INTERESTS = 20
+PRIORITY_REJECTIONS = 30
+PRIORITY_EXPERIENCES = 40
+PRIORITY_HISTORY = 50
+PRIORITY_NEWS = 60
+PRIORITY_CONTINUATION = 70
+PRIORITY_REPLY_HISTORY = 50
+
 
 class ContentStrategy:
     """投稿コンテンツの生成戦略（ファサード）"""
 
-    def __init__(self, settings: ContentSettings):
+    def __init__(self, settings: ContentSettings, common_prompts: Prompts | None = None):
+        """
+        Args:
+            settings: コンテンツ生成の設定
+            common_prompts: 全員共通のプロンプト（_common.yaml）。プロンプトの先頭に置く
+        """
         self.settings = settings
+        self.common_prompts = common_prompts or Prompts()
         self.prompt_builder = PromptBuilder()
         self.processor = ContentProcessor()
+        self.prompt_stats = PromptStats()  # 組み立てたプロンプトのサイズ（NPC・用途ごと）
 
     def create_prompt(
         self,
@@ -35,34 +53,22 @@ class ContentStrategy:
         merged_prompts: Prompts | None = None,
         rejected_posts: list[dict[str, str]] | None = None,
     ) -> str:
-        """LLM用のプロンプトを生成"""
+        """
+        LLM用のプロンプトを生成
+
+        NPCごとに毎回同じ前半（共通ルール・人物設定・投稿の条件）を先に置き、
+        テーマ・文脈など呼び出しごとに変わる部分はその後ろに置く。
+        トークン予算を超えたら、後半の優先度の低いセクションから削る。
+        """
         if memory and memory.series.active:
             return self._create_series_prompt(profile, memory, merged_prompts)
 
         topic = self._select_topic(profile, state, memory, event_topics)
         recent_posts = memory.recent_posts if memory else state.post_history
+        assembler = PromptAssembler(self.settings.prompt_token_budget.get("post", 0))
 
-        # コンテキスト情報を収集（記者NPCは必ずニュースを参照）
-        context = self._build_topic_context(
-            memory, recent_posts, shared_news, topic, force_news=profile.is_backend
-        )
-        history_constraint = self._build_history_constraint(recent_posts)
-
-        # スタイル指示を収集
-        style = self.prompt_builder.get_style_instruction(profile.style)
-        dialect = self.prompt_builder.get_dialect_instruction(profile.dialect)
-        dialect_section = f"\n- {dialect}" if dialect else ""
-        prefs = self.prompt_builder.get_preferences_context(profile.interests)
-        prefs_section = f"\n\n【この人の好み】\n{prefs}" if prefs else ""
-
-        # 追加指示を収集
-        instructions = (
-            self.prompt_builder.get_prompt_instructions(merged_prompts)
-            + self.prompt_builder.get_habit_instructions(profile.habits)
-            + self.prompt_builder.get_writing_style_instructions(profile.writing_style)
-            + history_constraint
-            + self.prompt_builder.get_rejection_feedback(rejected_posts)
-        )
+        # --- 前半（NPCごとに固定） ---
+        self._add_static_prefix(assembler, profile, merged_prompts)
 
         # Markdown対応の場合は長めの文章もOK
         if profile.behavior.use_markdown or profile.behavior.use_code_blocks:
@@ -71,27 +77,106 @@ class ContentStrategy:
             length_hint = "- 1文か2文の短い文"
 
         # 絵文字制限（おじさん構文とemoji_heavy以外は控えめに）
-        emoji_rule = "- 絵文字は基本的に使わない（使っても1つまで）"
+        emoji_rule = "\n- 絵文字は基本的に使わない（使っても1つまで）"
         if profile.style == StyleType.OJISAN or HabitType.EMOJI_HEAVY in (profile.habits or []):
             emoji_rule = ""
 
-        return f"""以下の条件でSNS投稿を1つ書け:
+        assembler.add(
+            "rules",
+            f"""
 
-テーマ: {topic}{context}
-文字数: 最大{profile.behavior.post_length_max}文字
-
-【文体】
-{style}{dialect_section}{prefs_section}
-
-【条件】
+【投稿の条件】
 - 必ず日本語で書け（中国語は絶対に使うな）
-{length_hint}
-{emoji_rule}
+{length_hint}{emoji_rule}
 - 「〜だよね？」「〜ですよね！」「ワクワク」など、やらせっぽい前向きな表現は避ける
 - 自然な独り言のように書く
-{instructions}
+- 文字数: 最大{profile.behavior.post_length_max}文字""",
+        )
+
+        # --- 後半（呼び出しごとに変わる） ---
+        assembler.add("header", f"\n\n上の条件でSNS投稿を1つ書け:\n\nテーマ: {topic}")
 
-投稿:"""
+        # コンテキスト情報を収集（記者NPCは必ずニュースを参照）
+        self._add_topic_context(
+            assembler, memory, recent_posts, shared_news, topic, force_news=profile.is_backend
+        )
+        self._add_history_constraint(assembler, recent_posts)
+        assembler.add(
+            "rejections",
+            self.prompt_builder.get_rejection_feedback(rejected_posts),
+            PRIORITY_REJECTIONS,
+        )
+
+        assembler.add("footer", "\n\n投稿:")
+        return self._finish(profile.id, "post", assembler)
+
+    def _add_static_prefix(
+        self, assembler: PromptAssembler, profile: NpcProfile, merged_prompts: Prompts | None
+    ) -> None:
+        """
+        プロンプトの前半（共通ルール → 人物設定）を追加
+
+        同じNPCなら用途（投稿・連作・リプライ）によらず毎回同じ文字列になり、共通ルールは全員で同じ。
+        LLMサーバーは先頭が一致する分の読み込み（KVキャッシュ）を使い回せるので、
+        呼び出しごとに変わる内容はこの後ろに置く。予算が足りなくてもここは削らない
+        （削り方で前半が変わるとキャッシュが効かなくなる）。
+        """
+        common, personal = self._split_prompts(merged_prompts)
+
+        # 共通ルール（_common.yaml）
+        common_rules = self.prompt_builder.get_prompt_instructions(common)
+        if common_rules:
+            assembler.add("common", f"【全員共通のルール】\n{common_rules}\n\n")
+
+        # 人物設定
+        style = self.prompt_builder.get_style_instruction(profile.style)
+        dialect = self.prompt_builder.get_dialect_instruction(profile.dialect)
+        dialect_section = f"\n- {dialect}" if dialect else ""
+        assembler.add(
+            "persona", f"あなたは{profile.name}です。\n\n【文体】\n{style}{dialect_section}"
+        )
+        if profile.interests.topics:
+            assembler.add(
+                "interests", "\n\n【興味・専門】\n" + "、".join(profile.interests.topics[:5])
+            )
+        prefs = self.prompt_builder.get_preferences_context(profile.interests)
+        if prefs:
+            assembler.add("preferences", f"\n\n【この人の好み】\n{prefs}")
+        habits = self.prompt_builder.get_habit_instructions(profile.habits)
+        if habits:
+            assembler.add("habits", f"\n{habits}")
+        writing_style = self.prompt_builder.get_writing_style_instructions(profile.writing_style)
+        if writing_style:
+            assembler.add("writing_style", f"\n{writing_style}")
+
+        # 個人のプロンプト
+        personal_rules = self.prompt_builder.get_prompt_instructions(personal)
+        if personal_rules:
+            assembler.add("prompts", f"\n\n【この人のルール】\n{personal_rules}")
+
+    def _split_prompts(self, merged_prompts: Prompts | None) -> tuple[Prompts, Prompts]:
+        """マージ済みプロンプトを共通と個人に分ける（共通が先頭に並んでいなければ全部個人）"""
+        if not merged_prompts:
+            return Prompts(), Prompts()
+
+        common = self.common_prompts
+        n_pos, n_neg = len(common.positive), len(common.negative)
+        if (n_pos or n_neg) and (
+            merged_prompts.positive[:n_pos] == common.positive
+            and merged_prompts.negative[:n_neg] == common.negative
+        ):
+            personal = Prompts(
+                positive=merged_prompts.positive[n_pos:],
+                negative=merged_prompts.negative[n_neg:],
+            )
+            return common, personal
+        return Prompts(), merged_prompts
+
+    def _finish(self, npc_id: int, purpose: str, assembler: PromptAssembler) -> str:
+        """プロンプトを組み立て、サイズを記録して返す"""
+        prompt = assembler.build()
+        self.prompt_stats.record(npc_id, purpose, prompt)
+        return prompt.text
 
     def _select_topic(
         self,
@@ -108,21 +193,24 @@ class ContentStrategy:
             all_topics += event_topics
         return random.choice(all_topics) if all_topics else "プログラミング"
 
-    def _build_topic_context(
+    def _add_topic_context(
         self,
+        assembler: PromptAssembler,
         memory: NpcMemory | None,
         recent_posts: list[str],
         shared_news: list[str] | None,
         topic: str,
         force_news: bool = False,
-    ) -> str:
-        """トピック関連のコンテキストを構築"""
-        parts: list[str] = []
-
+    ) -> None:
+        """トピック関連のコンテキストを追加"""
         # 前回投稿との文脈継続
         if recent_posts and random.random() < self.settings.context_continuation_probability:
             last = recent_posts[-1]
-            parts.append(f'\n前回の投稿: "{last}"\n→ この流れを続けるか、関連した話題にする')
+            assembler.add(
+                "continuation",
+                f'\n前回の投稿: "{last}"\n→ この流れを続けるか、関連した話題にする',
+                PRIORITY_CONTINUATION,
+            )
 
         # 共有ニュースの参照（記者は必ず参照）
         should_ref_news = force_news or random.random() < self.settings.news_reference_probability
@@ -130,41 +218,49 @@ class ContentStrategy:
             news = random.choice(shared_news)
             if force_news:
                 # 記者の場合は必須として指示
-                parts.append(
+                assembler.add(
+                    "news",
                     f"\n【あなたが集めたニュース】\n{news}\n"
                     "→ このニュースについて感想を述べよ\n"
-                    "→ 記事のURL（https://...）を必ず投稿に含めること"
+                    "→ 記事のURL（https://...）を必ず投稿に含めること",
                 )
             else:
-                parts.append(
+                assembler.add(
+                    "news",
                     f"\n最近のニュース: {news}\n"
                     "→ このニュースに関連した感想や話題を書いてもよい\n"
-                    "→ ニュースを参考にした場合は、記事のURL（https://...）を投稿に含めること"
+                    "→ ニュースを参考にした場合は、記事のURL（https://...）を投稿に含めること",
+                    PRIORITY_NEWS,
                 )
 
         # 短期記憶から興味を取得
         if memory and memory.short_term:
             active = memory.get_active_interests()[:3]
             if active:
-                parts.append("\n最近興味があること: " + "、".join(active))
+                assembler.add(
+                    "active_interests",
+                    "\n最近興味があること: " + "、".join(active),
+                    PRIORITY_INTERESTS,
+                )
 
         # 長期記憶から関連する経験
         if memory and memory.long_term_acquired:
             relevant = memory.get_relevant_long_term(topic, limit=2)
             if relevant:
-                parts.append("\n過去の経験: " + "、".join(relevant))
-
-        return "".join(parts)
+                assembler.add(
+                    "experiences", "\n過去の経験: " + "、".join(relevant), PRIORITY_EXPERIENCES
+                )
 
-    def _build_history_constraint(self, recent_posts: list[str]) -> str:
-        """過去投稿の制約を構築"""
+    def _add_history_constraint(self, assembler: PromptAssembler, recent_posts: list[str]) -> None:
+        """過去投稿の制約を追加（予算が足りなければ古い投稿から削る）"""
         check_posts = recent_posts[-self.settings.history_check_count :] if recent_posts else []
-        if not check_posts:
-            return ""
-        constraint = "\n\n過去の投稿:\n" + "\n".join(f"- {p}" for p in check_posts)
-        return (
-            constraint + "\n\n⚠️ 上記と同じ内容・似た内容・同じ表現は絶対に使うな。"
-            "新しい切り口や別のトピックで書け"
+        assembler.add_items(
+            "history",
+            [f"\n- {p}" for p in check_posts],
+            PRIORITY_HISTORY,
+            prefix="\n\n過去の投稿:",
+            suffix="\n\n⚠️ 上記と同じ内容・似た内容・同じ表現は絶対に使うな。"
+            "新しい切り口や別のトピックで書け",
         )
 
     def _create_series_prompt(
@@ -173,47 +269,45 @@ class ContentStrategy:
         memory: NpcMemory,
         merged_prompts: Prompts | None = None,
     ) -> str:
-        """連作つぶやき用のプロンプトを生成"""
+        """連作つぶやき用のプロンプトを生成（前半は通常投稿と同じ）"""
         series = memory.series
         idx = series.current_index + 1
         total = series.total_planned
+        assembler = PromptAssembler()
 
-        # これまでの投稿を文脈として渡す
-        previous_posts = "\n".join(f"{i+1}投稿目: {p}" for i, p in enumerate(series.posts))
+        # --- 前半（NPCごとに固定） ---
+        self._add_static_prefix(assembler, profile, merged_prompts)
+        assembler.add(
+            "rules",
+            f"""
 
-        # 文体スタイル
-        style_instruction = self.prompt_builder.get_style_instruction(profile.style)
-        dialect = self.prompt_builder.get_dialect_instruction(profile.dialect)
-        dialect_section = f"\n- {dialect}" if dialect else ""
+【連作の条件】
+- 必ず日本語で書け
+- 前の投稿と関連した続きを書く
+- 「N/N投稿目」「N投稿目」などの番号を本文に書くな
+- 絵文字は基本的に使わない（使っても1つまで）
+- 「〜だよね？」「ワクワク」など不自然に前向きな表現は避ける
+- 文字数: 最大{profile.behavior.post_length_max}文字""",
+        )
 
-        # プロンプト（positive/negative）
-        prompt_instructions = self.prompt_builder.get_prompt_instructions(merged_prompts)
+        # --- 後半（呼び出しごとに変わる） ---
+        # これまでの投稿を文脈として渡す
+        previous_posts = "\n".join(f"{i+1}投稿目: {p}" for i, p in enumerate(series.posts))
+        assembler.add(
+            "series",
+            f"""
 
-        prompt = f"""連作つぶやきの続きを書け:
+連作つぶやきの続きを書け:
 
 テーマ: {series.theme}
-現在: {idx}/{total}投稿目
+現在: {idx}/{total}投稿目（{idx}投稿目らしい展開にする）
 
 これまでの投稿:
 {previous_posts if previous_posts else "(まだなし - 1投稿目)"}
 
-文字数: 最大{profile.behavior.post_length_max}文字
-
-【文体】
-{style_instruction}{dialect_section}
-
-条件:
-- 必ず日本語で書け
-- 前の投稿と関連した続きを書く
-- {idx}投稿目らしい展開にする
-- 「N/N投稿目」「N投稿目」などの番号を本文に書くな
-- 絵文字は基本的に使わない（使っても1つまで）
-- 「〜だよね？」「ワクワク」など不自然に前向きな表現は避ける
-{prompt_instructions}
-
-{idx}投稿目:"""
-
-        return prompt
+{idx}投稿目:""",
+        )
+        return self._finish(profile.id, "post", assembler)
 
     def should_start_series(self) -> bool:
         """連作を開始すべきか判定"""
@@ -226,6 +320,21 @@ class ContentStrategy:
         total = random.randint(2, 5)
         return theme, total
 
+    def create_candidates_prompt(self, prompt: str, count: int) -> str:
+        """投稿1つ分のプロンプトを、候補をcount個まとめて書かせるプロンプトにする"""
+        # 末尾の「投稿:」「N投稿目:」を外して、候補の書き方を付け足す
+        body = prompt.rstrip().rsplit("\n", 1)[0].rstrip()
+        return f"""{body}
+
+上の条件で、内容の違う投稿の候補を{count}つ書け。
+1つごとに「[番号] 本文」の形で書き、説明や前置きは書くな。
+
+候補:"""
+
+    def split_candidates(self, response: str, count: int) -> list[str]:
+        """番号付きの候補リストを1件ずつに分ける"""
+        return self.processor.split_candidates(response, count)
+
     def clean_content(
         self, content: str, use_markdown: bool = False, use_code_blocks: bool = False
     ) -> str:
@@ -256,72 +365,71 @@ class ContentStrategy:
         affinity: float = 0.0,
         merged_prompts: Prompts | None = None,
     ) -> str:
-        """リプライ用のプロンプトを生成"""
-        depth = conversation.depth if conversation else 1
-
-        # 会話履歴を構築
-        history_text = ""
-        if conversation and conversation.history:
-            history_lines = []
-            for h in conversation.history[-5:]:  # 最新5件
-                history_lines.append(f"  {h['author']}: {h['content']}")
-            history_text = "\n".join(history_lines)
+        """
+        リプライ用のプロンプトを生成
 
-        # 締めを促すかどうか
-        closing_hint = ""
-        if depth >= 3:
-            closing_hint = "\n- そろそろ会話を締めてもよい（短い返事で）"
-        elif depth >= 2:
-            closing_hint = "\n- 長くなりすぎないように"
+        前半は投稿と同じ（共通ルール・人物設定）で、相手の投稿や会話の流れは後ろに置く。
+        トークン予算を超えたら、古い会話履歴から削る。
+        """
+        depth = conversation.depth if conversation else 1
+        assembler = PromptAssembler(self.settings.prompt_token_budget.get("reply", 0))
 
-        # 文体スタイル
-        style_instruction = self.prompt_builder.get_style_instruction(profile.style)
-        dialect = self.prompt_builder.get_dialect_instruction(profile.dialect)
-        dialect_section = f"\n- {dialect}" if dialect else ""
+        # --- 前半（NPCごとに固定） ---
+        self._add_static_prefix(assembler, profile, merged_prompts)
+        assembler.add(
+            "rules",
+            """
 
-        # 文章スタイルの癖
-        writing_style_instructions = self.prompt_builder.get_writing_style_instructions(
-            profile.writing_style
+【返信のルール】
+- 相手の投稿をよく読み、内容を踏まえて返信する
+- 自分の興味・専門と絡められる場合は自然に絡める
+- 短めに（20〜80文字程度）
+- 必ず日本語で書く（中国語は絶対に使うな）
+- 絵文字は基本的に使わない（使っても1つまで）
+- 「〜だよね？」「〜ですよね！」など不自然に前向きな表現は避ける""",
         )
 
-        # 禁止事項（negativeプロンプトのみ使用）
-        negative_instructions = ""
-        if merged_prompts and merged_prompts.negative:
-            negative_instructions = "\n- " + "\n- ".join(merged_prompts.negative[:5])
-
-        # 自分の興味・専門分野
-        my_interests = ""
-        if profile.interests.topics:
-            my_interests = "、".join(profile.interests.topics[:5])
+        # --- 後半（呼び出しごとに変わる） ---
+        assembler.add(
+            "header",
+            f"""
 
-        prompt = f"""あなたは{profile.name}です。リプライを書いてください。
+リプライを書いてください。
 
 【相手の投稿】
 {reply_to.content}
 
-【会話の流れ】
-{history_text if history_text else "  (最初のリプライ)"}
-
-【相手との関係】
-関係: {relationship_type}
+【会話の流れ】""",
+        )
 
-【あなたの興味・専門】
-{my_interests}
+        # 会話履歴（最新5件）
+        history = conversation.history[-5:] if conversation else []
+        if history:
+            assembler.add_items(
+                "conversation",
+                [f"\n  {h['author']}: {h['content']}" for h in history],
+                PRIORITY_REPLY_HISTORY,
+            )
+        else:
+            assembler.add("conversation", "\n  (最初のリプライ)")
 
-【文体】
-{style_instruction}{dialect_section}
+        # 締めを促すかどうか
+        closing_hint = ""
+        if depth >= 3:
+            closing_hint = "\n- そろそろ会話を締めてもよい（短い返事で）"
+        elif depth >= 2:
+            closing_hint = "\n- 長くなりすぎないように"
 
-【返信のルール】
-- 相手の投稿をよく読み、内容を踏まえて返信する
-- 自分の興味・専門と絡められる場合は自然に絡める
-- 短めに（20〜80文字程度）
-- 必ず日本語で書く（中国語は絶対に使うな）
-- 絵文字は基本的に使わない（使っても1つまで）
-- 「〜だよね？」「〜ですよね！」など不自然に前向きな表現は避ける{closing_hint}{negative_instructions}{writing_style_instructions}
+        assembler.add(
+            "relationship",
+            f"""
 
-返信:"""
+【相手との関係】
+関係: {relationship_type}{closing_hint}""",
+        )
 
-        return prompt
+        assembler.add("footer", "\n\n返信:")
+        return self._finish(profile.id, "reply", assembler)
 
     def create_mumble_prompt(
         self,
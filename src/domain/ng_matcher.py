@@ -0,0 +1,72 @@
+"""
+NGワードの一括照合（Aho-Corasick法）
+
+複数のNGワードを1つのオートマトンにまとめ、投稿を1回なめるだけで全ワードの出現を見つける。
+ワード数が増えても照合の手間は投稿の長さにほぼ比例する。
+英字は大文字・小文字を区別しない。
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+
+class NgWordMatcher:
+    """複数パターンの同時照合"""
+
+    def __init__(self, words: Iterable[str]):
+        # ノードごとの遷移・失敗リンク・そのノードで終わるワード
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[str]] = [[]]
+
+        for word in words:
+            if word:
+                self._add(word.lower())
+        self._build_fail_links()
+
+    def _add(self, word: str) -> None:
+        """トライにワードを追加"""
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        if word not in self._output[node]:
+            self._output[node].append(word)
+
+    def _build_fail_links(self) -> None:
+        """幅優先で失敗リンクを張り、失敗先で終わるワードも出力に含める"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> list[str]:
+        """
+        テキストに含まれるワードをすべて取得
+
+        Args:
+            text: 照合するテキスト
+
+        Returns:
+            見つかったワード（出現順、重複あり）
+        """
+        found: list[str] = []
+        node = 0
+        for char in text.lower():
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            found.extend(self._output[node])
+        return found
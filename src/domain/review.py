@@ -0,0 +1,210 @@
+"""
+投稿レビュー（NGルールのプロンプトとLLMの回答の判定）
+
+1件ずつのレビューと、複数件を番号付きで1回のプロンプトにまとめるバッチレビューの両方を扱う。
+LLMに渡す前に、NGワードの照合と簡単なリスク判定で明らかに問題ない投稿を振り分ける（事前レビュー）。
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from .ng_matcher import NgWordMatcher
+
+# (承認されたか, 理由)
+Verdict = tuple[bool, str | None]
+
+NG_RULES = """NGワード:
+- 実在の有名人の名前（田中太郎、山田花子など）
+- 政党名、宗教団体名
+- 「死ね」「殺す」などの暴力的な言葉
+
+OKなもの:
+- 技術用語（Python, React, AIなど）
+- ゲーム名、アニメ名
+- 普通の日常会話"""
+
+# バッチの回答1行（例: "3: NG 実在の有名人" / "[3] OK"）
+BATCH_LINE_PATTERN = re.compile(
+    r"^\s*\[?(\d+)\]?\s*[:：.)．、]?\s*(OK|NG)\s*[:：\-ー、]?\s*(.*)$", re.IGNORECASE
+)
+
+
+class ReviewJudge:
+    """レビュー用プロンプトの作成とLLMの回答の判定"""
+
+    # NGの回答にこれらの言及があるときだけNGとする
+    NG_KEYWORDS = ["実在", "有名人", "政治", "宗教", "暴力", "死ね", "殺"]
+
+    CONTENT_PREVIEW_LENGTH = 200  # プロンプトに含める投稿の最大文字数
+
+    @classmethod
+    def create_prompt(cls, content: str) -> str:
+        """1件レビュー用のプロンプトを作成"""
+        return f"""この投稿にNGワードがあるか？
+
+投稿: {content[: cls.CONTENT_PREVIEW_LENGTH]}
+
+{NG_RULES}
+
+回答は「OK」か「NG」の一言だけ。
+"""
+
+    @classmethod
+    def judge(cls, response: str) -> Verdict:
+        """
+        1件レビューの回答を判定
+
+        Args:
+            response: LLMの回答
+
+        Returns:
+            (is_approved, reason): 承認されたかどうかと理由
+        """
+        response = response.strip().upper()
+
+        # 明確にNGと判定された場合のみNG（具体的な理由がある場合）
+        # 「NG」だけでなく、NGワードに関する具体的な言及があればNG
+        if "NG" in response and cls._has_ng_reason(response):
+            return False, response[:100]
+
+        # それ以外はすべてOK（デフォルトOK）
+        return True, None
+
+    @classmethod
+    def create_batch_prompt(cls, contents: list[str]) -> str:
+        """複数件をまとめてレビューするプロンプトを作成（番号は1から）"""
+        posts = "\n".join(
+            f"[{i}] {content[: cls.CONTENT_PREVIEW_LENGTH]}".replace("\n", " ")
+            for i, content in enumerate(contents, start=1)
+        )
+        return f"""以下の{len(contents)}件の投稿それぞれにNGワードがあるか？
+
+{posts}
+
+{NG_RULES}
+
+1件につき1行で「番号: OK」か「番号: NG 理由」の形式で答える。
+例:
+1: OK
+2: NG 実在の有名人の名前
+"""
+
+    @classmethod
+    def parse_batch(cls, response: str, count: int) -> dict[int, Verdict]:
+        """
+        バッチレビューの回答を判定
+
+        番号が範囲外の行や、同じ番号で判定が食い違う行は無視する。
+
+        Args:
+            response: LLMの回答
+            count: レビューした件数
+
+        Returns:
+            番号（0始まり）→ 判定。判定を読み取れなかった番号は含まない
+        """
+        verdicts: dict[int, Verdict] = {}
+        conflicts: set[int] = set()
+
+        for line in response.splitlines():
+            match = BATCH_LINE_PATTERN.match(line)
+            if not match:
+                continue
+
+            index = int(match.group(1)) - 1
+            if not 0 <= index < count:
+                continue
+
+            answer = match.group(2).upper()
+            reason = match.group(3).strip()
+            if answer == "NG" and cls._has_ng_reason(reason):
+                verdict: Verdict = (False, f"NG {reason}"[:100])
+            else:
+                verdict = (True, None)
+
+            previous = verdicts.get(index)
+            if previous is not None and previous[0] != verdict[0]:
+                conflicts.add(index)
+            verdicts.setdefault(index, verdict)
+
+        for index in conflicts:
+            del verdicts[index]
+        return verdicts
+
+    @classmethod
+    def _has_ng_reason(cls, text: str) -> bool:
+        """NGの具体的な理由が書かれているか"""
+        return any(kw in text for kw in cls.NG_KEYWORDS)
+
+
+@dataclass
+class PreReviewResult:
+    """事前レビューの結果"""
+
+    hits: list[tuple[str, str]] = field(default_factory=list)  # (カテゴリ, ワード)
+    risk: float = 0.0
+    auto_approved: bool = False
+
+
+class PreReviewer:
+    """NGワードの照合とリスク判定で、LLMに回すまでもない投稿を承認する"""
+
+    # 人名らしき表記とリスクの重み（しきい値の既定値0.5以上なら、それだけでLLMに回す）
+    # 肩書きや敬称がなくても、固有名詞らしき語が主語・所有格になっていれば人名として扱う
+    # （「今日の」などの2文字の漢字は拾わない。拾いすぎてもLLMに回るだけで安全側）
+    RISK_PATTERNS: list[tuple[re.Pattern[str], float]] = [
+        (re.compile(r"[一-龥ァ-ヶ]{2,}(首相|総理|大臣|議員|知事|大統領|容疑者|被告)"), 0.6),
+        (re.compile(r"[一-龥]{2,}(さん|氏|選手|監督|先生)"), 0.5),
+        (re.compile(r"[一-龥]{3,}(が|の|って|は|も|と)"), 0.5),
+        (re.compile(r"[ァ-ヶ][ァ-ヶー]{2,}(が|の|って|は|も|と)"), 0.5),
+    ]
+
+    def __init__(self, terms: dict[str, list[str]], risk_threshold: float = 0.5):
+        """
+        Args:
+            terms: カテゴリ → NGワードのリスト（レビューのNGキーワードは常に含む）
+            risk_threshold: これ以上のリスクならNGワードがなくてもLLMに回す
+        """
+        self.risk_threshold = risk_threshold
+        self._categories: dict[str, str] = {}
+        for category, words in {"keyword": ReviewJudge.NG_KEYWORDS, **terms}.items():
+            for word in words:
+                self._categories.setdefault(word.lower(), category)
+        self._matcher = NgWordMatcher(self._categories)
+
+        self.auto_approved = 0
+        self.escalated = 0
+
+    def check(self, content: str) -> PreReviewResult:
+        """
+        投稿を事前レビュー
+
+        NGワードが1つもなく、リスクがしきい値未満なら自動承認する。
+        NGワードがあっても却下はせず、LLMのレビューに回す（「殺虫剤」なども拾うため）。
+
+        Args:
+            content: 投稿内容
+
+        Returns:
+            照合結果とリスク、自動承認したかどうか
+        """
+        hits = [(self._categories[word], word) for word in self._matcher.find_all(content)]
+        risk = min(
+            1.0, sum(weight for pattern, weight in self.RISK_PATTERNS if pattern.search(content))
+        )
+        auto_approved = not hits and risk < self.risk_threshold
+
+        if auto_approved:
+            self.auto_approved += 1
+        else:
+            self.escalated += 1
+        return PreReviewResult(hits=hits, risk=risk, auto_approved=auto_approved)
+
+    def report(self) -> str:
+        """自動承認（省いたLLM呼び出し）とLLMに回した件数を1行で返す"""
+        total = self.auto_approved + self.escalated
+        ratio = self.auto_approved / total if total else 0.0
+        return (
+            f"Pre-review: {self.auto_approved} auto-approved ({ratio:.0%} LLM reviews saved), "
+            f"{self.escalated} escalated"
+        )
@@ -4,38 +4,83 @@
 from .external import RSSClient, RSSItem
 
 # --- LLMプロバイダー ---
-from .llm import LLMProvider, OllamaProvider
+from .llm import (
+    CachedLLMProvider,
+    InstrumentedLLMProvider,
+    LLMCallRecord,
+    LLMProvider,
+    LLMPurpose,
+    LLMTickReport,
+    ModelRoute,
+    OllamaProvider,
+    PooledLLMProvider,
+    RecordingLLMProvider,
+    ReplayLLMProvider,
+    SyntheticLLMProvider,
+    llm_npc,
+    summarize_calls,
+)
 
 # --- Nostr ---
-from .nostr import NostrPublisher
+from .nostr import KeyRegistry, NostrPublisher, SignedEvent
 
 # --- ストレージ（リポジトリ） ---
 from .storage import (
     BulletinRepository,
+    JournaledQueueRepository,
+    LLMStatsRepository,
     LogRepository,
     MemoryRepository,
+    OutboxRecord,
+    OutboxRepository,
     ProfileRepository,
+    PromptStatsRepository,
     QueueRepository,
     RelationshipRepository,
+    SnapshotCache,
+    SqliteQueueRepository,
     StateRepository,
     TickStateRepository,
+    UnitOfWork,
 )
 
 __all__ = [
     # LLM
     "LLMProvider",
+    "LLMPurpose",
+    "ModelRoute",
     "OllamaProvider",
+    "CachedLLMProvider",
+    "PooledLLMProvider",
+    "RecordingLLMProvider",
+    "ReplayLLMProvider",
+    "SyntheticLLMProvider",
+    "InstrumentedLLMProvider",
+    "LLMCallRecord",
+    "LLMTickReport",
+    "llm_npc",
+    "summarize_calls",
     # Nostr
     "NostrPublisher",
+    "KeyRegistry",
+    "SignedEvent",
     # ストレージ
     "ProfileRepository",
     "StateRepository",
     "QueueRepository",
+    "SqliteQueueRepository",
+    "JournaledQueueRepository",
     "TickStateRepository",
+    "PromptStatsRepository",
+    "LLMStatsRepository",
+    "OutboxRepository",
+    "OutboxRecord",
     "MemoryRepository",
     "RelationshipRepository",
     "BulletinRepository",
     "LogRepository",
+    "UnitOfWork",
+    "SnapshotCache",
     # 外部データ
     "RSSClient",
     "RSSItem",
@@ -4,6 +4,8 @@
 
 import trafilatura
 
+from ..llm import LLMPurpose
+
 
 class ArticleFetcher:
     """URLから記事本文を取得（trafilatura使用）"""
@@ -66,7 +68,7 @@ class ArticleSummarizer:
 【要約】"""
 
         try:
-            summary = await self.llm.generate(prompt, max_length=300)
+            summary = await self.llm.generate(prompt, max_length=300, purpose=LLMPurpose.SUMMARY)
             return summary.strip()
         except Exception as e:
             print(f"    ⚠️  要約生成失敗: {e}")
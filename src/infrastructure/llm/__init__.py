@@ -1,6 +1,31 @@
 """LLMプロバイダー"""
 
-from .base import LLMProvider
+from .base import LLMProvider, LLMPurpose, ModelRoute
+from .cache import CachedLLMProvider
+from .cassette import RecordingLLMProvider, ReplayLLMProvider, SyntheticLLMProvider
+from .metrics import (
+    InstrumentedLLMProvider,
+    LLMCallRecord,
+    LLMTickReport,
+    llm_npc,
+    summarize_calls,
+)
 from .ollama import OllamaProvider
+from .pool import PooledLLMProvider
 
-__all__ = ["LLMProvider", "OllamaProvider"]
+__all__ = [
+    "LLMProvider",
+    "LLMPurpose",
+    "ModelRoute",
+    "OllamaProvider",
+    "CachedLLMProvider",
+    "PooledLLMProvider",
+    "RecordingLLMProvider",
+    "ReplayLLMProvider",
+    "SyntheticLLMProvider",
+    "InstrumentedLLMProvider",
+    "LLMCallRecord",
+    "LLMTickReport",
+    "llm_npc",
+    "summarize_calls",
+]
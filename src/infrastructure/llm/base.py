@@ -3,16 +3,54 @@ LLMプロバイダー抽象基底クラス
 """
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+
+
+class LLMPurpose(str, Enum):
+    """LLM呼び出しの用途（用途ごとに生成オプションを変える）"""
+
+    POST = "post"  # 通常投稿
+    MUMBLE = "mumble"  # ぶつぶつ投稿（外部ユーザーの投稿への独り言）
+    REPLY = "reply"  # リプライ
+    REVIEW = "review"  # 投稿レビュー（OK/NGの判定）
+    SUMMARY = "summary"  # 記事の要約
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """用途ごとのモデルと生成オプション（未指定の項目はプロバイダーの既定値）"""
+
+    model: str | None = None
+    num_ctx: int | None = None  # コンテキスト長
+    num_predict: int | None = None  # 生成トークン数の上限（最大長からの見積もりより優先）
 
 
 class LLMProvider(ABC):
     """LLMプロバイダーのインターフェース"""
 
     @abstractmethod
-    async def generate(self, prompt: str, max_length: int | None = None) -> str:
-        """プロンプトから文章を生成"""
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """
+        プロンプトから文章を生成
+
+        Args:
+            prompt: プロンプト
+            max_length: 最大文字数（超えた分は切り詰める）
+            purpose: 呼び出しの用途（停止条件などの生成オプションに使う）
+        """
         ...
 
+    def model_identity(self, purpose: LLMPurpose | None = None) -> str:
+        """用途に使うモデルと生成オプションを表す文字列（キャッシュキーに使う）"""
+        return ""
+
     @abstractmethod
     def is_available(self) -> bool:
         """プロバイダーが利用可能かチェック"""
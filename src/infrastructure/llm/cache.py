@@ -0,0 +1,205 @@
+"""
+LLM応答キャッシュ
+
+任意の LLMProvider を包み、同じ (モデル, 用途, 最大長, プロンプト) への応答をSQLiteに保存して再利用する。
+同じ記事の要約（collect_news.pyの再実行）や、同じ内容のレビューがLLMを呼ばずに済む。
+
+- 用途ごとにTTLを設定する。TTLのない用途（投稿・リプライなど毎回違う文章が欲しいもの）はキャッシュしない
+- 合計サイズが上限を超えたら、最後に使われたのが古いものから捨てる（LRU）
+- 同じキーの生成が同時に走ったときは、1回の呼び出しの結果を共有する
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from .base import LLMProvider, LLMPurpose
+from .metrics import current_call
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    purpose TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access);
+"""
+
+
+def cache_key(model: str, purpose: LLMPurpose, prompt: str, max_length: int | None) -> str:
+    """キャッシュキー（モデル・生成オプションを決める値とプロンプトのsha256）"""
+    payload = json.dumps([model, purpose.value, max_length, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedLLMProvider(LLMProvider):
+    """応答をキャッシュするLLMプロバイダー（他のプロバイダーを包む）"""
+
+    DEFAULT_MAX_BYTES = 50_000_000
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        db_path: Path,
+        ttl_hours: dict[LLMPurpose, float],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Args:
+            provider: 実際に生成するプロバイダー
+            db_path: キャッシュのSQLiteファイル
+            ttl_hours: 用途 → 有効期間（時間）。含まれない用途や0以下はキャッシュしない
+            max_bytes: 応答の合計サイズの上限（超えたら古いものから捨てる）
+        """
+        self.provider = provider
+        self.ttl_seconds = {
+            purpose: hours * 3600 for purpose, hours in ttl_hours.items() if hours > 0
+        }
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0  # キャッシュ対象外の用途
+        self._inflight: dict[str, asyncio.Task[str]] = {}
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._remove_expired()
+
+    def close(self) -> None:
+        """DB接続を閉じる"""
+        self._conn.close()
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """キャッシュにあればそれを返し、なければ生成して保存"""
+        ttl = self.ttl_seconds.get(purpose) if purpose else None
+        if purpose is None or ttl is None:
+            self.bypassed += 1
+            return await self.provider.generate(prompt, max_length, purpose=purpose)
+
+        key = cache_key(self.provider.model_identity(purpose), purpose, prompt, max_length)
+        cached = self._lookup(key, ttl)
+        if cached is not None:
+            self.hits += 1
+            self._mark_cached()
+            return cached
+
+        # 同じキーを生成中なら、その結果を待つ
+        task = self._inflight.get(key)
+        if task is not None:
+            self.hits += 1
+            self._mark_cached()
+            return await task
+
+        self.misses += 1
+        task = asyncio.ensure_future(self.provider.generate(prompt, max_length, purpose=purpose))
+        self._inflight[key] = task
+        try:
+            response = await task
+        finally:
+            del self._inflight[key]
+
+        self._store(key, purpose, response)
+        return response
+
+    @staticmethod
+    def _mark_cached() -> None:
+        """計測中なら、この呼び出しをキャッシュから返したものとして記録"""
+        record = current_call()
+        if record:
+            record.cached = True
+
+    def model_identity(self, purpose: LLMPurpose | None = None) -> str:
+        """包んでいるプロバイダーのモデル"""
+        return self.provider.model_identity(purpose)
+
+    def is_available(self) -> bool:
+        """包んでいるプロバイダーが利用可能かチェック"""
+        return self.provider.is_available()
+
+    # --- SQLite ---
+
+    def _lookup(self, key: str, ttl: float) -> str | None:
+        """有効期間内の応答を取得（使われた日時を更新）"""
+        row = self._conn.execute(
+            "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] >= ttl:
+            return None
+
+        with self._conn:
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return str(row[0])
+
+    def _store(self, key: str, purpose: LLMPurpose, response: str) -> None:
+        """応答を保存し、上限を超えていれば古いものから捨てる"""
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, purpose.value, response, len(response.encode("utf-8")), now, now),
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        """合計サイズが上限以下になるまで、最後に使われたのが古いものから削除（LRU）"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evict: list[tuple[str]] = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evict.append((key,))
+            total -= size
+
+        with self._conn:
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evict)
+
+    def _remove_expired(self) -> None:
+        """有効期間を過ぎた応答と、キャッシュしなくなった用途の応答を削除"""
+        now = time.time()
+        with self._conn:
+            for purpose in LLMPurpose:
+                ttl = self.ttl_seconds.get(purpose)
+                if ttl is None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE purpose = ?", (purpose.value,))
+                else:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE purpose = ? AND created_at < ?",
+                        (purpose.value, now - ttl),
+                    )
+
+    # --- 統計 ---
+
+    @property
+    def hit_ratio(self) -> float:
+        """ヒット率（キャッシュ対象の呼び出しのうち、0.0〜1.0）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> str:
+        """ヒット/ミスの集計を1行で返す"""
+        return (
+            f"LLM cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_ratio:.0%} hit ratio), {self.bypassed} uncached"
+        )
@@ -0,0 +1,199 @@
+"""
+LLM呼び出しの記録・再生（ベンチマーク用）
+
+- RecordingLLMProvider: 実際の呼び出し（プロンプト・オプション・応答・レイテンシ）をJSONLのカセットに追記する
+- ReplayLLMProvider: カセットの応答を返す（記録時のレイテンシを再現することもできる）
+- SyntheticLLMProvider: それらしい日本語を決まった長さで返す（Ollamaもカセットもいらない）
+
+Ollamaなしで tick を動かし、LLM以外の処理だけを繰り返し計測できるようにする。
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+from .base import LLMProvider, LLMPurpose
+
+
+def _record_key(prompt: str, max_length: int | None, purpose: str | None) -> str:
+    """再生時に応答を引くためのキー"""
+    return json.dumps([purpose, max_length, prompt], ensure_ascii=False)
+
+
+class RecordingLLMProvider(LLMProvider):
+    """呼び出しをカセットに記録するプロバイダー（他のプロバイダーを包む）"""
+
+    def __init__(self, provider: LLMProvider, cassette_file: Path):
+        self.provider = provider
+        self.cassette_file = cassette_file
+        self.recorded = 0
+        cassette_file.parent.mkdir(parents=True, exist_ok=True)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """包んでいるプロバイダーで生成し、結果を1行追記"""
+        started = time.monotonic()
+        response = await self.provider.generate(prompt, max_length, purpose=purpose)
+        record = {
+            "prompt": prompt,
+            "max_length": max_length,
+            "purpose": purpose.value if purpose else None,
+            "model": self.provider.model_identity(purpose),
+            "response": response,
+            "latency": round(time.monotonic() - started, 3),
+        }
+        with open(self.cassette_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.recorded += 1
+        return response
+
+    def model_identity(self, purpose: LLMPurpose | None = None) -> str:
+        """包んでいるプロバイダーのモデル"""
+        return self.provider.model_identity(purpose)
+
+    def is_available(self) -> bool:
+        """包んでいるプロバイダーが利用可能かチェック"""
+        return self.provider.is_available()
+
+
+class ReplayLLMProvider(LLMProvider):
+    """カセットに記録した応答を返すプロバイダー"""
+
+    def __init__(self, cassette_file: Path, simulate_latency: bool = False):
+        """
+        Args:
+            cassette_file: RecordingLLMProviderが書いたカセット
+            simulate_latency: Trueなら記録時のレイテンシだけ待ってから返す
+
+        同じプロンプトの記録があればそれを（複数あれば記録順に）返す。
+        プロンプトが一致しなければ（日時や乱数でプロンプトが変わるため）、同じ用途の記録を順番に返す。
+        """
+        self.cassette_file = cassette_file
+        self.simulate_latency = simulate_latency
+        self.exact_hits = 0
+        self.purpose_hits = 0
+
+        self._by_key: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._by_purpose: dict[str | None, deque[dict[str, Any]]] = defaultdict(deque)
+        self._load()
+
+    def _load(self) -> None:
+        """カセットを読み込み"""
+        if not self.cassette_file.exists():
+            return
+
+        with open(self.cassette_file, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    key = _record_key(record["prompt"], record["max_length"], record["purpose"])
+                except Exception as e:
+                    print(
+                        f"⚠️  Skipping broken cassette record {self.cassette_file.name}:{line_no}: {e}"
+                    )
+                    continue
+                self._by_key[key].append(record)
+                self._by_purpose[record["purpose"]].append(record)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """記録した応答を返す（使った記録は末尾に回して繰り返し使う）"""
+        purpose_value = purpose.value if purpose else None
+        records = self._by_key.get(_record_key(prompt, max_length, purpose_value))
+        if records:
+            self.exact_hits += 1
+        else:
+            records = self._by_purpose.get(purpose_value)
+            if not records:
+                raise KeyError(f"No recorded response for purpose: {purpose_value}")
+            self.purpose_hits += 1
+
+        record = records[0]
+        records.rotate(-1)
+        if self.simulate_latency:
+            await asyncio.sleep(record["latency"])
+        return str(record["response"])
+
+    def is_available(self) -> bool:
+        """記録が1件でもあれば利用可能"""
+        return bool(self._by_purpose)
+
+
+class SyntheticLLMProvider(LLMProvider):
+    """それらしい日本語を返すプロバイダー（内容に意味はない）"""
+
+    PHRASES = [
+        "今日は",
+        "なんとなく",
+        "久しぶりに",
+        "コードを書いていたら",
+        "朝から",
+        "気づいたら",
+        "ちょっとだけ",
+        "散歩の途中で",
+        "新しいツールを試して",
+        "ゲームをしていて",
+    ]
+    ENDINGS = [
+        "いい感じだった。",
+        "思ったより時間がかかった。",
+        "ちょっと楽しい。",
+        "眠くなってきた。",
+        "また明日やろう。",
+        "うまくいかなかった。",
+        "発見があった。",
+    ]
+
+    def __init__(self, length: int = 80, seed: int | None = 0, latency: float = 0.0):
+        """
+        Args:
+            length: 生成する文章のおおよその文字数（max_lengthがあればそちらが上限）
+            seed: 乱数シード（同じシードなら毎回同じ文章の並びになる）
+            latency: 1回の生成で待つ秒数
+        """
+        self.length = length
+        self.latency = latency
+        self._random = random.Random(seed)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """文章を組み立てて返す（レビューは全件OK）"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if purpose == LLMPurpose.REVIEW:
+            # バッチレビューなら番号ごとにOKを返す
+            numbers = re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)
+            return "\n".join(f"{n}: OK" for n in numbers) if numbers else "OK"
+
+        target = min(self.length, max_length) if max_length else self.length
+        text = ""
+        while len(text) < target:
+            text += self._random.choice(self.PHRASES) + self._random.choice(self.ENDINGS)
+        return text[:target]
+
+    def is_available(self) -> bool:
+        """常に利用可能"""
+        return True
@@ -0,0 +1,214 @@
+"""
+LLM呼び出しの計測
+
+InstrumentedLLMProvider で包むと、1回の呼び出しごとに
+用途・NPC・レイテンシ・待ち時間（セマフォ）・プロンプト/生成のトークン数と時間を記録する。
+
+- NPCは llm_npc(npc_id) の with ブロックで付ける（asyncioのタスクごとに別の値になる）
+- トークン数と時間は OllamaProvider が応答の eval_count / eval_duration /
+  prompt_eval_count / prompt_eval_duration から current_call() の記録に書き込む
+- 応答キャッシュから返した呼び出しは cached になる
+
+記録は tick ごとに LLMTickReport にまとめ、用途別・NPC別のパーセンタイルを付けて保存する。
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .base import LLMProvider, LLMPurpose
+
+# 集計するパーセンタイル
+PERCENTILES = (50, 90, 99)
+
+_current_npc: ContextVar[int | None] = ContextVar("llm_npc", default=None)
+_current_call: ContextVar["LLMCallRecord | None"] = ContextVar("llm_call", default=None)
+
+
+@contextmanager
+def llm_npc(npc_id: int | None) -> Iterator[None]:
+    """ブロック内のLLM呼び出しにNPC IDを付ける"""
+    token = _current_npc.set(npc_id)
+    try:
+        yield
+    finally:
+        _current_npc.reset(token)
+
+
+def current_call() -> "LLMCallRecord | None":
+    """計測中の呼び出しの記録（計測していなければNone）"""
+    return _current_call.get()
+
+
+def percentile(values: list[float], q: float) -> float:
+    """パーセンタイル（線形補間、空なら0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class LLMCallRecord(BaseModel):
+    """LLM呼び出し1回分の計測結果（時間は秒）"""
+
+    purpose: str | None = Field(default=None, description="用途")
+    npc_id: int | None = Field(default=None, description="呼び出したNPC")
+    model: str = Field(default="", description="使ったモデル")
+    latency: float = Field(default=0.0, description="呼び出し全体の時間")
+    queue_wait: float = Field(default=0.0, description="同時実行数の空きを待った時間")
+    load_seconds: float | None = Field(default=None, description="モデルの読み込み時間")
+    prompt_tokens: int | None = Field(default=None, description="プロンプトのトークン数")
+    prompt_seconds: float | None = Field(default=None, description="プロンプトの読み込み時間")
+    output_tokens: int | None = Field(default=None, description="生成したトークン数")
+    output_seconds: float | None = Field(default=None, description="生成にかかった時間")
+    truncated: bool = Field(
+        default=False, description="最大長で打ち切った（トークン数と時間はチャンクからの概算）"
+    )
+    cached: bool = Field(default=False, description="応答キャッシュから返した")
+    error: str | None = Field(default=None, description="失敗したときのエラー")
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """生成速度（トークン/秒）"""
+        if not self.output_tokens or not self.output_seconds:
+            return None
+        return self.output_tokens / self.output_seconds
+
+    @property
+    def prompt_tokens_per_second(self) -> float | None:
+        """プロンプトの読み込み速度（トークン/秒）"""
+        if not self.prompt_tokens or not self.prompt_seconds:
+            return None
+        return self.prompt_tokens / self.prompt_seconds
+
+
+def _distribution(values: list[float]) -> dict[str, float]:
+    """パーセンタイルと最大値"""
+    result = {f"p{q}": round(percentile(values, q), 3) for q in PERCENTILES}
+    result["max"] = round(max(values), 3) if values else 0.0
+    return result
+
+
+def summarize_calls(records: list[LLMCallRecord]) -> dict[str, Any]:
+    """
+    呼び出しの記録を集計する
+
+    Returns:
+        呼び出し数・失敗数・キャッシュ数・合計時間と、レイテンシ・待ち時間・生成/読み込み速度の分布
+        （分布はキャッシュと失敗を除いた呼び出しだけ）
+    """
+    generated = [r for r in records if not r.cached and r.error is None]
+    tokens_per_second = [v for r in generated if (v := r.tokens_per_second) is not None]
+    prompt_speed = [v for r in generated if (v := r.prompt_tokens_per_second) is not None]
+    prompt_tokens = [r.prompt_tokens for r in generated if r.prompt_tokens is not None]
+    return {
+        "calls": len(records),
+        "errors": sum(1 for r in records if r.error is not None),
+        "cached": sum(1 for r in records if r.cached),
+        "seconds": round(sum(r.latency for r in records), 3),
+        "latency": _distribution([r.latency for r in generated]),
+        "queue_wait": _distribution([r.queue_wait for r in generated]),
+        "tokens_per_second": _distribution(tokens_per_second),
+        "prompt_tokens_per_second": _distribution(prompt_speed),
+        "prompt_tokens": round(sum(prompt_tokens) / len(prompt_tokens)) if prompt_tokens else 0,
+        "output_tokens": sum(r.output_tokens or 0 for r in generated),
+    }
+
+
+class LLMTickReport(BaseModel):
+    """1回のtickのLLM呼び出しの計測結果"""
+
+    tick: int = Field(default=0, description="tick番号")
+    finished_at: datetime = Field(default_factory=datetime.now, description="tickの終了時刻")
+    seconds: float = Field(default=0.0, description="tick全体の時間")
+    total: dict[str, Any] = Field(default_factory=dict, description="全呼び出しの集計")
+    by_purpose: dict[str, dict[str, Any]] = Field(default_factory=dict, description="用途 → 集計")
+    by_npc: dict[int, dict[str, Any]] = Field(default_factory=dict, description="NPC ID → 集計")
+    calls: list[LLMCallRecord] = Field(default_factory=list, description="呼び出しごとの記録")
+
+    @classmethod
+    def build(cls, records: list[LLMCallRecord], tick: int, seconds: float) -> "LLMTickReport":
+        """呼び出しの記録から、用途別・NPC別の集計を付けて作る"""
+        by_purpose: dict[str, list[LLMCallRecord]] = {}
+        by_npc: dict[int, list[LLMCallRecord]] = {}
+        for record in records:
+            by_purpose.setdefault(record.purpose or "-", []).append(record)
+            if record.npc_id is not None:
+                by_npc.setdefault(record.npc_id, []).append(record)
+
+        return cls(
+            tick=tick,
+            seconds=round(seconds, 3),
+            total=summarize_calls(records),
+            by_purpose={purpose: summarize_calls(rs) for purpose, rs in sorted(by_purpose.items())},
+            by_npc={npc_id: summarize_calls(rs) for npc_id, rs in sorted(by_npc.items())},
+            calls=list(records),
+        )
+
+
+class InstrumentedLLMProvider(LLMProvider):
+    """呼び出しごとに計測するプロバイダー（他のプロバイダーを包む）"""
+
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+        self.records: list[LLMCallRecord] = []
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """包んでいるプロバイダーで生成し、計測結果を記録"""
+        record = LLMCallRecord(
+            purpose=purpose.value if purpose else None,
+            npc_id=_current_npc.get(),
+            model=self.provider.model_identity(purpose),
+        )
+        token = _current_call.set(record)
+        started = time.monotonic()
+        try:
+            return await self.provider.generate(prompt, max_length, purpose=purpose)
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.latency = time.monotonic() - started
+            _current_call.reset(token)
+            self.records.append(record)
+
+    def model_identity(self, purpose: LLMPurpose | None = None) -> str:
+        """包んでいるプロバイダーのモデル"""
+        return self.provider.model_identity(purpose)
+
+    def is_available(self) -> bool:
+        """包んでいるプロバイダーが利用可能かチェック"""
+        return self.provider.is_available()
+
+    def tick_report(self, tick: int, seconds: float) -> LLMTickReport:
+        """ここまでの記録をtickの計測結果にまとめる"""
+        return LLMTickReport.build(self.records, tick, seconds)
+
+    def report(self) -> str:
+        """呼び出し数・レイテンシ・生成速度の1行サマリー"""
+        summary = summarize_calls(self.records)
+        text = (
+            f"LLM calls: {summary['calls']} ({summary['seconds']:.1f}s total), "
+            f"latency p50 {summary['latency']['p50']:.1f}s / p90 {summary['latency']['p90']:.1f}s"
+        )
+        if summary["tokens_per_second"]["p50"]:
+            text += f", {summary['tokens_per_second']['p50']:.1f} tok/s"
+        if summary["queue_wait"]["p90"]:
+            text += f", queue wait p90 {summary['queue_wait']['p90']:.1f}s"
+        if summary["errors"]:
+            text += f", {summary['errors']} errors"
+        return text
@@ -1,39 +1,206 @@
 """
 Ollama LLMプロバイダー
+
+生成は ollama.AsyncClient で行い、イベントループを止めない。
+同時に投げるリクエスト数はセマフォで max_concurrency までに抑える
+（サーバー側の OLLAMA_NUM_PARALLEL に合わせると、その分だけ並列に生成される）。
+
+ストリーミングで受け取り、max_length を超えた時点で読むのをやめて接続を閉じる
+（Ollamaは接続が切れるとその生成を打ち切る）。捨てるだけのトークンを生成させない。
+
+Ollamaは前回と先頭が一致するプロンプトの読み込み（KVキャッシュ）を使い回す。
+keep_alive でモデルを載せたままにし、tickをまたいでもキャッシュが消えないようにする。
+
+計測中（InstrumentedLLMProvider）なら、セマフォの待ち時間と応答の eval_count などを記録に書き込む。
 """
 
+import asyncio
+import json
+import time
+from typing import Any
+
 import ollama
 
-from .base import LLMProvider
+from .base import LLMProvider, LLMPurpose, ModelRoute
+from .metrics import LLMCallRecord, current_call
+
+# Ollamaの *_duration はナノ秒
+NANOSECONDS = 1_000_000_000
+
+# max_length（文字数）から num_predict（トークン数）を見積もる係数と余裕分
+# 日本語は1文字が1〜2トークンになるので、文字数で切り詰める前にトークン上限に達しないよう多めに取る
+TOKENS_PER_CHAR = 2
+NUM_PREDICT_MARGIN = 16
+
+# 用途ごとの停止シーケンス（サーバー側でここまで来たら生成を止める）
+PURPOSE_STOP: dict[LLMPurpose, list[str]] = {
+    LLMPurpose.POST: [],
+    LLMPurpose.MUMBLE: [],
+    LLMPurpose.REPLY: ["\n\n"],  # 返信は1段落だけ（空行の後は補足や別案が続く）
+    LLMPurpose.REVIEW: [],  # NGの理由まで読むので改行では止めない
+    LLMPurpose.SUMMARY: ["【"],  # 【要約】の後に別の見出しを続けない
+}
+
+
+def truncate(content: str, max_length: int | None) -> str:
+    """最大長でトリミング"""
+    if max_length and len(content) > max_length:
+        return content[:max_length].rsplit(" ", 1)[0] + "..."
+    return content
+
+
+def build_options(
+    max_length: int | None, purpose: LLMPurpose | None, route: ModelRoute | None = None
+) -> dict[str, Any]:
+    """最大長・用途・ルートからOllamaの生成オプション（num_predict / stop / num_ctx）を作る"""
+    options: dict[str, Any] = {}
+    if max_length:
+        options["num_predict"] = max_length * TOKENS_PER_CHAR + NUM_PREDICT_MARGIN
+    if purpose and PURPOSE_STOP[purpose]:
+        options["stop"] = PURPOSE_STOP[purpose]
+    if route:
+        if route.num_predict:
+            options["num_predict"] = route.num_predict
+        if route.num_ctx:
+            options["num_ctx"] = route.num_ctx
+    return options
+
+
+def record_usage(record: LLMCallRecord | None, response: Any) -> None:
+    """最後の応答（done）のトークン数と時間を記録に書き込む"""
+    if record is None:
+        return
+    if (load := response.get("load_duration")) is not None:
+        record.load_seconds = load / NANOSECONDS
+    if (count := response.get("prompt_eval_count")) is not None:
+        record.prompt_tokens = count
+    if (duration := response.get("prompt_eval_duration")) is not None:
+        record.prompt_seconds = duration / NANOSECONDS
+    if (count := response.get("eval_count")) is not None:
+        record.output_tokens = count
+    if (duration := response.get("eval_duration")) is not None:
+        record.output_seconds = duration / NANOSECONDS
 
 
 class OllamaProvider(LLMProvider):
     """ローカルLLM（Ollama）を使った文章生成"""
 
-    def __init__(self, host: str, model: str):
+    def __init__(
+        self,
+        host: str,
+        model: str,
+        max_concurrency: int = 1,
+        stream: bool = True,
+        routes: dict[LLMPurpose, ModelRoute] | None = None,
+        keep_alive: str | None = None,
+    ):
+        """
+        Args:
+            host: OllamaホストURL
+            model: 既定のモデル
+            max_concurrency: 同時に投げる生成リクエストの上限
+            stream: ストリーミングで受け取り、最大長を超えたら打ち切るか
+            routes: 用途ごとのモデルと生成オプション（ない用途は既定のモデル）
+            keep_alive: 生成後にモデルを保持する時間（Noneならサーバーの既定）
+        """
         self.host = host
         self.model = model
-        self.client = ollama.Client(host=host)
+        self.routes = routes or {}
+        self.max_concurrency = max_concurrency
+        self.stream = stream
+        self.keep_alive = keep_alive
+        self.client = ollama.Client(host=host)  # 死活確認用（同期）
+        self.async_client = ollama.AsyncClient(host=host)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
-    async def generate(self, prompt: str, max_length: int | None = None) -> str:
-        """プロンプトから文章を生成"""
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """プロンプトから文章を生成（用途ごとのモデルで、同時実行数はmax_concurrencyまで）"""
+        route = self.routes.get(purpose) if purpose else None
+        model = self.model_for(purpose)
+        options = build_options(max_length, purpose, route)
+        record = current_call()
         try:
-            response = self.client.generate(
-                model=self.model,
-                prompt=prompt,
-            )
-
-            content: str = str(response["response"]).strip()
-
-            # 最大長でトリミング
-            if max_length and len(content) > max_length:
-                content = content[:max_length].rsplit(" ", 1)[0] + "..."
+            waited = time.monotonic()
+            async with self._semaphore:
+                if record:
+                    record.model = model
+                    record.queue_wait += time.monotonic() - waited
+                if self.stream:
+                    content = await self._generate_stream(
+                        model, prompt, max_length, options, record
+                    )
+                else:
+                    response = await self.async_client.generate(
+                        model=model, prompt=prompt, options=options, keep_alive=self.keep_alive
+                    )
+                    record_usage(record, response)
+                    content = str(response["response"]).strip()
 
-            return content
+            return truncate(content, max_length)
         except Exception as e:
             print(f"⚠️  LLM generation failed: {e}")
             raise
 
+    async def _generate_stream(
+        self,
+        model: str,
+        prompt: str,
+        max_length: int | None,
+        options: dict[str, Any],
+        record: LLMCallRecord | None = None,
+    ) -> str:
+        """
+        ストリーミングで生成し、最大長を超えた時点で打ち切る
+
+        空白を除いて max_length を1文字でも超えれば、トリミング結果は全文を待った場合と変わらない。
+        打ち切ると最後の応答（トークン数と時間）が来ないので、チャンク数（≒トークン数）と
+        最初のチャンクまでの時間から概算して記録する。
+        """
+        started = time.monotonic()
+        stream = await self.async_client.generate(
+            model=model, prompt=prompt, options=options, stream=True, keep_alive=self.keep_alive
+        )
+        chunks: list[str] = []
+        first_chunk_at: float | None = None
+        try:
+            async for part in stream:
+                if first_chunk_at is None:
+                    first_chunk_at = time.monotonic()
+                chunks.append(part["response"])
+                if part.get("done"):
+                    record_usage(record, part)
+                if max_length and len("".join(chunks).strip()) > max_length:
+                    if record and first_chunk_at is not None:
+                        record.truncated = True
+                        record.prompt_seconds = first_chunk_at - started
+                        record.output_tokens = len(chunks)
+                        record.output_seconds = time.monotonic() - first_chunk_at
+                    break
+        finally:
+            # 途中で抜けた場合も接続を閉じて、サーバー側の生成を止める
+            aclose = getattr(stream, "aclose", None)
+            if aclose:
+                await aclose()
+        return "".join(chunks).strip()
+
+    def model_for(self, purpose: LLMPurpose | None) -> str:
+        """用途に使うモデル名"""
+        route = self.routes.get(purpose) if purpose else None
+        return route.model if route and route.model else self.model
+
+    def model_identity(self, purpose: LLMPurpose | None = None) -> str:
+        """用途に使うモデルとルートの生成オプション"""
+        route = self.routes.get(purpose) if purpose else None
+        if route is None:
+            return self.model
+        return json.dumps([self.model_for(purpose), route.num_ctx, route.num_predict])
+
     def is_available(self) -> bool:
         """Ollamaが利用可能かチェック"""
         try:
@@ -0,0 +1,190 @@
+"""
+複数ホストのLLMプロバイダープール
+
+複数台のOllamaに生成を振り分ける。
+- 実行中のリクエストが一番少ないホストに送る
+- 接続できない・タイムアウトしたホストや死活確認に失敗したホストは外し、待ち時間（失敗のたびに倍）の後に
+  死活確認が通れば戻す
+- ホストごとのレイテンシを集計する
+"""
+
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from .base import LLMProvider, LLMPurpose
+from .ollama import OllamaProvider
+
+# ホストを外すエラー（接続・タイムアウト）
+# モデルがない・コンテキスト超過などリクエスト側のエラーは、どのホストでも同じなので外さずに投げる
+HOST_ERRORS: tuple[type[BaseException], ...] = (
+    httpx.TransportError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+@dataclass
+class PoolMember:
+    """プール内の1ホスト"""
+
+    provider: OllamaProvider
+    in_flight: int = 0
+    healthy: bool = True
+    ejected_until: float = 0.0  # time.monotonic() の値
+    backoff: float = 0.0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def host(self) -> str:
+        """ホストURL"""
+        return self.provider.host
+
+
+class PooledLLMProvider(LLMProvider):
+    """実行中のリクエストが少ないホストから順に使うプロバイダー"""
+
+    def __init__(
+        self,
+        providers: list[OllamaProvider],
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 600.0,
+    ):
+        """
+        Args:
+            providers: ホストごとのプロバイダー（同じモデルを使う）
+            backoff_seconds: 外したホストの死活確認を再開するまでの最初の待ち時間
+            max_backoff_seconds: 待ち時間の上限（失敗が続くたびに倍にする）
+        """
+        if not providers:
+            raise ValueError("PooledLLMProvider needs at least one provider")
+
+        self.members = [PoolMember(provider) for provider in providers]
+        self.model = providers[0].model
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        """
+        空いているホストで生成
+
+        接続・タイムアウトで失敗したらそのホストを外して別のホストで再試行する。
+        それ以外のエラー（モデルがない・プロンプトが長すぎるなど）はホストを外さずにそのまま投げる。
+        """
+        tried: set[int] = set()
+        last_error: BaseException | None = None
+        while True:
+            await self._readmit()
+            member = self._pick(tried)
+            if member is None:
+                raise RuntimeError("No available LLM host in pool") from last_error
+            tried.add(id(member))
+
+            member.in_flight += 1
+            started = time.monotonic()
+            try:
+                response = await member.provider.generate(prompt, max_length, purpose=purpose)
+            except HOST_ERRORS as e:
+                last_error = e
+                member.errors += 1
+                self._eject(member, f"generation failed: {e}")
+                continue
+            except Exception:
+                member.errors += 1
+                raise
+            finally:
+                member.in_flight -= 1
+
+            member.latencies.append(time.monotonic() - started)
+            return response
+
+    def model_identity(self, purpose: LLMPurpose | None = None) -> str:
+        """用途に使うモデル（全ホストで同じ設定）"""
+        return self.members[0].provider.model_identity(purpose)
+
+    def is_available(self) -> bool:
+        """死活確認が通らないホストを外し、1台でも使えればTrue"""
+        for member in self.members:
+            if member.provider.is_available():
+                self._admit(member)
+            else:
+                self._eject(member, "not available")
+        return any(member.healthy for member in self.members)
+
+    # --- 振り分け・切り離し ---
+
+    def _pick(self, exclude: set[int]) -> PoolMember | None:
+        """使えるホストのうち、実行中のリクエストが一番少ないもの"""
+        candidates = [m for m in self.members if m.healthy and id(m) not in exclude]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda m: (m.in_flight, len(m.latencies)))
+
+    def _eject(self, member: PoolMember, reason: str) -> None:
+        """ホストを外す（外すたびに戻すまでの待ち時間を倍にする）"""
+        member.backoff = min(
+            self.max_backoff_seconds, member.backoff * 2 if member.backoff else self.backoff_seconds
+        )
+        member.ejected_until = time.monotonic() + member.backoff
+        if member.healthy:
+            print(f"⚠️  LLM host {member.host} ejected ({reason}), retry in {member.backoff:.0f}s")
+        member.healthy = False
+
+    def _admit(self, member: PoolMember) -> None:
+        """ホストを戻す"""
+        if not member.healthy:
+            print(f"✅ LLM host {member.host} re-admitted")
+        member.healthy = True
+        member.backoff = 0.0
+
+    async def _readmit(self) -> None:
+        """待ち時間を過ぎたホストの死活確認をして、通れば戻す"""
+        now = time.monotonic()
+        due = [m for m in self.members if not m.healthy and m.ejected_until <= now]
+        if not due:
+            return
+
+        # 同じホストを重ねて確認しないよう、先に次の確認時刻まで延ばしておく
+        for member in due:
+            member.ejected_until = now + member.backoff
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(member.provider.is_available) for member in due)
+        )
+        for member, available in zip(due, results, strict=True):
+            if available:
+                self._admit(member)
+            else:
+                self._eject(member, "still not available")
+
+    # --- 統計 ---
+
+    def report(self) -> str:
+        """ホストごとのリクエスト数・レイテンシ・エラー数を返す"""
+        lines = ["LLM hosts:"]
+        for member in self.members:
+            latencies = member.latencies
+            if latencies:
+                p95 = (
+                    statistics.quantiles(latencies, n=20)[-1]
+                    if len(latencies) > 1
+                    else latencies[0]
+                )
+                timing = f"avg {statistics.fmean(latencies):.1f}s, p95 {p95:.1f}s"
+            else:
+                timing = "no requests"
+            status = "up" if member.healthy else "ejected"
+            lines.append(
+                f"  {member.host} [{status}]: {len(latencies)} ok, {member.errors} errors, {timing}"
+            )
+        return "\n".join(lines)
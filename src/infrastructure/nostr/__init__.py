@@ -1,5 +1,6 @@
 """Nostr連携"""
 
-from .publisher import NostrPublisher
+from .key_registry import KeyRegistry
+from .publisher import NostrPublisher, SignedEvent
 
-__all__ = ["NostrPublisher"]
+__all__ = ["KeyRegistry", "NostrPublisher", "SignedEvent"]
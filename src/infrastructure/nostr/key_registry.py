@@ -0,0 +1,112 @@
+"""
+NPCの鍵の登録簿
+
+環境変数の鍵（NpcKey）の読み込みと、nsec（bech32）から署名用の Keys への変換を
+NPCごとに1回だけ行い、プロセスの間使い回す。
+pubkey → NPC ID の逆引きも持つ（住人の投稿かどうかの判定に使う）。
+"""
+
+from collections.abc import Callable, Iterable
+
+from nostr_sdk import Keys
+
+from ...domain import NpcKey, extract_npc_id
+
+
+class KeyRegistry:
+    """NPCの鍵を1回だけ読み込んで使い回す"""
+
+    def __init__(self, loader: Callable[[int], NpcKey] = NpcKey.from_env):
+        """
+        Args:
+            loader: NPC IDから鍵を読み込む関数（見つからなければValueError）
+        """
+        self.loader = loader
+        self._npc_keys: dict[int, NpcKey] = {}
+        self._keys: dict[int, Keys] = {}
+        self._npc_by_pubkey: dict[str, int] = {}
+        self._missing: dict[int, ValueError] = {}
+
+    def load(self, npc_ids: Iterable[int]) -> int:
+        """
+        まとめて読み込んで署名用の鍵に変換（見つからないNPCは飛ばす）
+
+        Returns:
+            署名用の鍵を用意できたNPCの数
+        """
+        for npc_id in npc_ids:
+            try:
+                self.keys_for(npc_id)
+            except ValueError as e:
+                print(f"⚠️  Failed to load key for bot {npc_id}: {e}")
+        return len(self._keys)
+
+    def register(self, npc_key: NpcKey) -> None:
+        """読み込み済みの鍵情報を登録"""
+        self._npc_keys[npc_key.id] = npc_key
+        self._npc_by_pubkey[npc_key.pubkey] = npc_key.id
+
+    def npc_key(self, npc_id: int) -> NpcKey:
+        """
+        NPCの鍵情報
+
+        Raises:
+            ValueError: 鍵が見つからない
+        """
+        if npc_id in self._npc_keys:
+            return self._npc_keys[npc_id]
+        if npc_id in self._missing:
+            raise self._missing[npc_id]
+        try:
+            npc_key = self.loader(npc_id)
+        except ValueError as e:
+            self._missing[npc_id] = e
+            raise
+        self.register(npc_key)
+        return npc_key
+
+    def keys_for(self, npc_id: int) -> Keys:
+        """
+        NPCの署名用の鍵
+
+        Raises:
+            ValueError: 鍵が見つからない・変換できない
+        """
+        keys = self._keys.get(npc_id)
+        if keys is None:
+            npc_key = self.npc_key(npc_id)
+            try:
+                keys = Keys.parse(npc_key.nsec)
+            except Exception as e:
+                raise ValueError(f"Invalid key for NPC {npc_id:03d}: {e}") from e
+            self._keys[npc_id] = keys
+        return keys
+
+    def pubkey_of(self, npc_id: int) -> str | None:
+        """NPCのpubkey（鍵がなければNone）"""
+        try:
+            return self.npc_key(npc_id).pubkey
+        except ValueError:
+            return None
+
+    def target_pubkey(self, resident: str) -> str | None:
+        """住人名（npc001形式）からpubkeyを引く（住人でなければNone）"""
+        npc_id = extract_npc_id(resident)
+        if npc_id is None:
+            return None
+        return self.pubkey_of(npc_id)
+
+    def npc_for_pubkey(self, pubkey: str | None) -> int | None:
+        """pubkeyからNPC IDを引く（読み込んだ住人でなければNone）"""
+        if not pubkey:
+            return None
+        return self._npc_by_pubkey.get(pubkey)
+
+    def is_resident(self, pubkey: str | None) -> bool:
+        """読み込んだ住人のpubkeyか"""
+        return self.npc_for_pubkey(pubkey) is not None
+
+    @property
+    def keys(self) -> dict[int, Keys]:
+        """NPC ID → 署名用の鍵（変換済みのもの）"""
+        return dict(self._keys)
@@ -1,23 +1,149 @@
 """
 Nostr投稿パブリッシャー
+
+async with で開いている間は1つの httpx.AsyncClient（接続プール）を使い回し、
+投稿・リプライ・リアクションのたびにTCP/TLSの接続をやり直さない。
+開いていなければ、1件ごとに接続して閉じる。
+
+署名（build_*）と送信（send_event_json）は分けても使える。
+署名済みのイベントを保存しておけば、送り直しても同じイベントIDになる（APIは重複として扱う）。
+
+まとめて署名するときは sign_many でスレッドプールに分けて署名し、できた順に受け取って送る
+（署名はCPUを使うが、nostr-sdk は呼び出し中にGILを離すのでコア数に応じて速くなる）。
 """
 
+import asyncio
+import importlib.util
 import json
-from typing import Any
+import os
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Generic, TypeVar
 
 import httpx
-from nostr_sdk import EventBuilder, Keys, Kind, Tag
+from nostr_sdk import Event, EventBuilder, Keys, Kind, Tag
 
 # MYPACE専用Kind（他のNostrクライアントからは見えない）
 KIND_MYPACE = 42000
 
+# 削除リクエスト（NIP-09）
+KIND_DELETION = 5
+
+T = TypeVar("T")
+
+
+@dataclass
+class SignedEvent(Generic[T]):
+    """まとめて署名した1件の結果"""
+
+    tag: T  # 呼び出し側がどのイベントか分かるように付けた値
+    event: Event | None = None
+    error: Exception | None = None
+
+
+# リレーのメッセージが入るフィールド
+RELAY_MESSAGE_FIELDS = ("message", "error", "reason")
+
+
+def is_duplicate(status_code: int, body: Any) -> bool:
+    """
+    同じイベントがすでに受け付けられていたという応答か
+
+    409 Conflict か、リレーのメッセージが NIP-01 の "duplicate:" で始まる応答だけを重複とみなす
+    （本文のどこかに "duplicate" とあるだけのエラーは重複にしない）。
+    NIP-01 の OK メッセージそのもの（["OK", <id>, <bool>, <message>]）も受け付ける。
+    """
+    if status_code == 409:
+        return True
+    if isinstance(body, list) and len(body) >= 4 and body[0] == "OK":
+        messages = [body[3]]
+    elif isinstance(body, dict):
+        messages = [body.get(name) for name in RELAY_MESSAGE_FIELDS]
+    else:
+        return False
+    return any(
+        isinstance(message, str) and message.strip().lower().startswith("duplicate:")
+        for message in messages
+    )
+
 
 class NostrPublisher:
     """MYPACE API経由でNostr投稿を行う"""
 
-    def __init__(self, api_endpoint: str, dry_run: bool = False):
+    def __init__(
+        self,
+        api_endpoint: str,
+        dry_run: bool = False,
+        http2: bool = False,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        sign_workers: int | None = None,
+    ):
+        """
+        Args:
+            api_endpoint: MYPACE APIエンドポイント
+            dry_run: Trueなら送信せずに表示だけする
+            http2: HTTP/2で接続するか（h2がなければHTTP/1.1）
+            max_connections: 同時に張る接続の上限
+            max_keepalive_connections: 使い終わった後も張ったままにしておく接続の上限
+            keepalive_expiry: 使っていない接続を閉じるまでの秒数
+            timeout: 1回の送信のタイムアウト（秒）
+            sign_workers: まとめて署名するときのスレッド数（Noneならコア数）
+        """
         self.api_endpoint = api_endpoint
         self.dry_run = dry_run
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.sign_workers = sign_workers or os.cpu_count() or 1
+        self.client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "NostrPublisher":
+        """接続プールを開く"""
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """接続プールを閉じる"""
+        await self.aclose()
+
+    async def open(self) -> None:
+        """接続プールを開く（開いていれば何もしない）"""
+        if self.client is None and not self.dry_run:
+            self.client = self._create_client()
+
+    async def aclose(self) -> None:
+        """接続プールを閉じる"""
+        if self.client is not None:
+            client, self.client = self.client, None
+            await client.aclose()
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """送信用のクライアントを作成"""
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            print('⚠️  h2 is not installed (pip install "sinov[http2]"), using HTTP/1.1')
+            http2 = False
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            verify=False,
+            trust_env=True,
+            http2=http2,
+            limits=self.limits,
+        )
 
     async def publish(
         self,
@@ -49,6 +175,13 @@ class NostrPublisher:
             print()
             return None
 
+        return await self._send_event(self.build_post(keys, content, aurora_tag))
+
+    def build_post(self, keys: Keys, content: str, aurora_tag: list[str] | None = None) -> Event:
+        """通常投稿のイベントを作成・署名"""
+        if not content or len(content.strip()) == 0:
+            raise ValueError("Post content is empty")
+
         # タグを作成
         tags = [
             Tag.hashtag("mypace"),
@@ -61,9 +194,7 @@ class NostrPublisher:
             tags.append(Tag.parse(aurora_tag))
 
         # イベント作成・署名（Kind 42000: MYPACE専用）
-        event = EventBuilder(Kind(KIND_MYPACE), content).tags(tags).sign_with_keys(keys)
-
-        return await self._send_event(event)
+        return EventBuilder(Kind(KIND_MYPACE), content).tags(tags).sign_with_keys(keys)
 
     async def publish_reply(
         self,
@@ -97,6 +228,21 @@ class NostrPublisher:
             print()
             return None
 
+        event = self.build_reply(keys, content, reply_to_event_id, reply_to_pubkey, aurora_tag)
+        return await self._send_event(event)
+
+    def build_reply(
+        self,
+        keys: Keys,
+        content: str,
+        reply_to_event_id: str,
+        reply_to_pubkey: str | None = None,
+        aurora_tag: list[str] | None = None,
+    ) -> Event:
+        """リプライのイベントを作成・署名"""
+        if not content or len(content.strip()) == 0:
+            raise ValueError("Reply content is empty")
+
         # タグを作成
         tags = [
             Tag.hashtag("mypace"),
@@ -116,9 +262,7 @@ class NostrPublisher:
             tags.append(Tag.parse(aurora_tag))
 
         # イベント作成・署名（Kind 42000: MYPACE専用）
-        event = EventBuilder(Kind(KIND_MYPACE), content).tags(tags).sign_with_keys(keys)
-
-        return await self._send_event(event)
+        return EventBuilder(Kind(KIND_MYPACE), content).tags(tags).sign_with_keys(keys)
 
     async def publish_reaction(
         self,
@@ -146,6 +290,14 @@ class NostrPublisher:
             print()
             return None
 
+        return await self._send_event(
+            self.build_reaction(keys, emoji, target_event_id, target_pubkey)
+        )
+
+    def build_reaction(
+        self, keys: Keys, emoji: str, target_event_id: str, target_pubkey: str
+    ) -> Event:
+        """リアクション（kind:7）のイベントを作成・署名"""
         # タグを作成
         tags = [
             Tag.parse(["npc"]),
@@ -155,38 +307,97 @@ class NostrPublisher:
         ]
 
         # kind:7 リアクションイベントを作成
-        event = EventBuilder(Kind(7), emoji).tags(tags).sign_with_keys(keys)
+        return EventBuilder(Kind(7), emoji).tags(tags).sign_with_keys(keys)
 
-        return await self._send_event(event)
+    def build_deletion(self, keys: Keys, event_id: str) -> Event:
+        """削除リクエスト（kind:5）のイベントを作成・署名"""
+        tags = [Tag.parse(["e", event_id])]
+        return EventBuilder(Kind(KIND_DELETION), "").tags(tags).sign_with_keys(keys)
 
-    async def _send_event(self, event: Any) -> str:
-        """署名済みイベントをMYPACE APIに送信"""
-        # NostrイベントをJSON化
-        event_json = json.loads(event.as_json())
+    async def sign_many(
+        self, builds: Iterable[tuple[T, Callable[[], Event]]]
+    ) -> AsyncIterator[SignedEvent[T]]:
+        """
+        イベントをスレッドプールでまとめて署名し、できた順に返す
 
-        # MYPACE APIに送信
-        async with httpx.AsyncClient(
-            timeout=30.0,
-            verify=False,
-            trust_env=True,
-        ) as client:
-            response = await client.post(
-                f"{self.api_endpoint}/api/publish",
-                json={"event": event_json},
-                headers={"Content-Type": "application/json"},
-            )
+        同時に署名するのはスレッド数の2倍までで、受け取った分だけ次を署名する
+        （全件の署名を待たずに送り始められる）。
 
-            if response.status_code != 200:
-                error_data = (
-                    response.json()
-                    if response.headers.get("content-type") == "application/json"
-                    else {}
-                )
-                raise RuntimeError(f"API error: {response.status_code} - {error_data}")
+        Args:
+            builds: (呼び出し側の目印, 署名したイベントを返す関数) の並び
+                （例: (entry.id, partial(publisher.build_post, keys, content))）
 
-            result = response.json()
-            if not result.get("success"):
-                raise RuntimeError(f"Publish failed: {result}")
+        Yields:
+            署名の結果（失敗したものは error に例外が入る）
+        """
+        loop = asyncio.get_running_loop()
+        pending: dict[asyncio.Future[Event], T] = {}
+        limit = self.sign_workers * 2
+        with ThreadPoolExecutor(self.sign_workers, thread_name_prefix="sign") as executor:
+            for tag, build in builds:
+                pending[loop.run_in_executor(executor, build)] = tag
+                if len(pending) < limit:
+                    continue
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield self._signed(pending.pop(future), future)
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield self._signed(pending.pop(future), future)
+
+    @staticmethod
+    def _signed(tag: T, future: "asyncio.Future[Event]") -> SignedEvent[T]:
+        """署名の終わったfutureを結果にする"""
+        error = future.exception()
+        if error is None:
+            return SignedEvent(tag, future.result())
+        if not isinstance(error, Exception):
+            raise error
+        return SignedEvent(tag, error=error)
 
+    async def _send_event(self, event: Any) -> str:
+        """署名済みイベントをMYPACE APIに送信"""
+        await self.send_event_json(event.as_json())
         event_id: str = event.id().to_hex()
         return event_id
+
+    async def send_event_json(self, event_json: str) -> None:
+        """
+        署名済みイベント（JSON文字列）をMYPACE APIに送信
+
+        同じイベントがすでに受け付けられていた（重複）場合も成功として扱う。
+
+        Raises:
+            RuntimeError: APIがエラーを返した
+        """
+        event = json.loads(event_json)
+
+        # MYPACE APIに送信（開いていなければこの1件だけの接続で送る）
+        if self.client is not None:
+            response = await self._post(self.client, event)
+        else:
+            async with self._create_client() as client:
+                response = await self._post(client, event)
+
+        if response.status_code != 200:
+            error_data = (
+                response.json()
+                if response.headers.get("content-type") == "application/json"
+                else {}
+            )
+            if is_duplicate(response.status_code, error_data):
+                return
+            raise RuntimeError(f"API error: {response.status_code} - {error_data}")
+
+        result = response.json()
+        if not result.get("success") and not is_duplicate(response.status_code, result):
+            raise RuntimeError(f"Publish failed: {result}")
+
+    async def _post(self, client: httpx.AsyncClient, event_json: Any) -> httpx.Response:
+        """イベントをAPIに送る"""
+        return await client.post(
+            f"{self.api_endpoint}/api/publish",
+            json={"event": event_json},
+            headers={"Content-Type": "application/json"},
+        )
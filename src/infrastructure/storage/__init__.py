@@ -1,21 +1,38 @@
 """ストレージ連携"""
 
 from .bulletin_repo import BulletinRepository
+from .journal_queue_repo import JournaledQueueRepository
+from .llm_stats_repo import LLMStatsRepository
 from .log_repo import LogRepository
 from .memory_repo import MemoryRepository
+from .outbox_repo import OutboxRecord, OutboxRepository
+from .posted_archive import PostedArchive
 from .profile_repo import ProfileRepository
+from .prompt_stats_repo import PromptStatsRepository
 from .queue_repo import QueueRepository
 from .relationship_repo import RelationshipRepository
+from .snapshot_cache import SnapshotCache
+from .sqlite_queue_repo import SqliteQueueRepository
 from .state_repo import StateRepository
 from .tick_state_repo import TickStateRepository
+from .unit_of_work import UnitOfWork
 
 __all__ = [
     "ProfileRepository",
     "StateRepository",
     "QueueRepository",
+    "SqliteQueueRepository",
+    "JournaledQueueRepository",
     "TickStateRepository",
+    "PromptStatsRepository",
+    "LLMStatsRepository",
+    "OutboxRepository",
+    "OutboxRecord",
     "MemoryRepository",
     "RelationshipRepository",
     "BulletinRepository",
     "LogRepository",
+    "PostedArchive",
+    "UnitOfWork",
+    "SnapshotCache",
 ]
@@ -4,17 +4,22 @@
 
 import json
 from abc import ABC
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any, cast
 
+from pydantic import BaseModel
+
 from ...domain import format_npc_name
+from .unit_of_work import UnitOfWork
 
 
 class ResidentJsonRepository(ABC):
     """住人ごとのJSONファイルを扱うリポジトリの基底クラス"""
 
-    def __init__(self, residents_dir: Path):
+    def __init__(self, residents_dir: Path, unit_of_work: UnitOfWork | None = None):
         self.residents_dir = residents_dir
+        self.unit_of_work = unit_of_work
 
     def _get_resident_dir(self, npc_id: int) -> Path:
         """住人ディレクトリを取得（存在しない場合は作成）"""
@@ -37,3 +42,12 @@ class ResidentJsonRepository(ABC):
         """JSONファイルに保存"""
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def _save_model(
+        self, file_path: Path, obj: BaseModel, dump: Callable[[], dict[str, Any]]
+    ) -> None:
+        """モデルを保存（ユニットオブワークがあればcommitまで書き出しを遅らせる）"""
+        if self.unit_of_work:
+            self.unit_of_work.mark_dirty(file_path, obj, dump)
+        else:
+            self._save_json(file_path, dump())
@@ -0,0 +1,287 @@
+"""
+投稿キューリポジトリ（ジャーナル版）
+
+追加・ステータス移動のたびにステータスファイル全体を書き直す代わりに、
+journal.jsonl へ1操作1行で追記する。現在の状態は
+「スナップショット（{status}.json）+ ジャーナルの再生」で復元する。
+
+ジャーナルが一定サイズを超えたら、別スレッドでスナップショットに畳み込む（コンパクション）。
+各レコードは操作後のエントリー全体を持つので、再生は何度やっても同じ結果になり、
+tickの途中でプロセスが落ちてもジャーナルから復元できる。
+
+複数プロセスから同時に書き込むことは想定しない（JSON版と同じ）。
+"""
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from ...domain import QueueEntry, QueueStatus
+from .queue_repo import QueueRepository
+from .reply_index import ReplyIndex
+
+
+class JournaledQueueRepository(QueueRepository):
+    """追記型ジャーナルでキューを管理（QueueRepositoryのドロップイン置き換え）"""
+
+    JOURNAL_FILENAME = "journal.jsonl"
+    COMPACTING_SUFFIX = ".compacting"
+    DEFAULT_COMPACT_THRESHOLD = 1_000_000  # バイト
+
+    def __init__(
+        self,
+        queue_dir: Path,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        archive_compress: bool = False,
+    ):
+        super().__init__(queue_dir, archive_compress)
+        self.compact_threshold = compact_threshold
+        self.journal_file = queue_dir / self.JOURNAL_FILENAME
+        self.compacting_file = queue_dir / (self.JOURNAL_FILENAME + self.COMPACTING_SUFFIX)
+        self._compaction_thread: threading.Thread | None = None
+        self._journal_size = 0
+
+        # ステータスごとのエントリー（dictの挿入順 = ステータス内の並び順）
+        self._entries: dict[QueueStatus, dict[str, QueueEntry]] = {
+            status: {} for status in QueueStatus
+        }
+        self._reply_index = ReplyIndex()
+        self._replay()
+
+    # --- 復元 ---
+
+    def _replay(self) -> None:
+        """スナップショットを読み込み、ジャーナルを再生して現在の状態を復元"""
+        for status in QueueStatus:
+            for entry in self._load_file(status):
+                entry.status = status
+                self._entries[status][entry.id] = entry
+
+        # 前回のコンパクションが途中で終わっていれば、その分から再生する
+        for journal in (self.compacting_file, self.journal_file):
+            self._replay_journal(journal)
+
+        self.rebuild_reply_index()
+
+    def _replay_journal(self, journal: Path) -> None:
+        """ジャーナルファイルを1行ずつ適用"""
+        if not journal.exists():
+            return
+
+        with open(journal, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    self._apply(json.loads(line))
+                except Exception as e:
+                    # 書き込み途中で落ちた最終行などは読み飛ばす
+                    print(f"⚠️  Skipping broken journal record {journal.name}:{line_no}: {e}")
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """ジャーナルレコードをメモリ上の状態に適用"""
+        if record["op"] in ("add", "move"):
+            self._place(QueueEntry.model_validate(record["entry"]))
+        elif record["op"] == "remove":
+            entries = self._entries[QueueStatus(record["status"])]
+            for entry_id in record["ids"]:
+                entries.pop(entry_id, None)
+        else:
+            raise ValueError(f"Unknown journal op: {record['op']}")
+
+    def _place(self, entry: QueueEntry) -> None:
+        """エントリーを現在のステータスの末尾に置く（他のステータスからは外す）"""
+        for entries in self._entries.values():
+            entries.pop(entry.id, None)
+        self._entries[entry.status][entry.id] = entry
+
+    # --- 書き込み ---
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """ジャーナルに1行追記"""
+        self._append_many([record])
+
+    def _append_many(self, records: list[dict[str, Any]]) -> None:
+        """ジャーナルに複数行をまとめて追記"""
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records
+        )
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            self._journal_size = f.tell()
+
+    def _maybe_compact(self) -> None:
+        """ジャーナルがしきい値を超えていればコンパクションを開始（メモリへの反映後に呼ぶ）"""
+        if self._journal_size >= self.compact_threshold:
+            self.compact(background=True)
+
+    def add(self, entry: QueueEntry) -> None:
+        """エントリーを追加"""
+        self._append({"op": "add", "entry": entry.model_dump(mode="json")})
+        self._place(entry)
+        self._index_entry(entry)
+        self._maybe_compact()
+
+    def move(
+        self,
+        entry_id: str,
+        from_status: QueueStatus,
+        to_status: QueueStatus,
+        update_fn: Callable[[QueueEntry], None] | None = None,
+    ) -> QueueEntry | None:
+        """エントリーを別ステータスに移動"""
+        entry = self._entries[from_status].get(entry_id)
+        if entry is None:
+            return None
+
+        entry.status = to_status
+        if update_fn:
+            update_fn(entry)
+
+        self._append(
+            {"op": "move", "from": from_status.value, "entry": entry.model_dump(mode="json")}
+        )
+        self._place(entry)
+        self._index_entry(entry)
+        self._maybe_compact()
+        return entry
+
+    def move_many(
+        self,
+        entry_ids: list[str],
+        from_status: QueueStatus,
+        to_status: QueueStatus,
+        update_fn: Callable[[QueueEntry], None] | None = None,
+    ) -> list[QueueEntry]:
+        """複数のエントリーをまとめて別ステータスに移動（ジャーナルへの追記は1回）"""
+        entries = self._entries[from_status]
+        moved = [entries[entry_id] for entry_id in entry_ids if entry_id in entries]
+        for entry in moved:
+            entry.status = to_status
+            if update_fn:
+                update_fn(entry)
+
+        if not moved:
+            return []
+        self._append_many(
+            [
+                {"op": "move", "from": from_status.value, "entry": entry.model_dump(mode="json")}
+                for entry in moved
+            ]
+        )
+        for entry in moved:
+            self._place(entry)
+            self._index_entry(entry)
+        self._maybe_compact()
+        return moved
+
+    def remove(self, status: QueueStatus, entry_ids: set[str]) -> None:
+        """指定ステータスからエントリーを削除（逆引きインデックスからも外す）"""
+        entries = self._entries[status]
+        removed = [entries[entry_id] for entry_id in entry_ids if entry_id in entries]
+        record = {"op": "remove", "status": status.value, "ids": sorted(entry_ids)}
+        self._append(record)
+        self._apply(record)
+        self._unindex_entries(removed)
+        self._maybe_compact()
+
+    # --- 読み込み ---
+
+    def get_by_id(self, entry_id: str) -> tuple[QueueEntry, QueueStatus] | None:
+        """IDでエントリーを検索"""
+        for status, entries in self._entries.items():
+            if entry_id in entries:
+                return entries[entry_id], status
+        return None
+
+    def get_all(self, status: QueueStatus) -> list[QueueEntry]:
+        """指定ステータスの全エントリーを取得（ファイルは読まない）"""
+        return list(self._entries[status].values())
+
+    def count(self, status: QueueStatus) -> int:
+        """指定ステータスのエントリー数を取得"""
+        return len(self._entries[status])
+
+    # --- 逆引きインデックス（メモリ上のみ） ---
+
+    def _get_reply_index(self) -> ReplyIndex:
+        """逆引きインデックスを取得"""
+        assert self._reply_index is not None
+        return self._reply_index
+
+    def _index_entry(self, entry: QueueEntry) -> None:
+        """逆引きインデックスに反映（ジャーナルから再生できるので保存しない）"""
+        self._get_reply_index().record(entry)
+
+    def rebuild_reply_index(self) -> None:
+        """メモリ上の全エントリーから逆引きインデックスを作り直す"""
+        self._get_reply_index().rebuild(
+            [entry for entries in self._entries.values() for entry in entries.values()]
+        )
+
+    # --- コンパクション ---
+
+    def compact(self, background: bool = False) -> bool:
+        """
+        ジャーナルをスナップショットに畳み込む
+
+        ジャーナルを journal.jsonl.compacting に退避してから現在の状態を書き出すので、
+        書き出し中の追記は新しい journal.jsonl に入る。
+        書き出しが終わるまで退避ファイルは残り、次回起動時に再生される。
+
+        Args:
+            background: Trueなら書き出しを別スレッドで行う
+
+        Returns:
+            コンパクションを開始した場合True（前回分が実行中ならFalse）
+        """
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return False
+        # 前回の退避分が残っていれば、今の状態を書き出すことでそれも畳み込める
+        if not self.compacting_file.exists():
+            if not self.journal_file.exists():
+                return False
+            os.replace(self.journal_file, self.compacting_file)
+            self._journal_size = 0
+
+        # 退避した時点の状態をここで確定させる（書き出しだけを別スレッドに回す）
+        snapshot = {
+            status: [entry.model_dump(mode="json") for entry in entries.values()]
+            for status, entries in self._entries.items()
+        }
+
+        if not background:
+            self._write_snapshot(snapshot)
+            return True
+
+        # 非daemonスレッドなので、プロセス終了時も書き出し完了を待つ
+        self._compaction_thread = threading.Thread(
+            target=self._write_snapshot, args=(snapshot,), name="queue-compaction"
+        )
+        self._compaction_thread.start()
+        return True
+
+    def _write_snapshot(self, snapshot: dict[QueueStatus, list[dict[str, Any]]]) -> None:
+        """スナップショットを書き出して退避ジャーナルを消す"""
+        try:
+            for status, data in snapshot.items():
+                file_path = self._get_file_path(status)
+                tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, file_path)
+            self.compacting_file.unlink(missing_ok=True)
+        except Exception as e:
+            # 退避ジャーナルは残るので、次回起動時に再生される
+            print(f"⚠️  Queue compaction failed: {e}")
+
+    def wait_for_compaction(self) -> None:
+        """実行中のコンパクションの完了を待つ"""
+        if self._compaction_thread:
+            self._compaction_thread.join()
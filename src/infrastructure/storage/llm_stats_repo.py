@@ -0,0 +1,58 @@
+"""
+LLM呼び出しの計測結果を管理
+"""
+
+from pathlib import Path
+
+from ..llm.metrics import LLMTickReport
+
+
+class LLMStatsRepository:
+    """tickごとのLLM計測結果をJSONLファイル（1行1tick）で永続化"""
+
+    def __init__(self, stats_file: Path, max_reports: int = 200):
+        """
+        Args:
+            stats_file: JSONLファイルのパス
+            max_reports: 残すtickの数（古いものから捨てる）
+        """
+        self.stats_file = stats_file
+        self.max_reports = max_reports
+
+    def load(self, limit: int | None = None) -> list[LLMTickReport]:
+        """
+        計測結果を古い順に読み込み
+
+        Args:
+            limit: 新しいものから何tick分読むか（Noneなら全部）
+        """
+        if not self.stats_file.exists():
+            return []
+
+        with open(self.stats_file, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        if limit is not None:
+            lines = lines[-limit:] if limit > 0 else []
+
+        reports: list[LLMTickReport] = []
+        for line in lines:
+            try:
+                reports.append(LLMTickReport.model_validate_json(line))
+            except Exception as e:
+                print(f"⚠️  Skipping broken LLM stats record: {e}")
+        return reports
+
+    def append(self, report: LLMTickReport) -> None:
+        """1tick分を追記（max_reportsを超えたら古いものを捨てる）"""
+        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(self.stats_file, "a", encoding="utf-8") as f:
+            f.write(report.model_dump_json() + "\n")
+
+        with open(self.stats_file, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        if len(lines) > self.max_reports:
+            tmp_file = self.stats_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.writelines(lines[-self.max_reports :])
+            tmp_file.replace(self.stats_file)
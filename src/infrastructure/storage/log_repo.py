@@ -2,22 +2,30 @@
 活動ログリポジトリ
 
 住人ごとの活動ログをMarkdownファイルとして保存・管理する。
+同じ内容を機械可読なJSONL（YYYY-MM-DD.jsonl）にも書き出す。
 7日分のログを保持し、古いログは自動削除する。
 """
 
-from datetime import datetime, timedelta
+import json
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Any
 
 from ...domain import DailyLog, LogEntry
 
+LOG_SUFFIXES = (".md", ".jsonl")
+
 
 class LogRepository:
     """活動ログリポジトリ"""
 
     RETENTION_DAYS = 7  # ログ保持日数
 
-    def __init__(self, residents_dir: str):
+    def __init__(self, residents_dir: str, buffered: bool = False):
         self.residents_dir = Path(residents_dir)
+        # buffered=True なら add_entry はためるだけで、flush() でまとめて書き出す
+        self.buffered = buffered
+        self._buffer: dict[tuple[int, date], list[LogEntry]] = {}
 
     def _get_log_dir(self, npc_id: int) -> Path:
         """ログディレクトリのパスを取得"""
@@ -36,25 +44,47 @@ class LogRepository:
 
     def add_entry(self, npc_id: int, entry: LogEntry) -> None:
         """ログエントリーを追加"""
+        key = (npc_id, datetime.now().date())
+        if self.buffered:
+            self._buffer.setdefault(key, []).append(entry)
+            return
+        self._write_entries(*key, [entry])
+
+    def flush(self) -> int:
+        """
+        ためたログエントリーを書き出す（住人・日付ごとに1回ずつ）
+
+        Returns:
+            書き出したログファイル数（Markdown単位）
+        """
+        buffer, self._buffer = self._buffer, {}
+        for (npc_id, day), entries in buffer.items():
+            self._write_entries(npc_id, day, entries)
+        return len(buffer)
+
+    def _write_entries(self, npc_id: int, day: date, entries: list[LogEntry]) -> None:
+        """指定日のログファイル（Markdown + JSONL）にまとめて追記"""
         self._ensure_log_dir(npc_id)
-        today = datetime.now().date()
-        log_path = self._get_log_path(npc_id, datetime.now())
+        log_path = self._get_log_path(npc_id, datetime.combine(day, datetime.min.time()))
 
-        # 既存のログを読み込むか、新規作成
         if log_path.exists():
             # 既存ファイルに追記
             with open(log_path, "a", encoding="utf-8") as f:
-                f.write(entry.to_markdown())
+                f.write("".join(entry.to_markdown() for entry in entries))
         else:
             # 新規作成（ヘッダー付き）
             daily_log = DailyLog(
                 npc_id=npc_id,
-                date=datetime.combine(today, datetime.min.time()),
-                entries=[entry],
+                date=datetime.combine(day, datetime.min.time()),
+                entries=entries,
             )
             with open(log_path, "w", encoding="utf-8") as f:
                 f.write(daily_log.to_markdown())
 
+        with open(log_path.with_suffix(".jsonl"), "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry.to_dict(), ensure_ascii=False, default=str) + "\n")
+
     def add_entries(self, npc_id: int, entries: list[LogEntry]) -> None:
         """複数のログエントリーを追加"""
         for entry in entries:
@@ -82,6 +112,19 @@ class LogRepository:
         with open(log_path, encoding="utf-8") as f:
             return f.read()
 
+    def get_structured_entries(self, npc_id: int, date: datetime) -> list[dict[str, Any]]:
+        """指定日のログをJSONLから取得（Markdownをパースせずに集計・デバッグに使う）"""
+        jsonl_path = self._get_log_path(npc_id, date).with_suffix(".jsonl")
+        if not jsonl_path.exists():
+            return []
+
+        entries: list[dict[str, Any]] = []
+        with open(jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        return entries
+
     def get_recent_logs(self, npc_id: int, days: int = 7) -> dict[str, str]:
         """直近N日分のログを取得
 
@@ -113,7 +156,7 @@ class LogRepository:
         cutoff_date = datetime.now() - timedelta(days=self.RETENTION_DAYS)
         deleted = 0
 
-        for log_file in log_dir.glob("*.md"):
+        for log_file in [path for suffix in LOG_SUFFIXES for path in log_dir.glob(f"*{suffix}")]:
             try:
                 # ファイル名から日付を抽出
                 date_str = log_file.stem  # e.g., "2025-12-26"
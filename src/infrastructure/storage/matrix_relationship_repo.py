@@ -0,0 +1,263 @@
+"""
+関係性リポジトリ（行列版）
+
+好感度・信頼度・親密度・最後の相互作用日時を NPC×NPC の numpy 配列で持ち、
+relationships/affinity.npz の1ファイルに保存する。
+疎遠による減衰や無視ペナルティは、ペアごとのループではなく配列演算でまとめて処理する。
+
+load_affinity() が返す Affinity は行列の1行分のビューで、save_affinity() で行列に書き戻す。
+グループ・ペア・ストーカー定義（YAML）の扱いは RelationshipRepository と同じ。
+
+numpy はオプション依存（pip install "sinov[matrix]"）。
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from ...domain import Affinity
+from .relationship_repo import RelationshipRepository
+from .unit_of_work import UnitOfWork, write_atomic
+
+FloatMatrix = npt.NDArray[np.float64]
+IndexArray = npt.NDArray[np.intp]
+
+# 値が未設定のセル（Affinityのdictにキーがない状態）はNaNで表す
+MATRIX_FIELDS = ("affinity", "trust", "familiarity", "last_interaction")
+
+
+class MatrixRelationshipRepository(RelationshipRepository):
+    """好感度を行列で管理（RelationshipRepositoryのドロップイン置き換え）"""
+
+    MATRIX_FILENAME = "affinity.npz"
+    MIN_CAPACITY = 8
+
+    def __init__(self, relationships_dir: Path, unit_of_work: UnitOfWork | None = None):
+        super().__init__(relationships_dir, unit_of_work)
+        self.matrix_file = relationships_dir / self.MATRIX_FILENAME
+
+        self._names: list[str] = []
+        self._index: dict[str, int] = {}
+        self._owners: set[int] = set()  # 自分の行を持つNPC（JSON版のファイルがあるNPCに相当）
+        self._matrices: dict[str, FloatMatrix] = {
+            field: np.full((0, 0), np.nan) for field in MATRIX_FIELDS
+        }
+        self._views: dict[str, Affinity] = {}
+        self._load_matrix()
+
+    # --- 読み込み・保存 ---
+
+    def _load_matrix(self) -> None:
+        """行列ファイルを読み込み（なければ既存のJSONファイルから取り込む）"""
+        if self.matrix_file.exists():
+            try:
+                with np.load(self.matrix_file) as data:
+                    for name in data["names"]:
+                        self._ensure(str(name))
+                    size = len(self._names)
+                    for field in MATRIX_FIELDS:
+                        self._matrices[field][:size, :size] = data[field]
+                    self._owners = {int(i) for i in np.flatnonzero(data["owners"])}
+                return
+            except Exception as e:
+                print(f"⚠️  Failed to load {self.matrix_file}: {e}")
+
+        for affinity_file in sorted(self.affinity_dir.glob("*.json")):
+            self._write_row(self._read_affinity(affinity_file.stem))
+
+    def _write_npz(self, path: Path) -> None:
+        """行列をnpz形式で書き出す"""
+        size = len(self._names)
+        owners = np.zeros(size, dtype=bool)
+        owners[list(self._owners)] = True
+        matrices = {field: self._matrices[field][:size, :size] for field in MATRIX_FIELDS}
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                names=np.array(self._names, dtype=str),
+                owners=owners,
+                affinity=matrices["affinity"],
+                trust=matrices["trust"],
+                familiarity=matrices["familiarity"],
+                last_interaction=matrices["last_interaction"],
+            )
+
+    def _mark_dirty(self) -> None:
+        """行列ファイルを保存（ユニットオブワークがあればcommit時）"""
+        if self.unit_of_work:
+            self.unit_of_work.mark_dirty_file(self.matrix_file, self._write_npz)
+        else:
+            write_atomic(self.matrix_file, self._write_npz)
+
+    # --- 行列の操作 ---
+
+    def _ensure(self, npc_id: str) -> int:
+        """NPC IDの行・列番号を取得（なければ追加して行列を広げる）"""
+        index = self._index.get(npc_id)
+        if index is not None:
+            return index
+
+        index = len(self._names)
+        self._names.append(npc_id)
+        self._index[npc_id] = index
+
+        capacity = self._matrices["affinity"].shape[0]
+        if index >= capacity:
+            new_capacity = max(self.MIN_CAPACITY, capacity * 2)
+            for field, matrix in self._matrices.items():
+                grown = np.full((new_capacity, new_capacity), np.nan)
+                grown[:capacity, :capacity] = matrix
+                self._matrices[field] = grown
+        return index
+
+    def _row_dict(self, field: str, row: int) -> dict[str, float]:
+        """行列の1行をdictに変換（未設定のセルは含めない）"""
+        values = self._matrices[field][row, : len(self._names)]
+        return {self._names[col]: float(values[col]) for col in np.flatnonzero(~np.isnan(values))}
+
+    def _read_row(self, npc_id: str) -> Affinity:
+        """行列の1行からAffinityを作成"""
+        row = self._index.get(npc_id)
+        if row is None:
+            return Affinity(npc_id=npc_id)
+
+        return Affinity(
+            npc_id=npc_id,
+            targets=self._row_dict("affinity", row),
+            trust=self._row_dict("trust", row),
+            familiarity=self._row_dict("familiarity", row),
+            last_interactions={
+                target_id: datetime.fromtimestamp(timestamp).isoformat()
+                for target_id, timestamp in self._row_dict("last_interaction", row).items()
+            },
+        )
+
+    def _write_row(self, affinity: Affinity) -> None:
+        """Affinityの内容で行列の1行を置き換える"""
+        row = self._ensure(affinity.npc_id)
+        # 行列を広げる可能性があるので、先に全ての列を確保する
+        for target_id in (
+            *affinity.targets,
+            *affinity.trust,
+            *affinity.familiarity,
+            *affinity.last_interactions,
+        ):
+            self._ensure(target_id)
+
+        for matrix in self._matrices.values():
+            matrix[row, :] = np.nan
+        for field, values in (
+            ("affinity", affinity.targets),
+            ("trust", affinity.trust),
+            ("familiarity", affinity.familiarity),
+        ):
+            for target_id, value in values.items():
+                self._matrices[field][row, self._index[target_id]] = value
+        for target_id, timestamp in affinity.last_interactions.items():
+            try:
+                self._matrices["last_interaction"][row, self._index[target_id]] = (
+                    datetime.fromisoformat(timestamp).timestamp()
+                )
+            except ValueError:
+                continue
+        self._owners.add(row)
+
+    def _pair_indices(
+        self, pairs: Iterable[tuple[str, str]], create: bool
+    ) -> tuple[IndexArray, IndexArray]:
+        """(NPC ID, 対象NPC ID) の組を行・列番号の配列に変換"""
+        rows: list[int] = []
+        cols: list[int] = []
+        for npc_id, target_id in pairs:
+            if create:
+                rows.append(self._ensure(npc_id))
+                cols.append(self._ensure(target_id))
+            elif npc_id in self._index and target_id in self._index:
+                rows.append(self._index[npc_id])
+                cols.append(self._index[target_id])
+        return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+    def _apply_bulk_update(self, rows: IndexArray, cols: IndexArray, values: FloatMatrix) -> None:
+        """好感度をまとめて書き込み、該当する行のビューを更新して保存"""
+        if not rows.size:
+            return
+
+        self._matrices["affinity"][rows, cols] = values
+        for row in {int(r) for r in rows}:
+            self._owners.add(row)
+            view = self._views.get(self._names[row])
+            if view is not None:
+                view.targets = self._row_dict("affinity", row)
+        self._mark_dirty()
+
+    # --- 好感度（RelationshipRepositoryと同じAPI） ---
+
+    def load_affinity(self, npc_id: str) -> Affinity:
+        """指定NPCの好感度を読み込み（同じNPCには同じビューを返す）"""
+        view = self._views.get(npc_id)
+        if view is None:
+            view = self._read_row(npc_id)
+            self._views[npc_id] = view
+        return view
+
+    def save_affinity(self, affinity: Affinity) -> None:
+        """好感度を行列に書き戻して保存"""
+        self._write_row(affinity)
+        self._views[affinity.npc_id] = affinity
+        self._mark_dirty()
+
+    def load_all_affinities(self) -> dict[str, Affinity]:
+        """全NPCの好感度を読み込み"""
+        return {
+            self._names[row]: self.load_affinity(self._names[row]) for row in sorted(self._owners)
+        }
+
+    def decay_stale_affinities(
+        self, related: dict[str, list[str]], before: datetime, delta: float
+    ) -> int:
+        """最後の相互作用が古い関係の好感度を配列演算でまとめて変化させる"""
+        rows, cols = self._pair_indices(
+            ((npc_id, target_id) for npc_id, targets in related.items() for target_id in targets),
+            create=False,
+        )
+        if not rows.size:
+            return 0
+
+        # 重複した組は1回として扱う（JSON版と同じ）
+        size = self._matrices["affinity"].shape[0]
+        rows, cols = np.divmod(np.unique(rows * size + cols), size)
+
+        last_interaction = self._matrices["last_interaction"][rows, cols]
+        with np.errstate(invalid="ignore"):
+            stale = last_interaction < before.timestamp()  # NaN（相互作用なし）は対象外
+        rows, cols = rows[stale], cols[stale]
+
+        current = np.nan_to_num(self._matrices["affinity"][rows, cols], nan=0.0)
+        updated = np.clip(current + delta, -1.0, 1.0)
+        changed = updated != current
+
+        self._apply_bulk_update(rows[changed], cols[changed], updated[changed])
+        return int(changed.sum())
+
+    def penalize_affinities(self, pairs: list[tuple[str, str]], delta: float) -> int:
+        """組ごとの好感度の変化を配列演算でまとめて適用（同じ組は回数分）"""
+        if not pairs or delta == 0:
+            return 0
+
+        rows, cols = self._pair_indices(pairs, create=True)
+        size = self._matrices["affinity"].shape[0]
+        flat, counts = np.unique(rows * size + cols, return_counts=True)
+        rows, cols = np.divmod(flat, size)
+
+        current = np.nan_to_num(self._matrices["affinity"][rows, cols], nan=0.0)
+        bound = -1.0 if delta < 0 else 1.0
+        # 上限・下限に張り付くまでに値が変わる回数（1回ずつ適用した場合と同じ数え方）
+        steps = np.clip(np.ceil((bound - current) / delta - 1e-9), 0, counts)
+        updated = np.clip(current + counts * delta, -1.0, 1.0)
+        changed = steps > 0
+
+        self._apply_bulk_update(rows[changed], cols[changed], updated[changed])
+        return int(steps.sum())
@@ -18,6 +18,14 @@ class MemoryRepository(ResidentJsonRepository):
 
     def load(self, npc_id: int) -> NpcMemory:
         """記憶を読み込み（ファイルがなければデフォルト）"""
+        if self.unit_of_work:
+            return self.unit_of_work.load(
+                self._get_file_path(npc_id), NpcMemory, lambda: self._read(npc_id)
+            )
+        return self._read(npc_id)
+
+    def _read(self, npc_id: int) -> NpcMemory:
+        """ファイルから記憶を読み込み"""
         file_path = self._get_file_path(npc_id)
 
         if not file_path.exists():
@@ -36,7 +44,7 @@ class MemoryRepository(ResidentJsonRepository):
         """記憶を保存"""
         file_path = self._get_file_path(memory.npc_id)
         memory.last_updated = datetime.now().isoformat()
-        self._save_json(file_path, memory.model_dump(mode="json"))
+        self._save_model(file_path, memory, lambda: memory.model_dump(mode="json"))
 
     def load_all(self) -> dict[int, NpcMemory]:
         """全NPCの記憶を読み込み"""
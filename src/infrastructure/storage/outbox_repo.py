@@ -0,0 +1,153 @@
+"""
+投稿のアウトボックス（SQLite）
+
+approved のエントリーを送る前に、署名済みのイベント（JSON）とイベントIDをここに保存する。
+送信に失敗したり送信後に落ちたりしても、次は同じイベントをそのまま送り直せる
+（同じイベントIDなのでAPI側で重複になり、二重投稿にならない）。
+送信に成功して投稿済みに移したら、ここから消す。
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    entry_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    npc_id INTEGER NOT NULL,
+    thread TEXT,
+    event_id TEXT NOT NULL,
+    event_json TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_seq ON outbox (seq);
+"""
+
+COLUMNS = (
+    "entry_id, seq, npc_id, thread, event_id, event_json, attempts, next_attempt_at, last_error"
+)
+
+
+@dataclass
+class OutboxRecord:
+    """送信待ちの署名済みイベント"""
+
+    entry_id: str  # キューのエントリーID
+    npc_id: int
+    event_id: str
+    event_json: str
+    thread: str | None = None  # リプライ・リアクション先のイベントID
+    seq: int = 0  # 追加した順
+    attempts: int = 0  # 失敗した回数
+    next_attempt_at: float = 0.0  # 次に送ってよい時刻（time.time() の値）
+    last_error: str | None = None
+
+    def is_due(self, now: float) -> bool:
+        """今送ってよいか"""
+        return self.next_attempt_at <= now
+
+
+class OutboxRepository:
+    """署名済みイベントをSQLiteに保存"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 送る前に確実にディスクに書いておく
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """DB接続を閉じる"""
+        self._conn.close()
+
+    def add_many(self, records: list[OutboxRecord]) -> None:
+        """
+        まとめて追加（1トランザクション）
+
+        同じエントリーがすでにあれば何もしない（最初に署名したイベントを使い続ける）。
+        """
+        if not records:
+            return
+        with self._conn:
+            row = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM outbox").fetchone()
+            seq = int(row[0])
+            for record in records:
+                seq += 1
+                record.seq = seq
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO outbox "
+                    "(entry_id, seq, npc_id, thread, event_id, event_json, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record.entry_id,
+                        seq,
+                        record.npc_id,
+                        record.thread,
+                        record.event_id,
+                        record.event_json,
+                        time.time(),
+                    ),
+                )
+
+    def entry_ids(self) -> set[str]:
+        """保存しているエントリーID"""
+        return {row[0] for row in self._conn.execute("SELECT entry_id FROM outbox")}
+
+    def get_all(self) -> list[OutboxRecord]:
+        """全件を追加した順に取得"""
+        rows = self._conn.execute(f"SELECT {COLUMNS} FROM outbox ORDER BY seq")
+        return [
+            OutboxRecord(
+                entry_id=entry_id,
+                seq=seq,
+                npc_id=npc_id,
+                thread=thread,
+                event_id=event_id,
+                event_json=event_json,
+                attempts=attempts,
+                next_attempt_at=next_attempt_at,
+                last_error=last_error,
+            )
+            for (
+                entry_id,
+                seq,
+                npc_id,
+                thread,
+                event_id,
+                event_json,
+                attempts,
+                next_attempt_at,
+                last_error,
+            ) in rows
+        ]
+
+    def record_failure(self, entry_id: str, error: str, next_attempt_at: float) -> None:
+        """送信の失敗を記録（次に送ってよい時刻を先に延ばす）"""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                "WHERE entry_id = ?",
+                (next_attempt_at, error, entry_id),
+            )
+
+    def remove_many(self, entry_ids: list[str]) -> None:
+        """まとめて削除"""
+        if not entry_ids:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM outbox WHERE entry_id = ?", [(entry_id,) for entry_id in entry_ids]
+            )
+
+    def count(self) -> int:
+        """件数"""
+        row = self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()
+        return int(row[0])
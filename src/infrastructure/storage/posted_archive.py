@@ -0,0 +1,136 @@
+"""
+投稿済みエントリーのアーカイブ
+
+古くなった posted エントリーを日付ごとのファイル（archive/posted-YYYY-MM-DD.json）に移す。
+gzip圧縮（.json.gz）にも対応し、読み込み時はどちらの形式も扱う。
+"""
+
+import gzip
+import json
+from collections.abc import Iterable
+from datetime import date, datetime
+from pathlib import Path
+from typing import TextIO
+
+from ...domain import QueueEntry
+
+PARTITION_PREFIX = "posted-"
+
+
+def archived_at(entry: QueueEntry) -> datetime:
+    """エントリーをどの日付に振り分けるかの基準日時（投稿日時、なければ作成日時）"""
+    return entry.posted_at or entry.created_at
+
+
+class PostedArchive:
+    """日付パーティションに分けた投稿済みエントリーのアーカイブ"""
+
+    def __init__(self, archive_dir: Path, compress: bool = False):
+        self.archive_dir = archive_dir
+        self.compress = compress
+
+    def _partition_path(self, day: date, compress: bool) -> Path:
+        """日付に対応するパーティションファイルのパス"""
+        suffix = ".json.gz" if compress else ".json"
+        return self.archive_dir / f"{PARTITION_PREFIX}{day.isoformat()}{suffix}"
+
+    def _open(self, path: Path, write: bool = False) -> TextIO:
+        """拡張子に応じてgzipか通常のファイルとして開く"""
+        if path.suffix == ".gz":
+            return gzip.open(path, "wt" if write else "rt", encoding="utf-8")
+        return open(path, "w" if write else "r", encoding="utf-8")
+
+    def _load_partition(self, day: date) -> list[QueueEntry]:
+        """指定日のパーティションを読み込み（圧縮・非圧縮の両方）"""
+        entries: list[QueueEntry] = []
+        for compress in (False, True):
+            path = self._partition_path(day, compress)
+            if not path.exists():
+                continue
+            try:
+                with self._open(path) as f:
+                    entries.extend(QueueEntry.model_validate(entry) for entry in json.load(f))
+            except Exception as e:
+                print(f"⚠️  Failed to load {path}: {e}")
+        return entries
+
+    def _save_partition(self, day: date, entries: list[QueueEntry]) -> None:
+        """指定日のパーティションを保存（もう一方の形式のファイルは消す）"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self._partition_path(day, self.compress)
+        data = [entry.model_dump(mode="json") for entry in entries]
+        with self._open(path, write=True) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        self._partition_path(day, not self.compress).unlink(missing_ok=True)
+
+    def append(self, entries: Iterable[QueueEntry]) -> int:
+        """
+        エントリーを日付ごとのパーティションに追加
+
+        同じIDのエントリーが既にあれば上書きするので、再実行しても重複しない。
+
+        Returns:
+            追加したエントリー数
+        """
+        by_day: dict[date, list[QueueEntry]] = {}
+        for entry in entries:
+            by_day.setdefault(archived_at(entry).date(), []).append(entry)
+
+        for day, new_entries in by_day.items():
+            merged = {entry.id: entry for entry in self._load_partition(day)}
+            merged.update((entry.id, entry) for entry in new_entries)
+            self._save_partition(day, sorted(merged.values(), key=archived_at))
+
+        return sum(len(new_entries) for new_entries in by_day.values())
+
+    def remove(self, entry_ids: set[str]) -> int:
+        """
+        指定IDのエントリーをアーカイブから削除（空になったパーティションは消す）
+
+        Returns:
+            削除したエントリー数
+        """
+        removed = 0
+        for day in self.partition_days():
+            entries = self._load_partition(day)
+            kept = [entry for entry in entries if entry.id not in entry_ids]
+            if len(kept) == len(entries):
+                continue
+            removed += len(entries) - len(kept)
+            if kept:
+                self._save_partition(day, kept)
+            else:
+                for compress in (False, True):
+                    self._partition_path(day, compress).unlink(missing_ok=True)
+        return removed
+
+    def partition_days(self) -> list[date]:
+        """アーカイブ済みの日付一覧（古い順）"""
+        if not self.archive_dir.exists():
+            return []
+
+        days: set[date] = set()
+        for path in self.archive_dir.glob(f"{PARTITION_PREFIX}*.json*"):
+            stem = path.name[len(PARTITION_PREFIX) :].split(".", 1)[0]
+            try:
+                days.add(date.fromisoformat(stem))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def query(self, start: date, end: date) -> list[QueueEntry]:
+        """
+        期間内のアーカイブを取得（範囲外のパーティションは読まない）
+
+        Args:
+            start: 開始日（この日を含む）
+            end: 終了日（この日を含む）
+
+        Returns:
+            エントリーのリスト（古い順）
+        """
+        entries: list[QueueEntry] = []
+        for day in self.partition_days():
+            if start <= day <= end:
+                entries.extend(self._load_partition(day))
+        return entries
@@ -3,10 +3,12 @@ NPCプロフィールリポジトリ
 """
 
 from pathlib import Path
+from typing import Any
 
 import yaml
 
 from ...domain import NpcProfile, Prompts, format_npc_name
+from .snapshot_cache import SnapshotCache
 
 
 class ProfileRepository:
@@ -17,10 +19,12 @@ class ProfileRepository:
         residents_dir: Path,
         backend_dir: Path | None = None,
         bots_dir: Path | None = None,
+        snapshot_cache: SnapshotCache | None = None,
     ):
         self.residents_dir = residents_dir
         self.backend_dir = backend_dir
         self.bots_dir = bots_dir or residents_dir.parent
+        self.snapshot_cache = snapshot_cache
         self._common_prompts: Prompts | None = None
 
     def load_common_prompts(self) -> Prompts:
@@ -124,14 +128,21 @@ class ProfileRepository:
     def load(self, profile_file: Path) -> NpcProfile:
         """単一プロフィールを読み込み"""
         try:
-            with open(profile_file) as f:
-                data = yaml.safe_load(f)
+            if self.snapshot_cache:
+                data = self.snapshot_cache.get(profile_file, self._parse_yaml)
+            else:
+                data = self._parse_yaml(profile_file)
 
             profile = NpcProfile.model_validate(data)
             return profile
         except Exception as e:
             raise ValueError(f"Failed to load profile from {profile_file}: {e}") from e
 
+    def _parse_yaml(self, profile_file: Path) -> Any:
+        """profile.yamlをパース"""
+        with open(profile_file) as f:
+            return yaml.safe_load(f)
+
     def load_by_id(self, npc_id: int) -> NpcProfile | None:
         """IDで住人プロフィールを読み込み"""
         resident_dir = self.residents_dir / format_npc_name(npc_id)
@@ -0,0 +1,43 @@
+"""
+プロンプトサイズの集計を管理
+"""
+
+import json
+from pathlib import Path
+
+from ...domain import PromptStats
+
+
+class PromptStatsRepository:
+    """NPC・用途ごとのプロンプトサイズをJSONファイルで永続化"""
+
+    def __init__(self, stats_file: Path):
+        self.stats_file = stats_file
+
+    def load(self) -> PromptStats:
+        """集計を読み込み（ファイルがなければ空）"""
+        if not self.stats_file.exists():
+            return PromptStats()
+
+        try:
+            with open(self.stats_file, encoding="utf-8") as f:
+                data = json.load(f)
+            return PromptStats.model_validate(data)
+        except Exception as e:
+            print(f"⚠️  Failed to load prompt stats: {e}")
+            return PromptStats()
+
+    def save(self, stats: PromptStats) -> None:
+        """集計を保存"""
+        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(self.stats_file, "w", encoding="utf-8") as f:
+            json.dump(stats.model_dump(mode="json"), f, indent=2, ensure_ascii=False)
+
+    def add(self, stats: PromptStats) -> None:
+        """今回の集計を保存済みの集計に足し込む"""
+        if not stats.npcs:
+            return
+        total = self.load()
+        total.merge(stats)
+        self.save(total)
@@ -4,18 +4,25 @@
 
 import json
 from collections.abc import Callable
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 from ...domain import QueueEntry, QueueStatus
+from .posted_archive import PostedArchive, archived_at
+from .reply_index import ReplyIndex
 
 
 class QueueRepository:
     """ステータスごとにファイルを分けてキューを管理"""
 
-    def __init__(self, queue_dir: Path):
+    REPLY_INDEX_FILENAME = "reply_index.json"
+    ARCHIVE_DIRNAME = "archive"
+
+    def __init__(self, queue_dir: Path, archive_compress: bool = False):
         self.queue_dir = queue_dir
         self.queue_dir.mkdir(parents=True, exist_ok=True)
+        self._reply_index: ReplyIndex | None = None
+        self.archive = PostedArchive(queue_dir / self.ARCHIVE_DIRNAME, archive_compress)
 
     def _get_file_path(self, status: QueueStatus) -> Path:
         """ステータスに対応するファイルパスを取得"""
@@ -48,6 +55,7 @@ class QueueRepository:
         entries = self._load_file(entry.status)
         entries.append(entry)
         self._save_file(entry.status, entries)
+        self._index_entry(entry)
 
     def get_by_id(self, entry_id: str) -> tuple[QueueEntry, QueueStatus] | None:
         """IDでエントリーを検索（全ステータスを横断）"""
@@ -97,9 +105,41 @@ class QueueRepository:
         to_entries = self._load_file(to_status)
         to_entries.append(entry_to_move)
         self._save_file(to_status, to_entries)
+        self._index_entry(entry_to_move)
 
         return entry_to_move
 
+    def move_many(
+        self,
+        entry_ids: list[str],
+        from_status: QueueStatus,
+        to_status: QueueStatus,
+        update_fn: Callable[[QueueEntry], None] | None = None,
+    ) -> list[QueueEntry]:
+        """
+        複数のエントリーをまとめて別ステータスに移動（ファイルの読み書きは1回ずつ）
+
+        Returns:
+            移動したエントリー（entry_idsの順、見つからなかったものは含まない）
+        """
+        wanted = set(entry_ids)
+        from_entries = self._load_file(from_status)
+        found = {entry.id: entry for entry in from_entries if entry.id in wanted}
+        if not found:
+            return []
+
+        moved = [found[entry_id] for entry_id in entry_ids if entry_id in found]
+        for entry in moved:
+            entry.status = to_status
+            if update_fn:
+                update_fn(entry)
+
+        self._save_file(from_status, [entry for entry in from_entries if entry.id not in found])
+        self._save_file(to_status, self._load_file(to_status) + moved)
+        for entry in moved:
+            self._index_entry(entry)
+        return moved
+
     def approve(self, entry_id: str, note: str | None = None) -> QueueEntry | None:
         """エントリーを承認"""
 
@@ -128,6 +168,20 @@ class QueueRepository:
             update,
         )
 
+    def mark_failed(self, entry_id: str, note: str | None = None) -> QueueEntry | None:
+        """送信をあきらめたエントリーを approved から rejected に移す"""
+
+        def update(entry: QueueEntry) -> None:
+            entry.reviewed_at = datetime.now()
+            entry.review_note = note
+
+        return self.move(
+            entry_id,
+            QueueStatus.APPROVED,
+            QueueStatus.REJECTED,
+            update,
+        )
+
     def mark_posted(self, entry_id: str, event_id: str | None = None) -> QueueEntry | None:
         """エントリーを投稿済みにする"""
 
@@ -142,6 +196,80 @@ class QueueRepository:
             update,
         )
 
+    def mark_posted_many(self, event_ids: dict[str, str]) -> list[QueueEntry]:
+        """
+        複数のエントリーをまとめて投稿済みにする
+
+        Args:
+            event_ids: エントリーID → イベントID（投稿した順）
+        """
+        posted_at = datetime.now()
+
+        def update(entry: QueueEntry) -> None:
+            entry.posted_at = posted_at
+            entry.event_id = event_ids[entry.id]
+
+        return self.move_many(list(event_ids), QueueStatus.APPROVED, QueueStatus.POSTED, update)
+
+    def remove(self, status: QueueStatus, entry_ids: set[str]) -> None:
+        """指定ステータスからエントリーを削除（逆引きインデックスからも外す）"""
+        entries = self._load_file(status)
+        self._save_file(status, [entry for entry in entries if entry.id not in entry_ids])
+        self._unindex_entries([entry for entry in entries if entry.id in entry_ids])
+
+    def archive_posted(self, hot_window_hours: float, now: datetime | None = None) -> int:
+        """
+        古い投稿済みエントリーを日付ごとのアーカイブに移す
+
+        posted には直近 hot_window_hours 時間分だけを残し、
+        posted を毎tick読む処理の読み込み量を履歴の長さに比例させない。
+        アーカイブへの書き込みを先に行うので、途中で落ちても消えることはない。
+
+        Args:
+            hot_window_hours: posted に残す時間幅
+            now: 基準日時（省略時は現在時刻）
+
+        Returns:
+            アーカイブしたエントリー数
+        """
+        cutoff = (now or datetime.now()) - timedelta(hours=hot_window_hours)
+        old_entries = [e for e in self.get_all(QueueStatus.POSTED) if archived_at(e) < cutoff]
+        if not old_entries:
+            return 0
+
+        self.archive.append(old_entries)
+        self.remove(QueueStatus.POSTED, {entry.id for entry in old_entries})
+        return len(old_entries)
+
+    def get_archived_posted(self, start: date, end: date | None = None) -> list[QueueEntry]:
+        """
+        アーカイブ済みの投稿済みエントリーを期間指定で取得
+
+        Args:
+            start: 開始日（この日を含む）
+            end: 終了日（この日を含む、省略時はstartと同じ日）
+
+        Returns:
+            エントリーのリスト（古い順）
+        """
+        return self.archive.query(start, end or start)
+
+    def get_all_posted(self) -> list[QueueEntry]:
+        """アーカイブ済みも含めた全投稿済みエントリーを取得（アーカイブ分が先）"""
+        days = self.archive.partition_days()
+        archived = self.get_archived_posted(days[0], days[-1]) if days else []
+        return archived + self.get_all(QueueStatus.POSTED)
+
+    def remove_posted(self, entry_ids: set[str]) -> int:
+        """
+        投稿済みエントリーを posted とアーカイブの両方から削除
+
+        Returns:
+            アーカイブから削除したエントリー数
+        """
+        self.remove(QueueStatus.POSTED, entry_ids)
+        return self.archive.remove(entry_ids)
+
     def count(self, status: QueueStatus) -> int:
         """指定ステータスのエントリー数を取得"""
         return len(self._load_file(status))
@@ -166,3 +294,66 @@ class QueueRepository:
         # 作成日時で降順ソート
         bot_entries.sort(key=lambda x: x.created_at, reverse=True)
         return bot_entries[:limit]
+
+    def _get_reply_index(self) -> ReplyIndex:
+        """
+        逆引きインデックスを取得
+
+        初回はファイルから読み込む。ファイルがない・キューファイルと指紋が合わない
+        （flushせずに落ちた・キューファイルを直接書き換えた）ときはキューから作り直す。
+        """
+        if self._reply_index is None:
+            self._reply_index = ReplyIndex(self.queue_dir / self.REPLY_INDEX_FILENAME)
+            if not self._reply_index.load(self._queue_fingerprint()):
+                self.rebuild_reply_index()
+        return self._reply_index
+
+    def _index_entry(self, entry: QueueEntry) -> None:
+        """書き込んだエントリーを逆引きインデックスに反映（書き出しはflushで）"""
+        self._get_reply_index().record(entry)
+
+    def _unindex_entries(self, entries: list[QueueEntry]) -> None:
+        """
+        削除したエントリーを逆引きインデックスから外す
+
+        未読み込みならキューファイルの指紋が変わっているので、次の読み込みで作り直される。
+        """
+        if self._reply_index is not None and entries:
+            self._reply_index.prune(entries)
+
+    def rebuild_reply_index(self) -> None:
+        """全ステータスのファイルから逆引きインデックスを作り直す（書き出しはflushで）"""
+        index = self._reply_index or ReplyIndex(self.queue_dir / self.REPLY_INDEX_FILENAME)
+        index.rebuild([entry for status in QueueStatus for entry in self._load_file(status)])
+        self._reply_index = index
+
+    def _queue_fingerprint(self) -> dict[str, list[int]]:
+        """キューファイルの指紋（ステータス → [更新時刻(ns), サイズ]）"""
+        fingerprint: dict[str, list[int]] = {}
+        for status in QueueStatus:
+            path = self._get_file_path(status)
+            if path.exists():
+                stat = path.stat()
+                fingerprint[status.value] = [stat.st_mtime_ns, stat.st_size]
+        return fingerprint
+
+    def flush(self) -> int:
+        """
+        逆引きインデックスの変更をファイルに書き出す
+
+        Returns:
+            書き出したファイル数
+        """
+        index = self._reply_index
+        if index is None or index.index_file is None or not index.dirty:
+            return 0
+        index.save(self._queue_fingerprint())
+        return 1
+
+    def has_replied(self, npc_id: int, event_id: str) -> bool:
+        """指定NPCが指定イベントにリプライ/リアクション済みか（pending/approved/posted）"""
+        return self._get_reply_index().has_replied(npc_id, event_id)
+
+    def has_any_reaction(self, event_id: str) -> bool:
+        """指定イベントに誰かがリプライ/リアクション済みか（pending/approved/posted）"""
+        return self._get_reply_index().has_any_reaction(event_id)
@@ -5,6 +5,7 @@
 """
 
 import json
+from datetime import datetime
 from pathlib import Path
 
 import yaml
@@ -21,6 +22,7 @@ from ...domain import (
     StalkerReaction,
     StalkerTarget,
 )
+from .unit_of_work import UnitOfWork
 
 # 関係タイプから好感度への変換マップ
 PAIR_TYPE_AFFINITY: dict[str, float] = {
@@ -35,8 +37,9 @@ PAIR_TYPE_AFFINITY: dict[str, float] = {
 class RelationshipRepository:
     """関係性データの永続化"""
 
-    def __init__(self, relationships_dir: Path):
+    def __init__(self, relationships_dir: Path, unit_of_work: UnitOfWork | None = None):
         self.relationships_dir = relationships_dir
+        self.unit_of_work = unit_of_work
         self.groups_file = relationships_dir / "groups.yaml"
         self.pairs_file = relationships_dir / "pairs.yaml"
         self.stalkers_file = relationships_dir / "stalkers.yaml"
@@ -170,6 +173,14 @@ class RelationshipRepository:
 
     def load_affinity(self, npc_id: str) -> Affinity:
         """指定NPCの好感度を読み込み"""
+        if self.unit_of_work:
+            return self.unit_of_work.load(
+                self.affinity_dir / f"{npc_id}.json", Affinity, lambda: self._read_affinity(npc_id)
+            )
+        return self._read_affinity(npc_id)
+
+    def _read_affinity(self, npc_id: str) -> Affinity:
+        """ファイルから好感度を読み込み"""
         affinity_file = self.affinity_dir / f"{npc_id}.json"
 
         if not affinity_file.exists():
@@ -182,12 +193,19 @@ class RelationshipRepository:
             npc_id=data.get("npc_id", npc_id),
             targets=data.get("targets", {}),
             last_interactions=data.get("last_interactions", {}),
+            trust=data.get("trust", {}),
+            familiarity=data.get("familiarity", {}),
         )
 
     def save_affinity(self, affinity: Affinity) -> None:
         """好感度を保存"""
         affinity_file = self.affinity_dir / f"{affinity.npc_id}.json"
 
+        # ユニットオブワークがあればcommitまで書き出しを遅らせる
+        if self.unit_of_work:
+            self.unit_of_work.mark_dirty(affinity_file, affinity, affinity.model_dump)
+            return
+
         with open(affinity_file, "w", encoding="utf-8") as f:
             json.dump(affinity.model_dump(), f, ensure_ascii=False, indent=2)
 
@@ -204,6 +222,79 @@ class RelationshipRepository:
 
         return affinities
 
+    def decay_stale_affinities(
+        self, related: dict[str, list[str]], before: datetime, delta: float
+    ) -> int:
+        """
+        最後の相互作用が古い関係の好感度をまとめて変化させる
+
+        Args:
+            related: NPC ID → 対象にする関係者のNPC ID一覧
+            before: これより前に最後の相互作用があった関係だけを対象にする
+            delta: 好感度の変化量
+
+        Returns:
+            好感度が変化した関係の数
+        """
+        changed_count = 0
+
+        for npc_id, targets in related.items():
+            affinity = self.load_affinity(npc_id)
+            updated = False
+
+            for target_id in targets:
+                last_interaction = affinity.get_last_interaction(target_id)
+                if not last_interaction:
+                    continue
+                try:
+                    if datetime.fromisoformat(last_interaction) >= before:
+                        continue
+                except ValueError:
+                    continue
+
+                old_value = affinity.get_affinity(target_id)
+                if affinity.update_affinity(target_id, delta) != old_value:
+                    changed_count += 1
+                    updated = True
+
+            if updated:
+                self.save_affinity(affinity)
+
+        return changed_count
+
+    def penalize_affinities(self, pairs: list[tuple[str, str]], delta: float) -> int:
+        """
+        (NPC ID, 対象NPC ID) の組ごとに好感度をまとめて変化させる
+
+        同じ組が複数回含まれていれば、その回数だけ変化させる。
+
+        Args:
+            pairs: 好感度を持つ側と対象の組の一覧
+            delta: 1回あたりの好感度の変化量
+
+        Returns:
+            好感度が変化した回数
+        """
+        by_npc: dict[str, list[str]] = {}
+        for npc_id, target_id in pairs:
+            by_npc.setdefault(npc_id, []).append(target_id)
+
+        changed_count = 0
+        for npc_id, targets in by_npc.items():
+            affinity = self.load_affinity(npc_id)
+            updated = False
+
+            for target_id in targets:
+                old_value = affinity.get_affinity(target_id)
+                if affinity.update_affinity(target_id, delta) != old_value:
+                    changed_count += 1
+                    updated = True
+
+            if updated:
+                self.save_affinity(affinity)
+
+        return changed_count
+
     def initialize_affinities_from_relationships(self, relationship_data: RelationshipData) -> None:
         """関係性データから好感度の初期値を設定"""
         all_bots = self._collect_all_bots(relationship_data)
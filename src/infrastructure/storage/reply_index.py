@@ -0,0 +1,172 @@
+"""
+リプライ/リアクションの逆引きインデックス
+
+「イベントEに誰が反応したか」を、反応先のイベントIDをキーにして保持する。
+キューの書き込み時にメモリ上で差分更新するので、参照のたびにキュー全体を読み直す必要がない。
+ファイルへの書き出しはキューのflush時に1回だけ行い、そのときのキューファイルの
+指紋（更新時刻とサイズ）を一緒に保存する。読み込み時に指紋が合わなければ作り直す。
+"""
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from ...domain import PostType, QueueEntry, QueueStatus
+from .unit_of_work import write_atomic
+
+# 「反応済み」とみなすステータス（rejected / dry_run は数えない）
+ACTIVE_STATUSES: frozenset[QueueStatus] = frozenset(
+    {QueueStatus.PENDING, QueueStatus.APPROVED, QueueStatus.POSTED}
+)
+
+# 反応1件分: (反応したNPC ID, 投稿タイプ, ステータス)
+Response = tuple[int, PostType, QueueStatus]
+
+
+class ReplyIndex:
+    """反応先イベントID → 反応エントリーの逆引きインデックス"""
+
+    VERSION = 2
+
+    def __init__(self, index_file: Path | None = None):
+        self.index_file = index_file
+        # event_id -> {entry_id: (npc_id, post_type, status)}
+        self._targets: dict[str, dict[str, Response]] = {}
+        # 保存していない変更があるか
+        self.dirty = False
+
+    def record(self, entry: QueueEntry) -> bool:
+        """
+        エントリーを登録・更新
+
+        Returns:
+            インデックスが変化した場合True（反応でないエントリーはFalse）
+        """
+        if not entry.reply_to or not entry.reply_to.event_id:
+            return False
+
+        response: Response = (entry.npc_id, entry.post_type, entry.status)
+        responses = self._targets.setdefault(entry.reply_to.event_id, {})
+        if responses.get(entry.id) == response:
+            return False
+        responses[entry.id] = response
+        self.dirty = True
+        return True
+
+    def rebuild(self, entries: list[QueueEntry]) -> None:
+        """全エントリーからインデックスを作り直す"""
+        self._targets.clear()
+        for entry in entries:
+            self.record(entry)
+        self.dirty = True
+
+    def prune(self, entries: Iterable[QueueEntry]) -> int:
+        """
+        削除・アーカイブしたエントリーをインデックスから外す
+
+        そのエントリーへの反応と、そのエントリー自身の反応を消す。
+
+        Returns:
+            消した反応の数
+        """
+        entry_ids: set[str] = set()
+        for entry in entries:
+            entry_ids.add(entry.id)
+            if entry.event_id:
+                removed = self._targets.pop(entry.event_id, None)
+                if removed:
+                    self.dirty = True
+                    entry_ids.update(removed)
+
+        pruned = 0
+        for event_id in list(self._targets):
+            responses = self._targets[event_id]
+            for entry_id in entry_ids.intersection(responses):
+                del responses[entry_id]
+                pruned += 1
+            if not responses:
+                del self._targets[event_id]
+        if pruned:
+            self.dirty = True
+        return pruned
+
+    def get_responses(self, event_id: str) -> list[Response]:
+        """指定イベントへの反応一覧を取得"""
+        return list(self._targets.get(event_id, {}).values())
+
+    def has_replied(self, npc_id: int, event_id: str) -> bool:
+        """指定NPCが指定イベントに反応済みか"""
+        return any(
+            responder == npc_id and status in ACTIVE_STATUSES
+            for responder, _, status in self._targets.get(event_id, {}).values()
+        )
+
+    def has_any_reaction(self, event_id: str) -> bool:
+        """指定イベントに誰かが反応済みか"""
+        return any(
+            status in ACTIVE_STATUSES for _, _, status in self._targets.get(event_id, {}).values()
+        )
+
+    def load(self, fingerprint: dict[str, list[int]] | None = None) -> bool:
+        """
+        ファイルから読み込み
+
+        Args:
+            fingerprint: 今のキューファイルの指紋（保存時と違えば読み込まない）
+
+        Returns:
+            読み込めた場合True（ファイルがない・壊れている・キューと合わない場合はFalse）
+        """
+        if not self.index_file or not self.index_file.exists():
+            return False
+
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                data: dict[str, Any] = json.load(f)
+            if data.get("version") != self.VERSION:
+                return False
+            if fingerprint is not None and data.get("fingerprint") != fingerprint:
+                return False
+            self._targets = {
+                event_id: {
+                    entry_id: (int(npc_id), PostType(post_type), QueueStatus(status))
+                    for entry_id, (npc_id, post_type, status) in responses.items()
+                }
+                for event_id, responses in data.get("targets", {}).items()
+            }
+            self.dirty = False
+            return True
+        except Exception as e:
+            print(f"⚠️  Failed to load {self.index_file}: {e}")
+            return False
+
+    def save(self, fingerprint: dict[str, list[int]] | None = None) -> None:
+        """
+        ファイルに保存（一時ファイルに書いてから置き換える）
+
+        Args:
+            fingerprint: 今のキューファイルの指紋（次の読み込み時に照合する）
+        """
+        if not self.index_file:
+            self.dirty = False
+            return
+
+        data = {
+            "version": self.VERSION,
+            "fingerprint": fingerprint,
+            "targets": {
+                event_id: {
+                    entry_id: [npc_id, post_type.value, status.value]
+                    for entry_id, (npc_id, post_type, status) in responses.items()
+                }
+                for event_id, responses in self._targets.items()
+            },
+        }
+
+        def write(tmp_path: Path) -> None:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+
+        write_atomic(self.index_file, write)
+        self.dirty = False
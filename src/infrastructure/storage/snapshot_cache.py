@@ -0,0 +1,103 @@
+"""
+ワールドスナップショットキャッシュ
+
+profile.yaml / state.json などをパースした結果（素のdict）を1つのpickleファイルにまとめて保持し、
+次回起動時はファイルの (mtime_ns, size) が変わっていないものだけパースを省略する。
+変わったファイルだけを読み直すので、cronで毎回起動するコマンドの立ち上がりが速くなる。
+
+キャッシュするのはパース直後のデータで、モデルへの変換（pydanticの検証）は毎回行う。
+モデル定義が変わっても古いキャッシュから壊れたオブジェクトが作られることはない。
+"""
+
+import os
+import pickle
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# パス → ((mtime_ns, size), パース結果)
+Signature = tuple[int, int]
+CacheEntries = dict[str, tuple[Signature, Any]]
+
+
+class SnapshotCache:
+    """ファイル単位で無効化されるパース結果のキャッシュ"""
+
+    VERSION = 1
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.hits = 0
+        self.misses = 0
+        self._entries: CacheEntries = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        """キャッシュファイルを読み込み（壊れていれば空から作り直す）"""
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == self.VERSION:
+                self._entries = data["entries"]
+        except Exception as e:
+            print(f"⚠️  Failed to load {self.cache_file}: {e}")
+
+    def get(self, path: Path, parse: Callable[[Path], Any]) -> Any:
+        """
+        ファイルのパース結果を取得（変更がなければキャッシュから）
+
+        Args:
+            path: 読み込むファイル
+            parse: キャッシュが使えない場合のパース処理
+
+        Returns:
+            パース結果（呼び出し側で変更しないこと）
+        """
+        stat = path.stat()
+        signature: Signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(path)
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == signature:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        data = parse(path)
+        self._entries[key] = (signature, data)
+        self._dirty = True
+        return data
+
+    def save(self) -> None:
+        """変更があればキャッシュファイルに保存（消えたファイルの分は捨てる）"""
+        if not self._dirty:
+            return
+
+        self._entries = {key: entry for key, entry in self._entries.items() if Path(key).exists()}
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_file.with_suffix(self.cache_file.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {"version": self.VERSION, "entries": self._entries},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, self.cache_file)
+        self._dirty = False
+
+    @property
+    def hit_ratio(self) -> float:
+        """ヒット率（0.0〜1.0、まだ参照がなければ0.0）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> str:
+        """ヒット/ミスの集計を1行で返す"""
+        return (
+            f"Snapshot cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_ratio:.0%} hit ratio)"
+        )
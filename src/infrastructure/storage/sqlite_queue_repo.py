@@ -0,0 +1,247 @@
+"""
+投稿キューリポジトリ（SQLite版）
+
+QueueRepositoryと同じAPIで、キューを1つのSQLiteファイルに保存する。
+status / npc_id / created_at / reply_to.event_id にインデックスを張り、
+posted が増えても1操作あたりのコストが履歴全体に比例しないようにする。
+"""
+
+import json
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+from ...domain import QueueEntry, QueueStatus
+from .queue_repo import QueueRepository
+from .reply_index import ACTIVE_STATUSES
+
+# スキーマ定義（seqはステータス内の並び順 = JSONファイルでの追記順）
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_entries (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    npc_id INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    reply_to_event_id TEXT,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_status_seq ON queue_entries (status, seq);
+CREATE INDEX IF NOT EXISTS idx_queue_seq ON queue_entries (seq);
+CREATE INDEX IF NOT EXISTS idx_queue_npc_id ON queue_entries (npc_id);
+CREATE INDEX IF NOT EXISTS idx_queue_created_at ON queue_entries (created_at);
+CREATE INDEX IF NOT EXISTS idx_queue_reply_to ON queue_entries (reply_to_event_id);
+"""
+
+# 「反応済み」とみなすステータス（IN句用）
+ACTIVE_STATUS_VALUES = tuple(sorted(status.value for status in ACTIVE_STATUSES))
+ACTIVE_STATUS_PLACEHOLDERS = ", ".join("?" for _ in ACTIVE_STATUS_VALUES)
+
+# 次の並び順（idx_queue_seq の末尾を引くだけなので件数によらない）
+NEXT_SEQ_SQL = "SELECT COALESCE(MAX(seq), 0) + 1 FROM queue_entries"
+
+
+class SqliteQueueRepository(QueueRepository):
+    """SQLiteでキューを管理（QueueRepositoryのドロップイン置き換え）"""
+
+    DB_FILENAME = "queue.db"
+
+    def __init__(
+        self, queue_dir: Path, db_path: Path | None = None, archive_compress: bool = False
+    ):
+        super().__init__(queue_dir, archive_compress)
+        self.db_path = db_path or queue_dir / self.DB_FILENAME
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """DB接続を閉じる"""
+        self._conn.close()
+
+    def _next_seq(self) -> int:
+        """次の並び順を取得"""
+        row = self._conn.execute(NEXT_SEQ_SQL).fetchone()
+        return int(row[0])
+
+    def _row_values(
+        self, entry: QueueEntry, seq: int
+    ) -> tuple[str, str, int, str, str | None, int, str]:
+        """INSERT用の値を作成"""
+        data = entry.model_dump(mode="json")
+        return (
+            entry.id,
+            entry.status.value,
+            entry.npc_id,
+            data["created_at"],
+            entry.reply_to.event_id if entry.reply_to else None,
+            seq,
+            json.dumps(data, ensure_ascii=False, default=str),
+        )
+
+    def _insert(self, entry: QueueEntry, seq: int | None = None) -> None:
+        """エントリーを書き込み（同じIDがあれば置き換え）"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO queue_entries "
+            "(id, status, npc_id, created_at, reply_to_event_id, seq, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._row_values(entry, seq if seq is not None else self._next_seq()),
+        )
+
+    def _query(self, sql: str, params: tuple[object, ...] = ()) -> list[QueueEntry]:
+        """data列をQueueEntryに変換して返す"""
+        entries = []
+        for (data,) in self._conn.execute(sql, params):
+            try:
+                entries.append(QueueEntry.model_validate_json(data))
+            except Exception as e:
+                print(f"⚠️  Failed to load queue entry from {self.db_path}: {e}")
+        return entries
+
+    def add(self, entry: QueueEntry) -> None:
+        """エントリーを追加"""
+        with self._conn:
+            self._insert(entry)
+
+    def get_by_id(self, entry_id: str) -> tuple[QueueEntry, QueueStatus] | None:
+        """IDでエントリーを検索"""
+        entries = self._query("SELECT data FROM queue_entries WHERE id = ?", (entry_id,))
+        if not entries:
+            return None
+        return entries[0], entries[0].status
+
+    def get_all(self, status: QueueStatus) -> list[QueueEntry]:
+        """指定ステータスの全エントリーを取得"""
+        return self._query(
+            "SELECT data FROM queue_entries WHERE status = ? ORDER BY seq", (status.value,)
+        )
+
+    def move(
+        self,
+        entry_id: str,
+        from_status: QueueStatus,
+        to_status: QueueStatus,
+        update_fn: Callable[[QueueEntry], None] | None = None,
+    ) -> QueueEntry | None:
+        """エントリーを別ステータスに移動"""
+        entries = self._query(
+            "SELECT data FROM queue_entries WHERE id = ? AND status = ?",
+            (entry_id, from_status.value),
+        )
+        if not entries:
+            return None
+
+        entry = entries[0]
+        entry.status = to_status
+        if update_fn:
+            update_fn(entry)
+
+        # 移動先の末尾に並べる
+        with self._conn:
+            self._insert(entry)
+        return entry
+
+    def move_many(
+        self,
+        entry_ids: list[str],
+        from_status: QueueStatus,
+        to_status: QueueStatus,
+        update_fn: Callable[[QueueEntry], None] | None = None,
+    ) -> list[QueueEntry]:
+        """複数のエントリーをまとめて別ステータスに移動（1トランザクション）"""
+        if not entry_ids:
+            return []
+
+        placeholders = ", ".join("?" for _ in entry_ids)
+        found = {
+            entry.id: entry
+            for entry in self._query(
+                f"SELECT data FROM queue_entries WHERE status = ? AND id IN ({placeholders})",
+                (from_status.value, *entry_ids),
+            )
+        }
+        moved = [found[entry_id] for entry_id in entry_ids if entry_id in found]
+        for entry in moved:
+            entry.status = to_status
+            if update_fn:
+                update_fn(entry)
+
+        # 渡された順に移動先の末尾に並べる
+        with self._conn:
+            seq = self._next_seq()
+            for offset, entry in enumerate(moved):
+                self._insert(entry, seq + offset)
+        return moved
+
+    def remove(self, status: QueueStatus, entry_ids: set[str]) -> None:
+        """指定ステータスからエントリーを削除"""
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM queue_entries WHERE id = ? AND status = ?",
+                [(entry_id, status.value) for entry_id in entry_ids],
+            )
+
+    def count(self, status: QueueStatus) -> int:
+        """指定ステータスのエントリー数を取得"""
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM queue_entries WHERE status = ?", (status.value,)
+        ).fetchone()
+        return int(row[0])
+
+    def get_recent_rejected(self, npc_id: int, limit: int = 3) -> list[QueueEntry]:
+        """指定NPCの最近のrejectedエントリーを取得（新しい順）"""
+        return self._query(
+            "SELECT data FROM queue_entries WHERE npc_id = ? AND status = ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (npc_id, QueueStatus.REJECTED.value, limit),
+        )
+
+    def rebuild_reply_index(self) -> None:
+        """reply_to_event_idはテーブルのインデックスで引くので再構築は不要"""
+
+    def has_replied(self, npc_id: int, event_id: str) -> bool:
+        """指定NPCが指定イベントにリプライ/リアクション済みか（pending/approved/posted）"""
+        row = self._conn.execute(
+            "SELECT 1 FROM queue_entries WHERE reply_to_event_id = ? AND npc_id = ? "
+            f"AND status IN ({ACTIVE_STATUS_PLACEHOLDERS}) LIMIT 1",
+            (event_id, npc_id, *ACTIVE_STATUS_VALUES),
+        ).fetchone()
+        return row is not None
+
+    def has_any_reaction(self, event_id: str) -> bool:
+        """指定イベントに誰かがリプライ/リアクション済みか（pending/approved/posted）"""
+        row = self._conn.execute(
+            "SELECT 1 FROM queue_entries WHERE reply_to_event_id = ? "
+            f"AND status IN ({ACTIVE_STATUS_PLACEHOLDERS}) LIMIT 1",
+            (event_id, *ACTIVE_STATUS_VALUES),
+        ).fetchone()
+        return row is not None
+
+    def import_from_json(self, source: QueueRepository | None = None) -> dict[str, int]:
+        """
+        既存のJSONキューファイルを取り込む（1回限りの移行用）
+
+        同じIDのエントリーは上書きするので、再実行しても重複しない。
+
+        Args:
+            source: 移行元のJSONリポジトリ（省略時は同じqueue_dir）
+
+        Returns:
+            ステータスごとの取り込み件数
+        """
+        source = source or QueueRepository(self.queue_dir)
+        imported: dict[str, int] = {}
+        seq = self._next_seq()
+
+        with self._conn:
+            for status in QueueStatus:
+                entries = source.get_all(status)
+                for entry in entries:
+                    # ファイル名のステータスを正とする
+                    entry.status = status
+                    self._insert(entry, seq)
+                    seq += 1
+                imported[status.value] = len(entries)
+
+        return imported
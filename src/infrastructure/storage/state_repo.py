@@ -6,11 +6,22 @@ from pathlib import Path
 
 from ...domain import NpcState, format_npc_name
 from .base_repo import ResidentJsonRepository
+from .snapshot_cache import SnapshotCache
+from .unit_of_work import UnitOfWork
 
 
 class StateRepository(ResidentJsonRepository):
     """住人フォルダごとにNPC状態を永続化"""
 
+    def __init__(
+        self,
+        residents_dir: Path,
+        unit_of_work: UnitOfWork | None = None,
+        snapshot_cache: SnapshotCache | None = None,
+    ):
+        super().__init__(residents_dir, unit_of_work)
+        self.snapshot_cache = snapshot_cache
+
     def _get_file_path(self, npc_id: int) -> Path:
         """NPC IDに対応するファイルパス"""
         return self._get_resident_file(npc_id, "state.json")
@@ -44,14 +55,25 @@ class StateRepository(ResidentJsonRepository):
         """単一NPCの状態を読み込み"""
         file_path = self._get_file_path(npc_id)
 
+        if self.unit_of_work:
+            cached = self.unit_of_work.get(file_path, NpcState)
+            if cached is not None:
+                return cached
+
         if not file_path.exists():
             return None
 
         try:
-            data = self._load_json(file_path)
+            if self.snapshot_cache:
+                data = self.snapshot_cache.get(file_path, self._load_json)
+            else:
+                data = self._load_json(file_path)
             if data is None:
                 return None
-            return NpcState.model_validate(data)
+            state = NpcState.model_validate(data)
+            if self.unit_of_work:
+                self.unit_of_work.register(file_path, state)
+            return state
         except Exception as e:
             print(f"⚠️  Failed to load state for {format_npc_name(npc_id)}: {e}")
             return None
@@ -73,4 +95,4 @@ class StateRepository(ResidentJsonRepository):
     def save(self, state: NpcState) -> None:
         """単一NPCの状態を保存"""
         file_path = self._get_file_path(state.id)
-        self._save_json(file_path, state.model_dump(mode="json"))
+        self._save_model(file_path, state, lambda: state.model_dump(mode="json"))
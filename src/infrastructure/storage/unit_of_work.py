@@ -0,0 +1,130 @@
+"""
+ユニットオブワーク（1tick分の読み込みキャッシュと遅延書き込み）
+
+同じ tick の中で memory.json / state.json / affinity/npcXXX.json を何度も読み書きしないよう、
+読み込んだオブジェクトをパスごとに保持し（アイデンティティマップ）、
+保存要求は「変更あり」の印だけを付けて、commit() でファイルごとに1回だけ書き出す。
+"""
+
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    """一時ファイルに書き出してから置き換える（途中で落ちても壊れたファイルを残さない）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class UnitOfWork:
+    """リポジトリ間で共有する読み込みキャッシュと変更追跡"""
+
+    def __init__(self) -> None:
+        self._identity_map: dict[Path, BaseModel] = {}
+        # パス → 一時ファイルに中身を書き出す関数
+        self._dirty: dict[Path, Callable[[Path], None]] = {}
+        self.loads = 0
+        self.hits = 0
+        self.writes = 0
+
+    def load(self, path: Path, model_type: type[ModelT], loader: Callable[[], ModelT]) -> ModelT:
+        """
+        パスに対応するオブジェクトを取得（このtickで初めてならloaderで読み込む）
+
+        Args:
+            path: ファイルパス
+            model_type: 期待するモデルの型
+            loader: キャッシュにない場合の読み込み処理
+
+        Returns:
+            tick中は同じパスに対して常に同じオブジェクト
+        """
+        cached = self._identity_map.get(path)
+        if isinstance(cached, model_type):
+            self.hits += 1
+            return cached
+
+        obj = loader()
+        self.loads += 1
+        self._identity_map[path] = obj
+        return obj
+
+    def get(self, path: Path, model_type: type[ModelT]) -> ModelT | None:
+        """キャッシュ済みのオブジェクトを取得（なければNone）"""
+        cached = self._identity_map.get(path)
+        if isinstance(cached, model_type):
+            self.hits += 1
+            return cached
+        return None
+
+    def register(self, path: Path, obj: BaseModel) -> None:
+        """読み込んだオブジェクトをキャッシュに登録"""
+        self._identity_map[path] = obj
+
+    def mark_dirty(self, path: Path, obj: BaseModel, dump: Callable[[], dict[str, Any]]) -> None:
+        """
+        保存が必要な印を付ける（書き出しはcommit時）
+
+        Args:
+            path: 書き出し先
+            obj: 保存対象のオブジェクト
+            dump: 書き出す内容を作る関数（commit時に1回だけ呼ばれる）
+        """
+        self._identity_map[path] = obj
+
+        def write(tmp_path: Path) -> None:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dump(), f, indent=2, ensure_ascii=False)
+
+        self._dirty[path] = write
+
+    def mark_dirty_file(self, path: Path, write: Callable[[Path], None]) -> None:
+        """
+        JSON以外のファイルに保存が必要な印を付ける（書き出しはcommit時）
+
+        Args:
+            path: 書き出し先
+            write: 渡された一時ファイルに中身を書き出す関数
+        """
+        self._dirty[path] = write
+
+    @property
+    def dirty_count(self) -> int:
+        """未書き出しのファイル数"""
+        return len(self._dirty)
+
+    def commit(self) -> int:
+        """
+        変更のあったファイルを書き出す
+
+        一時ファイルに書いてから置き換えるので、途中で落ちても壊れたJSONは残らない。
+        書き出しに失敗したファイルは変更ありのまま残し、次のcommitで再試行する。
+
+        Returns:
+            書き出したファイル数
+        """
+        written = 0
+        for path, write in list(self._dirty.items()):
+            try:
+                write_atomic(path, write)
+                del self._dirty[path]
+                written += 1
+            except Exception as e:
+                print(f"⚠️  Failed to write {path}: {e}")
+
+        self.writes += written
+        return written
+
+    def clear(self) -> None:
+        """キャッシュを捨てる（未書き出しの変更も破棄する）"""
+        self._identity_map.clear()
+        self._dirty.clear()
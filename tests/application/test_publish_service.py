@@ -0,0 +1,338 @@
+"""PublishService のユニットテスト"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
+from nostr_sdk import Keys
+
+from src.application import PublishService
+from src.domain import NpcKey, PostType, QueueEntry, QueueStatus, ReplyTarget
+from src.infrastructure import KeyRegistry, OutboxRepository, QueueRepository, SignedEvent
+
+# 1件の送信にかかる時間（秒）
+RTT = 0.05
+
+
+class FakeEventId:
+    """イベントID"""
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def to_hex(self) -> str:
+        return self.value
+
+
+class FakeEvent:
+    """署名済みイベントの代わり（内容からイベントIDを決める）"""
+
+    def __init__(self, content: str):
+        self.content = content
+
+    def as_json(self) -> str:
+        return json.dumps({"content": self.content})
+
+    def id(self) -> FakeEventId:
+        return FakeEventId(f"event-{self.content}")
+
+
+class FakePublisher:
+    """送った順番と同時に送っていた数を記録するパブリッシャー"""
+
+    def __init__(self, fail: set[str] | None = None):
+        self.dry_run = False
+        self.fail = fail or set()
+        self.built: list[str] = []
+        self.started: list[str] = []
+        self.finished: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _send(self, content: str) -> str:
+        self.started.append(content)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(RTT)
+        self.in_flight -= 1
+        self.finished.append(content)
+        if content in self.fail:
+            raise RuntimeError("API error")
+        return f"event-{content}"
+
+    def build_post(self, keys: Keys, content: str, aurora_tag: object = None) -> FakeEvent:
+        self.built.append(content)
+        return FakeEvent(content)
+
+    def build_reply(self, keys: Keys, content: str, *args: object) -> FakeEvent:
+        return self.build_post(keys, content)
+
+    def build_reaction(self, keys: Keys, emoji: str, *args: object) -> FakeEvent:
+        return self.build_post(keys, emoji)
+
+    async def send_event_json(self, event_json: str) -> None:
+        await self._send(json.loads(event_json)["content"])
+
+    async def sign_many(
+        self, builds: list[tuple[QueueEntry, Callable[[], FakeEvent]]]
+    ) -> AsyncIterator[SignedEvent[QueueEntry]]:
+        # 終わった順に返すことを確かめるため逆順にする
+        for tag, build in reversed(builds):
+            yield SignedEvent(tag, build())  # type: ignore[arg-type]
+
+
+def generate_npc_key(npc_id: int) -> NpcKey:
+    """環境変数の代わりにその場で作った鍵"""
+    keys = Keys.generate()
+    return NpcKey(
+        id=npc_id,
+        name=f"npc{npc_id:03d}",
+        pubkey=keys.public_key().to_hex(),
+        nsec=keys.secret_key().to_bech32(),
+    )
+
+
+def create_service(
+    tmp_path: Path,
+    entries: list[QueueEntry],
+    publisher: FakePublisher,
+    max_concurrency: int = 8,
+    outbox: bool = False,
+    retry_base_seconds: float = 60.0,
+    max_attempts: int = 8,
+) -> tuple[PublishService, QueueRepository]:
+    """approved にエントリーを入れたキューとサービスを作成（outboxならアウトボックス経由）"""
+    queue_repo = QueueRepository(tmp_path)
+    for entry in entries:
+        queue_repo.add(entry)
+    service = PublishService(
+        publisher,  # type: ignore[arg-type]
+        queue_repo,
+        KeyRegistry(generate_npc_key),
+        max_concurrency=max_concurrency,
+        outbox_repo=OutboxRepository(tmp_path / "outbox.db") if outbox else None,
+        retry_base_seconds=retry_base_seconds,
+        max_attempts=max_attempts,
+    )
+    return service, queue_repo
+
+
+def create_entry(npc_id: int, content: str, reply_to: str | None = None) -> QueueEntry:
+    """approved のエントリーを作成（reply_toがあればそのイベントへのリプライ）"""
+    return QueueEntry(
+        npc_id=npc_id,
+        npc_name=f"npc{npc_id:03d}",
+        content=content,
+        status=QueueStatus.APPROVED,
+        post_type=PostType.REPLY if reply_to else PostType.NORMAL,
+        reply_to=ReplyTarget(resident="npc099", event_id=reply_to, content="親")
+        if reply_to
+        else None,
+    )
+
+
+class TestPublishOrdering:
+    """並列投稿と順番のテスト"""
+
+    async def test_different_npcs_are_sent_concurrently(self, tmp_path: Path) -> None:
+        """別々のNPCのエントリーは1往復分の時間でまとめて送る"""
+        entries = [create_entry(npc_id, f"p{npc_id}") for npc_id in range(1, 21)]
+        publisher = FakePublisher()
+        service, _ = create_service(tmp_path, entries, publisher, max_concurrency=20)
+
+        started = asyncio.get_running_loop().time()
+        results = await service.publish_all(entries)
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert all(r.event_id for r in results)
+        assert publisher.max_in_flight == 20
+        assert elapsed < RTT * 5
+
+    async def test_same_npc_and_thread_keep_queue_order(self, tmp_path: Path) -> None:
+        """同じNPC・同じスレッドのエントリーは前のものが終わってから送る"""
+        entries = [
+            create_entry(1, "a1"),
+            create_entry(1, "a2"),
+            create_entry(2, "b-reply", reply_to="parent"),
+            create_entry(3, "c-reply", reply_to="parent"),
+        ]
+        publisher = FakePublisher()
+        service, _ = create_service(tmp_path, entries, publisher)
+
+        await service.publish_all(entries)
+
+        assert publisher.finished.index("a1") < publisher.started.index("a2")
+        assert publisher.finished.index("b-reply") < publisher.started.index("c-reply")
+        assert publisher.max_in_flight == 2
+
+    async def test_concurrency_limit(self, tmp_path: Path) -> None:
+        """同時に送る数はmax_concurrencyまで"""
+        entries = [create_entry(npc_id, f"p{npc_id}") for npc_id in range(1, 7)]
+        publisher = FakePublisher()
+        service, _ = create_service(tmp_path, entries, publisher, max_concurrency=2)
+
+        await service.publish_all(entries)
+
+        assert publisher.max_in_flight == 2
+
+
+class TestPublishResults:
+    """投稿結果の反映のテスト"""
+
+    async def test_posted_entries_are_moved_in_one_batch(self, tmp_path: Path) -> None:
+        """成功したものだけを投稿済みにし、失敗したものはapprovedに残す"""
+        entries = [create_entry(1, "ok"), create_entry(2, "ng"), create_entry(3, "ok2")]
+        publisher = FakePublisher(fail={"ng"})
+        service, queue_repo = create_service(tmp_path, entries, publisher)
+
+        results = await service.publish_all(entries)
+
+        assert [r.error is not None for r in results] == [False, True, False]
+        posted = queue_repo.get_all(QueueStatus.POSTED)
+        assert [e.event_id for e in posted] == ["event-ok", "event-ok2"]
+        assert [e.content for e in queue_repo.get_all(QueueStatus.APPROVED)] == ["ng"]
+
+
+    async def test_direct_path_uses_same_builders(self, tmp_path: Path) -> None:
+        """アウトボックスなしでも、投稿・リプライ・リアクションは同じ署名関数で作って送る"""
+        reaction = create_entry(3, "+", reply_to="parent")
+        reaction.post_type = PostType.REACTION
+        entries = [create_entry(1, "p1"), create_entry(2, "r1", reply_to="parent"), reaction]
+        publisher = FakePublisher()
+        service, _ = create_service(tmp_path, entries, publisher)
+
+        results = await service.publish_all(entries)
+
+        assert [r.event_id for r in results] == ["event-p1", "event-r1", "event-+"]
+        assert sorted(publisher.built) == sorted(["p1", "r1", "+"])
+
+    async def test_dry_run_builds_but_does_not_send(self, tmp_path: Path) -> None:
+        """dry_runでは署名まで行い、送らない"""
+        entries = [create_entry(1, "p1")]
+        publisher = FakePublisher()
+        publisher.dry_run = True
+        service, queue_repo = create_service(tmp_path, entries, publisher)
+
+        results = await service.publish_all(entries)
+
+        assert results[0].event_id is None
+        assert publisher.built == ["p1"]
+        assert publisher.started == []
+        assert [e.content for e in queue_repo.get_all(QueueStatus.APPROVED)] == ["p1"]
+
+
+class TestOutbox:
+    """アウトボックス経由の送信のテスト"""
+
+    async def test_failed_entry_is_resent_with_same_event(self, tmp_path: Path) -> None:
+        """失敗したエントリーは署名し直さず、同じイベントIDで送り直す"""
+        entries = [create_entry(1, "ng")]
+        publisher = FakePublisher(fail={"ng"})
+        service, queue_repo = create_service(
+            tmp_path, entries, publisher, outbox=True, retry_base_seconds=0.01
+        )
+
+        results = await service.publish_all(entries)
+        assert results[0].error is not None
+        assert service.outbox_repo is not None
+        assert service.outbox_repo.get_all()[0].attempts == 1
+
+        publisher.fail.clear()
+        await asyncio.sleep(0.02)
+        results = await service.publish_all(entries)
+
+        assert results[0].event_id == "event-ng"
+        assert publisher.built == ["ng"]
+        assert publisher.started == ["ng", "ng"]
+        assert service.outbox_repo.count() == 0
+        assert [e.event_id for e in queue_repo.get_all(QueueStatus.POSTED)] == ["event-ng"]
+
+    async def test_backoff_holds_later_entries_of_same_npc(self, tmp_path: Path) -> None:
+        """送り直し待ちのエントリーがあれば、同じNPCの後のエントリーも待たせる"""
+        entries = [create_entry(1, "a1"), create_entry(1, "a2"), create_entry(2, "b1")]
+        publisher = FakePublisher(fail={"a1"})
+        service, queue_repo = create_service(tmp_path, entries, publisher, outbox=True)
+
+        await service.publish_all(entries)
+        publisher.fail.clear()
+        await service.drain()
+
+        assert publisher.started == ["a1", "b1"]
+        assert [e.content for e in queue_repo.get_all(QueueStatus.APPROVED)] == ["a1", "a2"]
+
+    async def test_staged_events_survive_restart(self, tmp_path: Path) -> None:
+        """署名して保存したところで落ちても、次の実行で保存したイベントを送る"""
+        entries = [create_entry(1, "p1"), create_entry(2, "p2")]
+        publisher = FakePublisher()
+        service, queue_repo = create_service(tmp_path, entries, publisher, outbox=True)
+        await service.stage(entries)
+
+        restarted = PublishService(
+            publisher,  # type: ignore[arg-type]
+            queue_repo,
+            KeyRegistry(generate_npc_key),
+            outbox_repo=OutboxRepository(tmp_path / "outbox.db"),
+        )
+        results = await restarted.drain()
+
+        assert [r.event_id for r in results] == ["event-p1", "event-p2"]
+        assert sorted(publisher.built) == ["p1", "p2"]
+        assert queue_repo.get_all(QueueStatus.APPROVED) == []
+
+    async def test_unexpected_build_error_skips_only_that_entry(self, tmp_path: Path) -> None:
+        """署名の準備で想定外の例外が出ても、そのエントリーだけ飛ばして残りは保存する"""
+
+        def broken_loader(npc_id: int) -> NpcKey:
+            if npc_id == 2:
+                raise RuntimeError("keystore unavailable")
+            return generate_npc_key(npc_id)
+
+        entries = [create_entry(1, "p1"), create_entry(2, "p2")]
+        queue_repo = QueueRepository(tmp_path)
+        for entry in entries:
+            queue_repo.add(entry)
+        service = PublishService(
+            FakePublisher(),  # type: ignore[arg-type]
+            queue_repo,
+            KeyRegistry(broken_loader),
+            outbox_repo=OutboxRepository(tmp_path / "outbox.db"),
+        )
+
+        records = await service.stage(entries)
+
+        assert [r.entry_id for r in records] == [entries[0].id]
+
+    async def test_posted_entries_are_dropped_from_outbox(self, tmp_path: Path) -> None:
+        """送った直後に落ちて投稿済みになっていたら、送り直さずに捨てる"""
+        entries = [create_entry(1, "p1")]
+        publisher = FakePublisher()
+        service, queue_repo = create_service(tmp_path, entries, publisher, outbox=True)
+        await service.stage(entries)
+        queue_repo.mark_posted_many({entries[0].id: "event-p1"})
+
+        assert await service.drain() == []
+        assert publisher.started == []
+        assert service.outbox_repo is not None
+        assert service.outbox_repo.count() == 0
+
+    async def test_entry_is_rejected_after_max_attempts(self, tmp_path: Path) -> None:
+        """max_attempts回失敗したらrejectedに移し、同じNPCの後のエントリーを止めない"""
+        entries = [create_entry(1, "bad"), create_entry(1, "next")]
+        publisher = FakePublisher(fail={"bad"})
+        service, queue_repo = create_service(
+            tmp_path, entries, publisher, outbox=True, retry_base_seconds=0.01, max_attempts=2
+        )
+
+        await service.publish_all(entries)
+        await asyncio.sleep(0.02)
+        await service.drain()
+        await service.drain()
+
+        assert publisher.started == ["bad", "bad", "next"]
+        rejected = queue_repo.get_all(QueueStatus.REJECTED)
+        assert [e.content for e in rejected] == ["bad"]
+        assert rejected[0].review_note is not None
+        assert [e.content for e in queue_repo.get_all(QueueStatus.POSTED)] == ["next"]
+        assert service.outbox_repo is not None
+        assert service.outbox_repo.count() == 0
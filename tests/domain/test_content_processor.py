@@ -94,3 +94,24 @@ class TestContentProcessorAdjustLength:
         """ちょうど最大長"""
         result = ContentProcessor.adjust_length("abcde", 1, 5)
         assert result == "abcde"
+
+
+class TestContentProcessorSplitCandidates:
+    """split_candidates メソッドのテスト"""
+
+    def test_numbered_candidates(self) -> None:
+        """番号ごとに分ける（前置きは捨てる）"""
+        response = "候補です\n[1] 朝のコーヒー\n[2] 雨が降ってきた\n3. 眠い"
+        result = ContentProcessor.split_candidates(response, 3)
+        assert result == ["朝のコーヒー", "雨が降ってきた", "眠い"]
+
+    def test_continuation_lines_belong_to_previous(self) -> None:
+        """続きの番号でない行は直前の候補に含める"""
+        response = "[1] 手順はこう\n1. 本文中の番号\n[2] 次の候補\n[3] 頼んだ数より多い"
+        result = ContentProcessor.split_candidates(response, 2)
+        assert result == ["手順はこう\n1. 本文中の番号", "次の候補\n[3] 頼んだ数より多い"]
+
+    def test_unnumbered_response_is_single_candidate(self) -> None:
+        """番号がなければ全体で1つ"""
+        assert ContentProcessor.split_candidates(" ただの投稿 ", 3) == ["ただの投稿"]
+        assert ContentProcessor.split_candidates("", 3) == []
@@ -0,0 +1,115 @@
+"""ContentStrategy のプロンプト構成のユニットテスト"""
+
+from src.config.settings import ContentSettings
+from src.domain import ContentStrategy, NpcState, ReplyTarget
+from src.domain.models import (
+    Background,
+    Behavior,
+    Interests,
+    NpcProfile,
+    Personality,
+    Prompts,
+    Social,
+)
+
+COMMON = Prompts(positive=["日本語で書く"], negative=["個人名を出さない"])
+
+
+def create_test_profile(npc_id: int = 1, name: str = "test_npc") -> NpcProfile:
+    """テスト用プロファイルを作成"""
+    return NpcProfile(
+        id=npc_id,
+        name=name,
+        personality=Personality(type="friendly", traits=["明るい"], emotional_range=5),
+        interests=Interests(topics=["料理", "旅行", "写真"], keywords=["テスト"]),
+        behavior=Behavior(
+            active_hours=list(range(9, 23)),
+            post_frequency=3,
+            post_frequency_variance=0.3,
+            post_length_min=20,
+            post_length_max=140,
+        ),
+        social=Social(reply_probability=0.5, repost_probability=0.1, like_probability=0.3),
+        background=Background(),
+        prompts=Prompts(negative=["愚痴を言わない"]),
+    )
+
+
+def merged(profile: NpcProfile) -> Prompts:
+    """共通 + 個人のプロンプト（ProfileRepository.get_merged_prompts と同じ並び）"""
+    personal = profile.prompts or Prompts()
+    return Prompts(
+        positive=COMMON.positive + personal.positive,
+        negative=COMMON.negative + personal.negative,
+    )
+
+
+def create_post_prompt(strategy: ContentStrategy, profile: NpcProfile, posts: list[str]) -> str:
+    """過去の投稿を変えて投稿プロンプトを作る"""
+    state = NpcState(
+        id=profile.id, last_post_time=0, next_post_time=0, total_posts=0, post_history=posts
+    )
+    return strategy.create_prompt(profile, state, merged_prompts=merged(profile))
+
+
+def create_reply_prompt(strategy: ContentStrategy, profile: NpcProfile, content: str) -> str:
+    """リプライのプロンプトを作る"""
+    reply_to = ReplyTarget(resident="npc002", event_id="e", content=content)
+    return strategy.create_reply_prompt(profile, reply_to, merged_prompts=merged(profile))
+
+
+class TestPromptPrefix:
+    """プロンプト前半の固定のテスト"""
+
+    def test_post_prompts_share_static_prefix(self) -> None:
+        """同じNPCの投稿プロンプトは、条件の終わりまで毎回同じ"""
+        strategy = ContentStrategy(ContentSettings(), COMMON)
+        profile = create_test_profile()
+
+        first = create_post_prompt(strategy, profile, ["朝ごはんを作った"])
+        second = create_post_prompt(strategy, profile, ["写真を撮りに行った", "雨だった"])
+
+        prefix = first[: first.index("上の条件でSNS投稿を1つ書け")]
+        assert second.startswith(prefix)
+        assert "【投稿の条件】" in prefix
+
+    def test_post_and_reply_share_persona(self) -> None:
+        """投稿とリプライで、共通ルールと人物設定が同じ"""
+        strategy = ContentStrategy(ContentSettings(), COMMON)
+        profile = create_test_profile()
+
+        post = create_post_prompt(strategy, profile, [])
+        reply = create_reply_prompt(strategy, profile, "今日は雨")
+
+        persona = post[: post.index("【投稿の条件】")]
+        assert reply.startswith(persona)
+        assert "愚痴を言わない" in persona
+        assert "今日は雨" not in persona
+
+    def test_common_rules_come_first_for_everyone(self) -> None:
+        """共通ルールは全員のプロンプトの先頭に同じ形で入る"""
+        strategy = ContentStrategy(ContentSettings(), COMMON)
+
+        a = create_reply_prompt(strategy, create_test_profile(1, "a"), "x")
+        b = create_reply_prompt(strategy, create_test_profile(2, "b"), "x")
+
+        common = a[: a.index("あなたは")]
+        assert common.startswith("【全員共通のルール】")
+        assert b.startswith(common)
+        assert "愚痴を言わない" not in common
+
+    def test_budget_trims_only_the_dynamic_part(self) -> None:
+        """予算が足りなくても前半は削らず、過去の投稿から削る"""
+        strategy = ContentStrategy(ContentSettings(prompt_token_budget={"post": 1}), COMMON)
+        unlimited = ContentStrategy(ContentSettings(prompt_token_budget={}), COMMON)
+        profile = create_test_profile()
+        posts = ["過去の投稿その1", "過去の投稿その2"]
+
+        trimmed = create_post_prompt(strategy, profile, posts)
+        full = create_post_prompt(unlimited, profile, posts)
+
+        prefix = full[: full.index("上の条件でSNS投稿を1つ書け")]
+        assert trimmed.startswith(prefix)
+        assert "過去の投稿その1" in full
+        assert "過去の投稿その1" not in trimmed
+        assert strategy.prompt_stats.npcs[1]["post"].trimmed == 1
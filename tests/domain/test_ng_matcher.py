@@ -0,0 +1,27 @@
+"""NgWordMatcher のユニットテスト"""
+
+from src.domain.ng_matcher import NgWordMatcher
+
+
+class TestNgWordMatcher:
+    """複数パターン照合のテスト"""
+
+    def test_overlapping_words_are_all_found(self) -> None:
+        """重なり合うワードもすべて見つける"""
+        matcher = NgWordMatcher(["he", "she", "his", "hers"])
+        assert sorted(matcher.find_all("ushers")) == ["he", "hers", "she"]
+
+    def test_japanese_words(self) -> None:
+        """日本語のワードを出現順に見つける"""
+        matcher = NgWordMatcher(["殺", "殺す", "死ね"])
+        assert matcher.find_all("ぶっ殺すぞ死ね") == ["殺", "殺す", "死ね"]
+
+    def test_case_insensitive(self) -> None:
+        """英字は大文字・小文字を区別しない"""
+        matcher = NgWordMatcher(["NG"])
+        assert matcher.find_all("this is ng") == ["ng"]
+
+    def test_no_match(self) -> None:
+        """該当がなければ空"""
+        matcher = NgWordMatcher(["選挙"])
+        assert matcher.find_all("今日はいい天気") == []
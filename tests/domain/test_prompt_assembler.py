@@ -0,0 +1,91 @@
+"""PromptAssembler のユニットテスト"""
+
+from src.domain.content.prompt_assembler import (
+    PromptAssembler,
+    PromptStats,
+    estimate_tokens,
+)
+
+
+class TestEstimateTokens:
+    """トークン数の見積もりのテスト"""
+
+    def test_japanese_and_ascii(self) -> None:
+        """日本語は1文字1トークン、ASCIIは4文字1トークン"""
+        assert estimate_tokens("あいう") == 3
+        assert estimate_tokens("abcdefgh") == 2
+        assert estimate_tokens("") == 0
+
+
+class TestPromptAssembler:
+    """予算に合わせた組み立てのテスト"""
+
+    def test_no_budget_keeps_everything_in_order(self) -> None:
+        """予算なしなら追加した順にそのまま連結する"""
+        assembler = PromptAssembler()
+        assembler.add("a", "あ", priority=1)
+        assembler.add_items("b", ["い", "う"], priority=2, prefix="[", suffix="]")
+        assembler.add("c", "え")
+
+        prompt = assembler.build()
+
+        assert prompt.text == "あ[いう]え"
+        assert prompt.tokens == 5  # 「[」「]」はASCIIなので合わせて1トークン
+        assert prompt.trimmed == []
+
+    def test_lowest_priority_is_trimmed_first(self) -> None:
+        """予算を超えたら優先度の低いセクションから削る（必須は残す）"""
+        assembler = PromptAssembler(budget=6)
+        assembler.add("head", "見出し")
+        assembler.add("low", "低い優先度", priority=1)
+        assembler.add("high", "高い", priority=2)
+
+        prompt = assembler.build()
+
+        assert prompt.text == "見出し高い"
+        assert prompt.trimmed == ["low"]
+        assert "low" not in prompt.section_tokens
+
+    def test_items_are_trimmed_from_the_front(self) -> None:
+        """項目のセクションは古い（先頭の）項目から削る"""
+        assembler = PromptAssembler(budget=6)
+        assembler.add("head", "頭")
+        assembler.add_items("history", ["古い", "中間", "新しい"], priority=1, prefix=":")
+
+        prompt = assembler.build()
+
+        assert prompt.text == "頭:新しい"
+        assert prompt.trimmed == ["history"]
+
+    def test_required_sections_can_exceed_budget(self) -> None:
+        """必須セクションだけで予算を超えても削らない"""
+        assembler = PromptAssembler(budget=2)
+        assembler.add("head", "削れない文章")
+
+        prompt = assembler.build()
+
+        assert prompt.text == "削れない文章"
+        assert prompt.over_budget
+
+
+class TestPromptStats:
+    """プロンプトサイズの集計のテスト"""
+
+    def test_record_and_merge(self) -> None:
+        """NPC・用途ごとに集計し、別の集計を足し込める"""
+        assembler = PromptAssembler()
+        assembler.add("head", "あいう")
+        prompt = assembler.build()
+
+        stats = PromptStats()
+        stats.record(1, "post", prompt)
+        other = PromptStats()
+        other.record(1, "post", prompt)
+        other.record(2, "reply", prompt)
+        stats.merge(other)
+
+        assert stats.npcs[1]["post"].count == 2
+        assert stats.npcs[1]["post"].avg_tokens == 3
+        assert stats.npcs[2]["reply"].max_tokens == 3
+        restored = PromptStats.model_validate(stats.model_dump(mode="json"))
+        assert restored == stats
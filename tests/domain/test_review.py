@@ -0,0 +1,99 @@
+"""ReviewJudge / PreReviewer のユニットテスト"""
+
+from src.domain import PreReviewer, ReviewJudge
+
+
+class TestJudge:
+    """1件レビューの判定テスト"""
+
+    def test_ng_with_reason_is_rejected(self) -> None:
+        """NGかつ具体的な理由があれば却下"""
+        approved, reason = ReviewJudge.judge("NG 実在の有名人の名前があります")
+        assert not approved
+        assert reason is not None
+
+    def test_ng_without_reason_is_approved(self) -> None:
+        """理由のないNGは承認（デフォルトOK）"""
+        assert ReviewJudge.judge("NG") == (True, None)
+        assert ReviewJudge.judge("OK") == (True, None)
+
+
+class TestBatchReview:
+    """バッチレビューのテスト"""
+
+    def test_prompt_numbers_each_post(self) -> None:
+        """投稿に1から番号を振り、改行は1行にまとめる"""
+        prompt = ReviewJudge.create_batch_prompt(["一つ目\n二行目", "二つ目"])
+        assert "[1] 一つ目 二行目" in prompt
+        assert "[2] 二つ目" in prompt
+
+    def test_parse_each_line(self) -> None:
+        """番号ごとの判定を読み取る（番号は0始まりで返す）"""
+        response = "1: OK\n2: NG 実在の有名人の名前\n[3] ok\n4：NG"
+        verdicts = ReviewJudge.parse_batch(response, 4)
+
+        assert verdicts[0] == (True, None)
+        assert verdicts[1][0] is False
+        assert verdicts[2] == (True, None)
+        assert verdicts[3] == (True, None)  # 理由のないNGは承認
+
+    def test_missing_and_out_of_range_items_are_left_out(self) -> None:
+        """回答にない番号や範囲外の番号は含まない"""
+        verdicts = ReviewJudge.parse_batch("1: OK\n5: NG 暴力的\nよくわからない", 3)
+        assert set(verdicts) == {0}
+
+    def test_conflicting_lines_are_left_out(self) -> None:
+        """同じ番号で判定が食い違えば読み取れなかった扱いにする"""
+        verdicts = ReviewJudge.parse_batch("1: OK\n1: NG 暴力的な言葉\n2: OK\n2: OK", 2)
+        assert set(verdicts) == {1}
+
+
+class TestPreReviewer:
+    """事前レビューのテスト"""
+
+    def test_harmless_post_is_auto_approved(self) -> None:
+        """NGワードもリスクもなければ自動承認"""
+        reviewer = PreReviewer({"political": ["選挙"]})
+        result = reviewer.check("今日はRustのライフタイムで一日溶けた")
+
+        assert result.auto_approved
+        assert result.hits == []
+
+    def test_ng_words_are_escalated_with_category(self) -> None:
+        """NGワードがあればカテゴリ付きでLLMに回す（レビューのNGキーワードも含む）"""
+        reviewer = PreReviewer({"political": ["選挙"]})
+
+        result = reviewer.check("選挙に行ったら殺虫剤を買い忘れた")
+
+        assert not result.auto_approved
+        assert ("political", "選挙") in result.hits
+        assert ("keyword", "殺") in result.hits
+
+    def test_risky_name_pattern_is_escalated(self) -> None:
+        """NGワードがなくても、肩書き付きの人名らしき表記はLLMに回す"""
+        reviewer = PreReviewer({}, risk_threshold=0.5)
+        result = reviewer.check("山田大臣の会見を見た")
+
+        assert not result.auto_approved
+        assert result.risk >= 0.5
+
+    def test_plain_famous_name_is_escalated(self) -> None:
+        """肩書きのない実在の人名も、既定の設定でLLMに回す"""
+        reviewer = PreReviewer({})
+
+        for content in [
+            "大谷翔平のホームランすごかった",
+            "トランプがまた何か言ってる",
+            "田中さんの新曲よかった",
+        ]:
+            assert not reviewer.check(content).auto_approved, content
+
+    def test_report_counts_saved_calls(self) -> None:
+        """自動承認した件数をLLM呼び出しの削減分として集計する"""
+        reviewer = PreReviewer({"political": ["選挙"]})
+        reviewer.check("ねむい")
+        reviewer.check("ごはんおいしい")
+        reviewer.check("選挙速報みてる")
+
+        assert (reviewer.auto_approved, reviewer.escalated) == (2, 1)
+        assert "67% LLM reviews saved" in reviewer.report()
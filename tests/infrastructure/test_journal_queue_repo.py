@@ -0,0 +1,101 @@
+"""JournaledQueueRepository のユニットテスト"""
+
+from pathlib import Path
+
+from src.domain import QueueEntry, QueueStatus
+from src.infrastructure import JournaledQueueRepository, QueueRepository
+
+
+def create_entry(npc_id: int = 1, content: str = "テスト投稿") -> QueueEntry:
+    """テスト用エントリーを作成"""
+    return QueueEntry(npc_id=npc_id, npc_name=f"npc{npc_id:03d}", content=content)
+
+
+class TestJournalReplay:
+    """ジャーナルからの復元のテスト"""
+
+    def test_state_survives_new_instance(self, tmp_path: Path) -> None:
+        """別インスタンスでもジャーナルから同じ状態に戻る"""
+        repo = JournaledQueueRepository(tmp_path)
+        first, second = create_entry(content="1"), create_entry(content="2")
+        repo.add(first)
+        repo.add(second)
+        repo.approve(first.id, "ok")
+        repo.mark_posted(first.id, "event1")
+
+        restored = JournaledQueueRepository(tmp_path)
+        assert [e.id for e in restored.get_all(QueueStatus.PENDING)] == [second.id]
+        posted = restored.get_all(QueueStatus.POSTED)
+        assert [e.id for e in posted] == [first.id]
+        assert posted[0].event_id == "event1"
+        assert posted[0].review_note == "ok"
+
+    def test_mark_posted_many_survives_new_instance(self, tmp_path: Path) -> None:
+        """まとめて投稿済みにした結果もジャーナルから戻る"""
+        repo = JournaledQueueRepository(tmp_path)
+        first, second = create_entry(content="1"), create_entry(content="2")
+        for entry in (first, second):
+            repo.add(entry)
+            repo.approve(entry.id)
+
+        repo.mark_posted_many({second.id: "e2", first.id: "e1"})
+
+        restored = JournaledQueueRepository(tmp_path)
+        assert restored.count(QueueStatus.APPROVED) == 0
+        assert [e.event_id for e in restored.get_all(QueueStatus.POSTED)] == ["e2", "e1"]
+
+    def test_broken_last_line_is_skipped(self, tmp_path: Path) -> None:
+        """書き込み途中で切れた最終行は読み飛ばす"""
+        repo = JournaledQueueRepository(tmp_path)
+        entry = create_entry()
+        repo.add(entry)
+        with open(repo.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"op": "move", "entry": {"id"')
+
+        restored = JournaledQueueRepository(tmp_path)
+        assert restored.get_by_id(entry.id) == (entry, QueueStatus.PENDING)
+
+    def test_existing_json_files_are_used_as_snapshot(self, tmp_path: Path) -> None:
+        """既存のJSONキューをそのまま引き継ぐ"""
+        entry = create_entry()
+        QueueRepository(tmp_path).add(entry)
+
+        repo = JournaledQueueRepository(tmp_path)
+        assert repo.count(QueueStatus.PENDING) == 1
+
+
+class TestJournalCompaction:
+    """コンパクションのテスト"""
+
+    def test_compact_writes_snapshot_and_clears_journal(self, tmp_path: Path) -> None:
+        """畳み込むとステータスファイルに反映され、ジャーナルは消える"""
+        repo = JournaledQueueRepository(tmp_path)
+        entry = create_entry()
+        repo.add(entry)
+        repo.approve(entry.id)
+
+        assert repo.compact()
+        assert not repo.journal_file.exists()
+        assert not repo.compacting_file.exists()
+        assert [e.id for e in QueueRepository(tmp_path).get_all(QueueStatus.APPROVED)] == [entry.id]
+
+    def test_background_compaction_on_threshold(self, tmp_path: Path) -> None:
+        """しきい値を超えると自動で畳み込み、その後の追記も失われない"""
+        repo = JournaledQueueRepository(tmp_path, compact_threshold=1)
+        entries = [create_entry(content=str(i)) for i in range(5)]
+        for entry in entries:
+            repo.add(entry)
+        repo.wait_for_compaction()
+
+        restored = JournaledQueueRepository(tmp_path)
+        assert [e.id for e in restored.get_all(QueueStatus.PENDING)] == [e.id for e in entries]
+
+    def test_interrupted_compaction_is_replayed(self, tmp_path: Path) -> None:
+        """退避ジャーナルが残っていても、次回起動時に再生される"""
+        repo = JournaledQueueRepository(tmp_path)
+        entry = create_entry()
+        repo.add(entry)
+        repo.journal_file.rename(repo.compacting_file)
+
+        restored = JournaledQueueRepository(tmp_path)
+        assert restored.count(QueueStatus.PENDING) == 1
@@ -0,0 +1,65 @@
+"""KeyRegistry のユニットテスト"""
+
+import pytest
+from nostr_sdk import Keys
+
+from src.domain import NpcKey
+from src.infrastructure import KeyRegistry
+
+
+class CountingLoader:
+    """その場で鍵を作り、読み込んだ回数を数える（99番は鍵なし）"""
+
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def __call__(self, npc_id: int) -> NpcKey:
+        self.calls.append(npc_id)
+        if npc_id == 99:
+            raise ValueError("Keys not found")
+        keys = Keys.generate()
+        return NpcKey(
+            id=npc_id,
+            name=f"npc{npc_id:03d}",
+            pubkey=keys.public_key().to_hex(),
+            nsec=keys.secret_key().to_bech32(),
+        )
+
+
+class TestKeyRegistry:
+    """鍵の読み込みと使い回しのテスト"""
+
+    def test_keys_are_loaded_and_parsed_once(self) -> None:
+        """同じNPCの鍵は1回だけ読み込んで変換し、同じKeysを返す"""
+        loader = CountingLoader()
+        registry = KeyRegistry(loader)
+
+        first = registry.keys_for(1)
+        second = registry.keys_for(1)
+
+        assert first is second
+        assert registry.pubkey_of(1) == first.public_key().to_hex()
+        assert loader.calls == [1]
+
+    def test_pubkey_lookups(self) -> None:
+        """pubkeyからNPCを、住人名からpubkeyを引く"""
+        registry = KeyRegistry(CountingLoader())
+        assert registry.load([1, 2]) == 2
+
+        pubkey = registry.pubkey_of(2)
+        assert registry.npc_for_pubkey(pubkey) == 2
+        assert registry.is_resident(pubkey)
+        assert not registry.is_resident("f" * 64)
+        assert registry.target_pubkey("npc002") == pubkey
+        assert registry.target_pubkey("external:abcd") is None
+
+    def test_missing_key_is_not_reloaded(self) -> None:
+        """鍵がないNPCは毎回ValueErrorにし、読み込みはやり直さない"""
+        loader = CountingLoader()
+        registry = KeyRegistry(loader)
+
+        assert registry.load([1, 99]) == 1
+        with pytest.raises(ValueError):
+            registry.keys_for(99)
+        assert registry.target_pubkey("npc099") is None
+        assert loader.calls == [1, 99]
@@ -0,0 +1,106 @@
+"""CachedLLMProvider のユニットテスト"""
+
+import asyncio
+from pathlib import Path
+
+from src.infrastructure import CachedLLMProvider, LLMProvider, LLMPurpose
+
+
+class CountingProvider(LLMProvider):
+    """呼ばれた回数を数え、回数入りの応答を返すプロバイダー"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        self.calls += 1
+        await asyncio.sleep(0)
+        return f"{prompt}#{self.calls}"
+
+    def is_available(self) -> bool:
+        return True
+
+
+def create_cache(
+    tmp_path: Path, max_bytes: int = 1_000_000
+) -> tuple[CachedLLMProvider, CountingProvider]:
+    """レビューだけキャッシュする設定で作成"""
+    inner = CountingProvider()
+    cache = CachedLLMProvider(
+        inner, tmp_path / "llm_cache.db", {LLMPurpose.REVIEW: 1}, max_bytes=max_bytes
+    )
+    return cache, inner
+
+
+class TestCachedLLMProvider:
+    """応答キャッシュのテスト"""
+
+    async def test_same_prompt_hits_cache(self, tmp_path: Path) -> None:
+        """同じプロンプトは2回目からLLMを呼ばない"""
+        cache, inner = create_cache(tmp_path)
+
+        first = await cache.generate("p", max_length=100, purpose=LLMPurpose.REVIEW)
+        second = await cache.generate("p", max_length=100, purpose=LLMPurpose.REVIEW)
+
+        assert first == second
+        assert inner.calls == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    async def test_options_are_part_of_key(self, tmp_path: Path) -> None:
+        """最大長が違えば別の応答として扱う"""
+        cache, inner = create_cache(tmp_path)
+
+        await cache.generate("p", max_length=100, purpose=LLMPurpose.REVIEW)
+        await cache.generate("p", max_length=50, purpose=LLMPurpose.REVIEW)
+
+        assert inner.calls == 2
+
+    async def test_creative_purpose_is_not_cached(self, tmp_path: Path) -> None:
+        """TTLのない用途は毎回生成する"""
+        cache, inner = create_cache(tmp_path)
+
+        await cache.generate("p", purpose=LLMPurpose.POST)
+        await cache.generate("p", purpose=LLMPurpose.POST)
+
+        assert inner.calls == 2
+        assert cache.bypassed == 2
+
+    async def test_cache_persists_across_instances(self, tmp_path: Path) -> None:
+        """別プロセス（別インスタンス）からも再利用できる"""
+        cache, _ = create_cache(tmp_path)
+        await cache.generate("p", purpose=LLMPurpose.REVIEW)
+        cache.close()
+
+        reopened, inner = create_cache(tmp_path)
+        assert await reopened.generate("p", purpose=LLMPurpose.REVIEW) == "p#1"
+        assert inner.calls == 0
+
+    async def test_concurrent_identical_calls_share_one_generation(self, tmp_path: Path) -> None:
+        """同じキーの同時呼び出しはLLMを1回だけ呼ぶ"""
+        cache, inner = create_cache(tmp_path)
+
+        results = await asyncio.gather(
+            *(cache.generate("p", purpose=LLMPurpose.REVIEW) for _ in range(3))
+        )
+
+        assert results == ["p#1"] * 3
+        assert inner.calls == 1
+
+    async def test_lru_eviction(self, tmp_path: Path) -> None:
+        """上限を超えたら最後に使われたのが古いものから捨てる"""
+        cache, inner = create_cache(tmp_path, max_bytes=10)
+
+        await cache.generate("aaa", purpose=LLMPurpose.REVIEW)  # "aaa#1"（5バイト）
+        await cache.generate("bbb", purpose=LLMPurpose.REVIEW)  # "bbb#2"
+        await cache.generate("aaa", purpose=LLMPurpose.REVIEW)  # ヒット（aaaが新しくなる）
+        await cache.generate("ccc", purpose=LLMPurpose.REVIEW)  # bbbが捨てられる
+
+        assert await cache.generate("aaa", purpose=LLMPurpose.REVIEW) == "aaa#1"
+        assert await cache.generate("bbb", purpose=LLMPurpose.REVIEW) == "bbb#4"
+        assert inner.calls == 4
@@ -0,0 +1,70 @@
+"""記録・再生・合成プロバイダーのユニットテスト"""
+
+from pathlib import Path
+
+import pytest
+
+from src.domain import ReviewJudge
+from src.infrastructure import (
+    LLMPurpose,
+    RecordingLLMProvider,
+    ReplayLLMProvider,
+    SyntheticLLMProvider,
+)
+
+
+class TestRecordAndReplay:
+    """カセットの記録と再生のテスト"""
+
+    async def test_replay_returns_recorded_response(self, tmp_path: Path) -> None:
+        """記録した応答を同じプロンプトで再生できる"""
+        cassette = tmp_path / "cassette.jsonl"
+        recorder = RecordingLLMProvider(SyntheticLLMProvider(seed=1), cassette)
+        recorded = await recorder.generate("prompt", max_length=30, purpose=LLMPurpose.POST)
+
+        replay = ReplayLLMProvider(cassette)
+
+        assert replay.is_available()
+        assert await replay.generate("prompt", max_length=30, purpose=LLMPurpose.POST) == recorded
+        assert replay.exact_hits == 1
+
+    async def test_unknown_prompt_falls_back_to_same_purpose(self, tmp_path: Path) -> None:
+        """プロンプトが違っても、同じ用途の記録を順番に返す"""
+        cassette = tmp_path / "cassette.jsonl"
+        recorder = RecordingLLMProvider(SyntheticLLMProvider(seed=1), cassette)
+        first = await recorder.generate("a", purpose=LLMPurpose.REPLY)
+        second = await recorder.generate("b", purpose=LLMPurpose.REPLY)
+
+        replay = ReplayLLMProvider(cassette)
+        results = [await replay.generate("other", purpose=LLMPurpose.REPLY) for _ in range(3)]
+
+        assert results == [first, second, first]
+        assert replay.purpose_hits == 3
+
+    async def test_missing_purpose_raises(self, tmp_path: Path) -> None:
+        """同じ用途の記録がなければ例外"""
+        replay = ReplayLLMProvider(tmp_path / "missing.jsonl")
+
+        assert not replay.is_available()
+        with pytest.raises(KeyError):
+            await replay.generate("prompt", purpose=LLMPurpose.POST)
+
+
+class TestSyntheticLLMProvider:
+    """合成プロバイダーのテスト"""
+
+    async def test_length_and_determinism(self) -> None:
+        """指定の長さで、同じシードなら同じ文章になる"""
+        a = await SyntheticLLMProvider(length=50, seed=3).generate("p")
+        b = await SyntheticLLMProvider(length=50, seed=3).generate("p")
+
+        assert a == b
+        assert len(a) == 50
+        assert len(await SyntheticLLMProvider(length=50).generate("p", max_length=20)) == 20
+
+    async def test_batch_review_is_parseable(self) -> None:
+        """バッチレビューには番号ごとのOKを返す"""
+        prompt = ReviewJudge.create_batch_prompt(["一つ目", "二つ目", "三つ目"])
+        response = await SyntheticLLMProvider().generate(prompt, purpose=LLMPurpose.REVIEW)
+
+        assert ReviewJudge.parse_batch(response, 3) == {i: (True, None) for i in range(3)}
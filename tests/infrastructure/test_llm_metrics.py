@@ -0,0 +1,123 @@
+"""LLM呼び出しの計測のユニットテスト"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure import (
+    CachedLLMProvider,
+    InstrumentedLLMProvider,
+    LLMCallRecord,
+    LLMProvider,
+    LLMPurpose,
+    LLMStatsRepository,
+    LLMTickReport,
+    llm_npc,
+)
+from src.infrastructure.llm.metrics import percentile
+
+
+class EchoProvider(LLMProvider):
+    """プロンプトをそのまま返すプロバイダー（"fail" なら失敗する）"""
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        await asyncio.sleep(0)
+        if prompt == "fail":
+            raise RuntimeError("boom")
+        return prompt
+
+    def is_available(self) -> bool:
+        return True
+
+
+class TestInstrumentedLLMProvider:
+    """呼び出しごとの計測のテスト"""
+
+    async def test_records_purpose_and_npc(self) -> None:
+        """用途と、with llm_npc で付けたNPCを記録する"""
+        llm = InstrumentedLLMProvider(EchoProvider())
+
+        with llm_npc(3):
+            await llm.generate("a", purpose=LLMPurpose.POST)
+        await llm.generate("b", purpose=LLMPurpose.REVIEW)
+
+        assert [(r.purpose, r.npc_id) for r in llm.records] == [("post", 3), ("review", None)]
+
+    async def test_npc_is_separate_per_task(self) -> None:
+        """並列に走るNPCどうしで取り違えない"""
+        llm = InstrumentedLLMProvider(EchoProvider())
+
+        async def lane(npc_id: int) -> None:
+            with llm_npc(npc_id):
+                await llm.generate(str(npc_id), purpose=LLMPurpose.REPLY)
+
+        await asyncio.gather(*(lane(npc_id) for npc_id in range(1, 6)))
+
+        assert {(r.npc_id, r.purpose) for r in llm.records} == {(i, "reply") for i in range(1, 6)}
+
+    async def test_failure_is_recorded(self) -> None:
+        """失敗した呼び出しも記録して、例外はそのまま投げる"""
+        llm = InstrumentedLLMProvider(EchoProvider())
+
+        with pytest.raises(RuntimeError):
+            await llm.generate("fail", purpose=LLMPurpose.POST)
+
+        assert llm.records[0].error == "RuntimeError"
+
+    async def test_cache_hit_is_marked(self, tmp_path: Path) -> None:
+        """応答キャッシュから返した呼び出しはcachedになる"""
+        cache = CachedLLMProvider(EchoProvider(), tmp_path / "cache.db", {LLMPurpose.REVIEW: 1})
+        llm = InstrumentedLLMProvider(cache)
+
+        await llm.generate("p", purpose=LLMPurpose.REVIEW)
+        await llm.generate("p", purpose=LLMPurpose.REVIEW)
+
+        assert [r.cached for r in llm.records] == [False, True]
+
+
+class TestTickReport:
+    """tickごとの集計のテスト"""
+
+    def test_percentile_interpolates(self) -> None:
+        """パーセンタイルは線形補間"""
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+        assert percentile([1.0, 2.0], 90) == pytest.approx(1.9)
+        assert percentile([], 90) == 0.0
+
+    def test_groups_by_purpose_and_npc(self) -> None:
+        """用途別・NPC別に集計し、キャッシュは分布から除く"""
+        records = [
+            LLMCallRecord(purpose="post", npc_id=1, latency=2.0),
+            LLMCallRecord(purpose="post", npc_id=2, latency=4.0),
+            LLMCallRecord(purpose="review", latency=0.0, cached=True),
+        ]
+
+        report = LLMTickReport.build(records, tick=7, seconds=10.0)
+
+        assert report.by_purpose["post"]["calls"] == 2
+        assert report.by_purpose["post"]["latency"]["p50"] == 3.0
+        assert report.by_purpose["review"]["cached"] == 1
+        assert set(report.by_npc) == {1, 2}
+        assert report.total["calls"] == 3
+
+
+class TestLLMStatsRepository:
+    """計測結果の保存のテスト"""
+
+    def test_keeps_latest_reports(self, tmp_path: Path) -> None:
+        """上限を超えたら古いtickから捨てる"""
+        repo = LLMStatsRepository(tmp_path / "llm_stats.jsonl", max_reports=3)
+
+        for tick in range(1, 6):
+            repo.append(LLMTickReport.build([LLMCallRecord(purpose="post")], tick, 1.0))
+
+        assert [r.tick for r in repo.load()] == [3, 4, 5]
+        assert [r.tick for r in repo.load(limit=2)] == [4, 5]
+        assert repo.load()[0].calls[0].purpose == "post"
@@ -0,0 +1,114 @@
+"""PooledLLMProvider のユニットテスト"""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure import LLMPurpose, OllamaProvider, PooledLLMProvider
+
+
+class FakeHost(OllamaProvider):
+    """ネットワークに出ずに応答するホスト"""
+
+    def __init__(
+        self,
+        host: str,
+        fail: bool = False,
+        delay: float = 0.0,
+        error: Exception | None = None,
+    ):
+        super().__init__(host, "test-model")
+        self.fail = fail
+        self.error = error  # リクエスト側のエラー（ホストは生きている）
+        self.delay = delay
+        self.available = not fail
+        self.calls = 0
+
+    async def generate(
+        self,
+        prompt: str,
+        max_length: int | None = None,
+        *,
+        purpose: LLMPurpose | None = None,
+    ) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.host} is down")
+        if self.error is not None:
+            raise self.error
+        return f"{self.host}:{prompt}"
+
+    def is_available(self) -> bool:
+        return self.available
+
+
+class TestPooledLLMProvider:
+    """振り分けと切り離しのテスト"""
+
+    async def test_dispatches_to_least_loaded_host(self) -> None:
+        """同時に投げると、実行中の少ないホストに散らばる"""
+        hosts = [FakeHost("a", delay=0.01), FakeHost("b", delay=0.01), FakeHost("c", delay=0.01)]
+        pool = PooledLLMProvider(hosts)
+
+        await asyncio.gather(*(pool.generate(str(i)) for i in range(6)))
+
+        assert [host.calls for host in hosts] == [2, 2, 2]
+
+    async def test_failed_host_is_ejected_and_request_retried(self) -> None:
+        """失敗したホストは外し、同じリクエストを別のホストで生成する"""
+        down, up = FakeHost("down", fail=True), FakeHost("up")
+        pool = PooledLLMProvider([down, up])
+
+        assert await pool.generate("p") == "up:p"
+        assert await pool.generate("q") == "up:q"
+        assert down.calls == 1
+        assert not pool.members[0].healthy
+
+    async def test_request_error_keeps_host_healthy(self) -> None:
+        """モデルがないなどリクエスト側のエラーはホストを外さず、そのエラーを投げる"""
+        hosts = [FakeHost("a", error=ValueError("model not found")), FakeHost("b")]
+        pool = PooledLLMProvider(hosts)
+
+        with pytest.raises(ValueError, match="model not found"):
+            await pool.generate("p")
+
+        assert all(member.healthy for member in pool.members)
+        assert hosts[1].calls == 0
+
+    async def test_ejected_host_is_readmitted_after_backoff(self) -> None:
+        """待ち時間の後、死活確認が通れば戻す"""
+        flaky = FakeHost("flaky", fail=True)
+        pool = PooledLLMProvider([flaky, FakeHost("up")], backoff_seconds=0.01)
+        await pool.generate("p")
+
+        flaky.fail = False
+        flaky.available = True
+        await asyncio.sleep(0.02)
+        await pool.generate("q")
+
+        assert pool.members[0].healthy
+        assert pool.members[0].backoff == 0.0
+
+    async def test_all_hosts_down(self) -> None:
+        """使えるホストがなければ例外"""
+        pool = PooledLLMProvider([FakeHost("a", fail=True), FakeHost("b", fail=True)])
+
+        with pytest.raises(RuntimeError):
+            await pool.generate("p")
+
+    def test_is_available_ejects_unreachable_hosts(self) -> None:
+        """死活確認に失敗したホストは最初から外す"""
+        pool = PooledLLMProvider([FakeHost("a", fail=True), FakeHost("b")])
+
+        assert pool.is_available()
+        assert [m.healthy for m in pool.members] == [False, True]
+
+    async def test_report_has_latency_per_host(self) -> None:
+        """ホストごとのレイテンシを集計する"""
+        pool = PooledLLMProvider([FakeHost("a"), FakeHost("b")])
+        await pool.generate("p")
+
+        report = pool.report()
+        assert "a [up]: 1 ok" in report
+        assert "b [up]: 0 ok, 0 errors, no requests" in report
@@ -0,0 +1,44 @@
+"""LogRepository のユニットテスト"""
+
+from datetime import datetime
+from pathlib import Path
+
+from src.domain import ActivityLogger
+from src.infrastructure import LogRepository
+
+
+class TestBufferedLogRepository:
+    """バッファリングとJSONL出力のテスト"""
+
+    def test_entries_are_written_on_flush(self, tmp_path: Path) -> None:
+        """flushまではファイルを書かず、flushで1ファイルにまとめて書く"""
+        repo = LogRepository(str(tmp_path), buffered=True)
+        repo.add_entry(1, ActivityLogger.log_review("投稿1", approved=True))
+        repo.add_entry(1, ActivityLogger.log_review("投稿2", approved=False, reason="NG"))
+
+        assert not (tmp_path / "npc001").exists()
+        assert repo.flush() == 1
+
+        content = repo.get_log_content(1, datetime.now())
+        assert content is not None
+        assert content.startswith("# npc001 活動ログ")
+        assert content.count("レビュー") == 2
+
+    def test_jsonl_sidecar_matches_entries(self, tmp_path: Path) -> None:
+        """JSONLにも同じエントリーが構造化されて残る"""
+        repo = LogRepository(str(tmp_path))
+        repo.add_entry(1, ActivityLogger.log_review("投稿1", approved=True))
+        repo.add_entry(1, ActivityLogger.log_review("投稿2", approved=False, reason="NG"))
+
+        entries = repo.get_structured_entries(1, datetime.now())
+        assert [e["event_type"] for e in entries] == ["post_review", "post_review"]
+        assert entries[1]["details"]["reason"] == "NG"
+
+    def test_flush_twice_does_not_duplicate(self, tmp_path: Path) -> None:
+        """flush済みのエントリーは再度書かれない"""
+        repo = LogRepository(str(tmp_path), buffered=True)
+        repo.add_entry(1, ActivityLogger.log_review("投稿1", approved=True))
+        repo.flush()
+
+        assert repo.flush() == 0
+        assert len(repo.get_structured_entries(1, datetime.now())) == 1
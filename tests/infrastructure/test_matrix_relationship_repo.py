@@ -0,0 +1,105 @@
+"""好感度の一括更新（JSON版・行列版）のユニットテスト"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.domain import Affinity
+from src.infrastructure import RelationshipRepository, UnitOfWork
+
+pytest.importorskip("numpy")
+
+from src.infrastructure.storage.matrix_relationship_repo import (  # noqa: E402
+    MatrixRelationshipRepository,
+)
+
+NOW = datetime(2026, 10, 16, 12, 0)
+
+
+@pytest.fixture(params=[RelationshipRepository, MatrixRelationshipRepository])
+def repo(request: pytest.FixtureRequest, tmp_path: Path) -> RelationshipRepository:
+    """JSON版・行列版で同じテストを回す"""
+    repo_class: type[RelationshipRepository] = request.param
+    return repo_class(tmp_path)
+
+
+def save_affinity(
+    repo: RelationshipRepository, npc_id: str, target_id: str, value: float, days_ago: int
+) -> None:
+    """テスト用の好感度を保存"""
+    affinity = repo.load_affinity(npc_id)
+    affinity.set_affinity(target_id, value)
+    affinity.record_interaction(target_id, (NOW - timedelta(days=days_ago)).isoformat())
+    repo.save_affinity(affinity)
+
+
+class TestBulkAffinityUpdates:
+    """減衰・無視ペナルティの一括処理のテスト"""
+
+    def test_decay_only_stale_relations(self, repo: RelationshipRepository) -> None:
+        """最後の相互作用が古い関係だけ減衰する"""
+        save_affinity(repo, "npc001", "npc002", 0.5, days_ago=10)
+        save_affinity(repo, "npc001", "npc003", 0.5, days_ago=1)
+
+        changed = repo.decay_stale_affinities(
+            {"npc001": ["npc002", "npc003", "npc004"]}, NOW - timedelta(weeks=1), -0.1
+        )
+
+        assert changed == 1
+        affinity = repo.load_affinity("npc001")
+        assert affinity.get_affinity("npc002") == pytest.approx(0.4)
+        assert affinity.get_affinity("npc003") == pytest.approx(0.5)
+
+    def test_penalize_repeats_and_clamps(self, repo: RelationshipRepository) -> None:
+        """同じ組は回数分変化し、下限で止まった分は数えない"""
+        save_affinity(repo, "npc001", "npc002", -0.95, days_ago=0)
+
+        changed = repo.penalize_affinities(
+            [("npc001", "npc002")] * 3 + [("npc001", "npc003")], -0.1
+        )
+
+        assert changed == 2
+        affinity = repo.load_affinity("npc001")
+        assert affinity.get_affinity("npc002") == -1.0
+        assert affinity.get_affinity("npc003") == pytest.approx(-0.1)
+
+
+class TestMatrixRelationshipRepository:
+    """行列版の永続化のテスト"""
+
+    def test_round_trip_through_npz(self, tmp_path: Path) -> None:
+        """保存した値が別インスタンスでも同じAffinityとして読める"""
+        repo = MatrixRelationshipRepository(tmp_path)
+        affinity = Affinity(npc_id="npc001")
+        affinity.set_affinity("npc002", 0.3)
+        affinity.update_familiarity("npc002", 0.2)
+        affinity.record_interaction("npc002", NOW.isoformat())
+        repo.save_affinity(affinity)
+
+        loaded = MatrixRelationshipRepository(tmp_path).load_affinity("npc001")
+        assert loaded.targets == {"npc002": 0.3}
+        assert loaded.familiarity == {"npc002": 0.2}
+        assert loaded.last_interactions == {"npc002": NOW.isoformat()}
+        assert loaded.trust == {}
+
+    def test_imports_existing_json(self, tmp_path: Path) -> None:
+        """初回は既存のJSONファイルを取り込む"""
+        save_affinity(RelationshipRepository(tmp_path), "npc001", "npc002", 0.7, days_ago=0)
+
+        repo = MatrixRelationshipRepository(tmp_path)
+        assert repo.load_affinity("npc001").get_affinity("npc002") == 0.7
+        assert list(repo.load_all_affinities()) == ["npc001"]
+
+    def test_bulk_update_refreshes_views_and_defers_write(self, tmp_path: Path) -> None:
+        """一括更新は読み込み済みのビューにも反映され、書き出しはcommit時"""
+        uow = UnitOfWork()
+        repo = MatrixRelationshipRepository(tmp_path, uow)
+        view = repo.load_affinity("npc001")
+
+        repo.penalize_affinities([("npc001", "npc002")], -0.1)
+
+        assert view.get_affinity("npc002") == pytest.approx(-0.1)
+        assert not repo.matrix_file.exists()
+        assert uow.commit() == 1
+        assert repo.matrix_file.exists()
@@ -0,0 +1,174 @@
+"""NostrPublisher の送信のユニットテスト"""
+
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from src.infrastructure import NostrPublisher
+
+
+class FakeEventId:
+    """イベントID"""
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def to_hex(self) -> str:
+        return self.value
+
+
+class FakeEvent:
+    """署名済みイベントの代わり（as_json と id だけ持つ）"""
+
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+
+    def as_json(self) -> str:
+        return json.dumps({"id": self.event_id, "kind": 7})
+
+    def id(self) -> FakeEventId:
+        return FakeEventId(self.event_id)
+
+
+class CountingPublisher(NostrPublisher):
+    """MockTransportのクライアントを使い、作った数を数えるパブリッシャー"""
+
+    def __init__(
+        self, status_code: int = 200, body: dict[str, object] | None = None, **kwargs: bool
+    ):
+        super().__init__("http://api.test", **kwargs)
+        self.created: list[httpx.AsyncClient] = []
+        self.requests: list[dict[str, object]] = []
+        self.status_code = status_code
+        self.body = body
+
+    def _create_client(self) -> httpx.AsyncClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(json.loads(request.content))
+            body = self.body or {"success": self.status_code == 200}
+            return httpx.Response(self.status_code, json=body)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.created.append(client)
+        return client
+
+
+class TestConnectionPool:
+    """接続プールの使い回しのテスト"""
+
+    async def test_open_publisher_reuses_one_client(self) -> None:
+        """開いている間は1つのクライアントで送り、閉じたらクライアントも閉じる"""
+        publisher = CountingPublisher()
+
+        async with publisher:
+            ids = [await publisher._send_event(FakeEvent(f"e{i}")) for i in range(3)]
+
+        assert ids == ["e0", "e1", "e2"]
+        assert len(publisher.created) == 1
+        assert publisher.created[0].is_closed
+        assert publisher.client is None
+        assert publisher.requests[0] == {"event": {"id": "e0", "kind": 7}}
+
+    async def test_unopened_publisher_connects_per_event(self) -> None:
+        """開いていなければ1件ごとに接続して閉じる"""
+        publisher = CountingPublisher()
+
+        await publisher._send_event(FakeEvent("a"))
+        await publisher._send_event(FakeEvent("b"))
+
+        assert len(publisher.created) == 2
+        assert all(client.is_closed for client in publisher.created)
+
+    async def test_dry_run_does_not_connect(self) -> None:
+        """dry_runなら開いても接続しない"""
+        publisher = CountingPublisher(dry_run=True)
+
+        async with publisher:
+            pass
+
+        assert publisher.created == []
+
+    async def test_api_error_is_raised(self) -> None:
+        """APIがエラーを返したら例外にする（接続プールは開いたまま）"""
+        publisher = CountingPublisher(status_code=500)
+
+        async with publisher:
+            with pytest.raises(RuntimeError):
+                await publisher._send_event(FakeEvent("a"))
+            assert publisher.client is not None
+
+
+class TestHttp2:
+    """HTTP/2のテスト"""
+
+    async def test_falls_back_without_h2(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """h2がなければHTTP/1.1で接続する"""
+        monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+        publisher = NostrPublisher("http://api.test", http2=True)
+
+        async with publisher:
+            assert publisher.client is not None
+
+
+class TestDuplicate:
+    """送り直したイベントが重複と返されたときのテスト"""
+
+    async def test_conflict_is_success(self) -> None:
+        """409は受け付け済みとして成功にする"""
+        publisher = CountingPublisher(status_code=409)
+
+        assert await publisher._send_event(FakeEvent("a")) == "a"
+
+    async def test_duplicate_message_is_success(self) -> None:
+        """ "duplicate:" を含む応答も成功にする"""
+        publisher = CountingPublisher(
+            status_code=400, body={"success": False, "error": "duplicate: already have this event"}
+        )
+
+        assert await publisher._send_event(FakeEvent("a")) == "a"
+
+    async def test_error_mentioning_duplicate_is_not_success(self) -> None:
+        """本文に "duplicate" が出てくるだけのエラーは失敗にする"""
+        publisher = CountingPublisher(
+            status_code=400,
+            body={"success": False, "error": "invalid: content has a duplicate tag"},
+        )
+
+        with pytest.raises(RuntimeError):
+            await publisher._send_event(FakeEvent("a"))
+
+
+class TestSignMany:
+    """まとめて署名のテスト"""
+
+    async def test_signs_in_worker_threads(self) -> None:
+        """スレッドプールで並列に署名し、全件を目印付きで返す（失敗は error に入る）"""
+        publisher = NostrPublisher("http://api.test", sign_workers=4)
+        threads: set[str] = set()
+
+        def build(event_id: str) -> FakeEvent:
+            threads.add(threading.current_thread().name)
+            time.sleep(0.05)  # 署名の代わり（GILを離す）
+            if event_id == "bad":
+                raise ValueError("invalid key")
+            return FakeEvent(event_id)
+
+        ids = [f"e{i}" for i in range(8)] + ["bad"]
+        started = time.monotonic()
+        results = [
+            r
+            async for r in publisher.sign_many(
+                (event_id, lambda event_id=event_id: build(event_id)) for event_id in ids
+            )
+        ]
+        elapsed = time.monotonic() - started
+
+        assert sorted(r.tag for r in results) == sorted(ids)
+        failed = [r for r in results if r.error is not None]
+        assert [r.tag for r in failed] == ["bad"]
+        assert all(r.event.id().to_hex() == r.tag for r in results if r.event is not None)
+        assert all(name.startswith("sign") for name in threads)
+        assert elapsed < 0.05 * len(ids) / 2
@@ -0,0 +1,176 @@
+"""OllamaProvider のユニットテスト"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from src.infrastructure import InstrumentedLLMProvider, LLMPurpose, ModelRoute, OllamaProvider
+from src.infrastructure.llm.ollama import build_options, truncate
+
+
+class FakeStream:
+    """チャンクを1つずつ返すストリーム（どこまで読まれたかを記録）"""
+
+    def __init__(self, chunks: list[str], final: dict[str, Any] | None = None):
+        self.chunks = chunks
+        self.final = final  # 最後のチャンク（done）に付けるトークン数と時間
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        return self._iter()
+
+    async def _iter(self) -> AsyncIterator[dict[str, Any]]:
+        for i, chunk in enumerate(self.chunks):
+            self.read += 1
+            if self.final is not None and i == len(self.chunks) - 1:
+                yield {"response": chunk, "done": True, **self.final}
+            else:
+                yield {"response": chunk}
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakeAsyncClient:
+    """generate(stream=True) でFakeStreamを返すクライアント"""
+
+    def __init__(self, chunks: list[str], final: dict[str, Any] | None = None):
+        self.stream = FakeStream(chunks, final)
+        self.options: dict[str, Any] | None = None
+        self.model: str | None = None
+        self.keep_alive: str | None = None
+
+    async def generate(self, **kwargs: Any) -> FakeStream:
+        self.options = kwargs["options"]
+        self.model = kwargs["model"]
+        self.keep_alive = kwargs.get("keep_alive")
+        return self.stream
+
+
+class TestStreamingGenerate:
+    """ストリーミング生成の打ち切りテスト"""
+
+    async def test_stops_reading_after_max_length(self) -> None:
+        """最大長を超えたら残りを読まずに接続を閉じる"""
+        provider = OllamaProvider("http://localhost:11434", "test")
+        fake = FakeAsyncClient(["あいうえお", "かきくけこ", "さしすせそ", "たちつてと"])
+        provider.async_client = fake  # type: ignore[assignment]
+
+        content = await provider.generate("prompt", max_length=7)
+
+        assert content == "あいうえおかき..."
+        assert fake.stream.read == 2
+        assert fake.stream.closed
+
+    async def test_result_matches_full_generation(self) -> None:
+        """打ち切っても全文を待ってから切り詰めた場合と同じ結果になる"""
+        chunks = ["  hello ", "world ", "foo ", "bar ", "baz"]
+        provider = OllamaProvider("http://localhost:11434", "test")
+        provider.async_client = FakeAsyncClient(chunks)  # type: ignore[assignment]
+
+        content = await provider.generate("prompt", max_length=12)
+
+        assert content == truncate("".join(chunks).strip(), 12)
+
+    async def test_short_output_is_read_to_the_end(self) -> None:
+        """最大長に届かなければ最後まで読んでそのまま返す"""
+        provider = OllamaProvider("http://localhost:11434", "test")
+        fake = FakeAsyncClient(["OK", "\n"])
+        provider.async_client = fake  # type: ignore[assignment]
+
+        content = await provider.generate("prompt", max_length=100, purpose=LLMPurpose.REVIEW)
+
+        assert content == "OK"
+        assert fake.stream.read == 2
+
+
+class TestBuildOptions:
+    """生成オプションのテスト"""
+
+    def test_num_predict_follows_max_length(self) -> None:
+        """最大長があればnum_predictを設定する"""
+        assert build_options(100, None)["num_predict"] > 100
+        assert "num_predict" not in build_options(None, None)
+
+    def test_stop_depends_on_purpose(self) -> None:
+        """停止シーケンスは用途ごとに決まる"""
+        assert build_options(None, LLMPurpose.REPLY)["stop"] == ["\n\n"]
+        assert "stop" not in build_options(None, LLMPurpose.POST)
+
+
+class TestModelRoutes:
+    """用途ごとのモデル振り分けのテスト"""
+
+    async def test_route_selects_model_and_options(self) -> None:
+        """ルートのある用途は指定のモデルとnum_ctx/num_predictで生成する"""
+        routes = {LLMPurpose.REVIEW: ModelRoute(model="tiny", num_ctx=2048, num_predict=32)}
+        provider = OllamaProvider("http://localhost:11434", "big", routes=routes)
+        fake = FakeAsyncClient(["OK"])
+        provider.async_client = fake  # type: ignore[assignment]
+
+        await provider.generate("prompt", max_length=100, purpose=LLMPurpose.REVIEW)
+
+        assert fake.model == "tiny"
+        assert fake.options == {"num_predict": 32, "num_ctx": 2048}
+
+    async def test_unrouted_purpose_uses_default_model(self) -> None:
+        """ルートのない用途は既定のモデル"""
+        routes = {LLMPurpose.REVIEW: ModelRoute(model="tiny")}
+        provider = OllamaProvider("http://localhost:11434", "big", routes=routes)
+        fake = FakeAsyncClient(["こんにちは"])
+        provider.async_client = fake  # type: ignore[assignment]
+
+        await provider.generate("prompt", purpose=LLMPurpose.POST)
+
+        assert fake.model == "big"
+        assert provider.model_identity(LLMPurpose.POST) == "big"
+        assert provider.model_identity(LLMPurpose.REVIEW) != "big"
+
+    async def test_keep_alive_is_sent(self) -> None:
+        """keep_aliveを毎回の生成に付ける（モデルとKVキャッシュを保持させる）"""
+        provider = OllamaProvider("http://localhost:11434", "big", keep_alive="30m")
+        fake = FakeAsyncClient(["OK"])
+        provider.async_client = fake  # type: ignore[assignment]
+
+        await provider.generate("prompt", purpose=LLMPurpose.REVIEW)
+
+        assert fake.keep_alive == "30m"
+
+
+class TestUsageRecording:
+    """計測中の呼び出しへのトークン数・時間の記録テスト"""
+
+    async def test_final_chunk_usage_is_recorded(self) -> None:
+        """最後のチャンクのeval_countなどを秒とトークン数で記録する"""
+        provider = OllamaProvider("http://localhost:11434", "big")
+        final = {
+            "prompt_eval_count": 400,
+            "prompt_eval_duration": 2_000_000_000,
+            "eval_count": 50,
+            "eval_duration": 5_000_000_000,
+        }
+        provider.async_client = FakeAsyncClient(["こんに", "ちは"], final)  # type: ignore[assignment]
+        llm = InstrumentedLLMProvider(provider)
+
+        await llm.generate("prompt", purpose=LLMPurpose.POST)
+
+        record = llm.records[0]
+        assert (record.prompt_tokens, record.output_tokens) == (400, 50)
+        assert record.prompt_tokens_per_second == 200
+        assert record.tokens_per_second == 10
+        assert record.model == "big"
+        assert not record.truncated
+
+    async def test_truncated_stream_is_estimated_from_chunks(self) -> None:
+        """最大長で打ち切ったときはチャンク数を生成トークン数とする"""
+        provider = OllamaProvider("http://localhost:11434", "big")
+        provider.async_client = FakeAsyncClient(  # type: ignore[assignment]
+            ["あいうえお", "かきくけこ", "さしすせそ"], {"eval_count": 99}
+        )
+        llm = InstrumentedLLMProvider(provider)
+
+        await llm.generate("prompt", max_length=7, purpose=LLMPurpose.POST)
+
+        record = llm.records[0]
+        assert record.truncated
+        assert record.output_tokens == 2
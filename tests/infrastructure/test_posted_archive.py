@@ -0,0 +1,113 @@
+"""投稿済みアーカイブのユニットテスト"""
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.domain import QueueEntry, QueueStatus
+from src.infrastructure import JournaledQueueRepository, QueueRepository, SqliteQueueRepository
+
+NOW = datetime(2026, 10, 16, 12, 0)
+
+
+def create_posted(hours_ago: float, content: str = "投稿") -> QueueEntry:
+    """テスト用の投稿済みエントリーを作成"""
+    posted_at = NOW - timedelta(hours=hours_ago)
+    return QueueEntry(
+        npc_id=1,
+        npc_name="npc001",
+        content=content,
+        status=QueueStatus.POSTED,
+        created_at=posted_at,
+        posted_at=posted_at,
+    )
+
+
+@pytest.fixture(params=[QueueRepository, SqliteQueueRepository, JournaledQueueRepository])
+def repo(request: pytest.FixtureRequest, tmp_path: Path) -> QueueRepository:
+    """全バックエンドで同じテストを回す"""
+    repo_class: type[QueueRepository] = request.param
+    return repo_class(tmp_path)
+
+
+class TestArchivePosted:
+    """アーカイブ処理のテスト"""
+
+    def test_only_old_entries_are_archived(self, repo: QueueRepository) -> None:
+        """時間幅より古いものだけがアーカイブに移る"""
+        recent = create_posted(1, "最近")
+        old = create_posted(100, "昔")
+        repo.add(old)
+        repo.add(recent)
+
+        assert repo.archive_posted(72, now=NOW) == 1
+        assert [e.id for e in repo.get_all(QueueStatus.POSTED)] == [recent.id]
+        archived = repo.get_archived_posted(old.posted_at.date())  # type: ignore[union-attr]
+        assert [e.id for e in archived] == [old.id]
+
+    def test_nothing_to_archive(self, repo: QueueRepository) -> None:
+        """古いものがなければ何もしない"""
+        repo.add(create_posted(1))
+
+        assert repo.archive_posted(72, now=NOW) == 0
+        assert not repo.archive.archive_dir.exists()
+
+    def test_query_by_date_range(self, repo: QueueRepository) -> None:
+        """期間内のパーティションだけを返す"""
+        for days_ago in (10, 5, 4):
+            repo.add(create_posted(days_ago * 24, f"{days_ago}日前"))
+        repo.archive_posted(72, now=NOW)
+
+        archived = repo.get_archived_posted(date(2026, 10, 11), date(2026, 10, 12))
+        assert [e.content for e in archived] == ["5日前", "4日前"]
+
+
+class TestArchiveCompression:
+    """gzip圧縮のテスト"""
+
+    def test_compressed_partition_is_readable(self, tmp_path: Path) -> None:
+        """圧縮したパーティションも読める"""
+        repo = QueueRepository(tmp_path, archive_compress=True)
+        old = create_posted(100)
+        repo.add(old)
+        repo.archive_posted(72, now=NOW)
+
+        assert list(repo.archive.archive_dir.glob("*.json.gz"))
+        assert [e.id for e in repo.get_archived_posted(date(2026, 10, 12))] == [old.id]
+
+    def test_archive_twice_does_not_duplicate(self, tmp_path: Path) -> None:
+        """同じエントリーを再アーカイブしても重複しない"""
+        repo = QueueRepository(tmp_path)
+        old = create_posted(100)
+        repo.archive.append([old])
+        repo.archive.append([old])
+
+        assert len(repo.get_archived_posted(date(2026, 10, 12))) == 1
+
+
+class TestRemovePosted:
+    """投稿済みの削除のテスト"""
+
+    def test_all_posted_includes_archive(self, repo: QueueRepository) -> None:
+        """アーカイブ済みも含めて古い順に返す"""
+        old = create_posted(100, "昔")
+        recent = create_posted(1, "最近")
+        repo.add(old)
+        repo.add(recent)
+        repo.archive_posted(72, now=NOW)
+
+        assert [e.id for e in repo.get_all_posted()] == [old.id, recent.id]
+
+    def test_remove_from_posted_and_archive(self, repo: QueueRepository) -> None:
+        """posted とアーカイブの両方から消し、空になったパーティションは消す"""
+        old = create_posted(100, "昔")
+        kept = create_posted(50, "残す")
+        recent = create_posted(1, "最近")
+        for entry in (old, kept, recent):
+            repo.add(entry)
+        repo.archive_posted(24, now=NOW)
+
+        assert repo.remove_posted({old.id, recent.id}) == 1
+        assert [e.id for e in repo.get_all_posted()] == [kept.id]
+        assert repo.archive.partition_days() == [kept.posted_at.date()]  # type: ignore[union-attr]
@@ -0,0 +1,158 @@
+"""リプライ逆引きインデックスのユニットテスト"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.domain import PostType, QueueEntry, QueueStatus, ReplyTarget
+from src.infrastructure import JournaledQueueRepository, QueueRepository, SqliteQueueRepository
+
+
+def create_reply(npc_id: int, event_id: str, post_type: PostType = PostType.REPLY) -> QueueEntry:
+    """テスト用リプライエントリーを作成"""
+    return QueueEntry(
+        npc_id=npc_id,
+        npc_name=f"npc{npc_id:03d}",
+        content="返信",
+        post_type=post_type,
+        reply_to=ReplyTarget(resident="npc001", event_id=event_id, content="元投稿"),
+    )
+
+
+@pytest.fixture(params=[QueueRepository, SqliteQueueRepository, JournaledQueueRepository])
+def repo(request: pytest.FixtureRequest, tmp_path: Path) -> QueueRepository:
+    """JSON版・SQLite版・ジャーナル版で同じテストを回す"""
+    repo_class: type[QueueRepository] = request.param
+    return repo_class(tmp_path)
+
+
+class TestReplyLookup:
+    """反応済み判定のテスト"""
+
+    def test_has_replied_after_add(self, repo: QueueRepository) -> None:
+        """追加したリプライが引ける"""
+        repo.add(create_reply(2, "event1"))
+
+        assert repo.has_replied(2, "event1")
+        assert not repo.has_replied(3, "event1")
+        assert not repo.has_replied(2, "event2")
+
+    def test_reaction_counts_as_any_reaction(self, repo: QueueRepository) -> None:
+        """リアクションも反応として数える"""
+        repo.add(create_reply(2, "event1", PostType.REACTION))
+
+        assert repo.has_any_reaction("event1")
+        assert not repo.has_any_reaction("event2")
+
+    def test_rejected_is_not_counted(self, repo: QueueRepository) -> None:
+        """rejectされた反応は数えない"""
+        entry = create_reply(2, "event1")
+        repo.add(entry)
+        repo.reject(entry.id, "NG")
+
+        assert not repo.has_replied(2, "event1")
+        assert not repo.has_any_reaction("event1")
+
+    def test_removed_is_not_counted(self, repo: QueueRepository) -> None:
+        """削除した反応は数えない"""
+        entry = create_reply(2, "event1")
+        repo.add(entry)
+        repo.remove(QueueStatus.PENDING, {entry.id})
+
+        assert not repo.has_replied(2, "event1")
+        assert not repo.has_any_reaction("event1")
+
+    def test_posted_is_counted(self, repo: QueueRepository) -> None:
+        """投稿済みまで進んだ反応も数える"""
+        entry = create_reply(2, "event1")
+        repo.add(entry)
+        repo.approve(entry.id)
+        repo.mark_posted(entry.id, "reply_event")
+
+        assert repo.has_replied(2, "event1")
+
+
+class TestReplyIndexPersistence:
+    """JSON版インデックスの永続化のテスト"""
+
+    def test_index_survives_new_instance(self, tmp_path: Path) -> None:
+        """flushしたインデックスを別インスタンスからも引ける"""
+        repo = QueueRepository(tmp_path)
+        repo.add(create_reply(2, "event1"))
+        assert repo.flush() == 1
+
+        assert QueueRepository(tmp_path).has_replied(2, "event1")
+
+    def test_index_is_written_only_on_flush(self, tmp_path: Path) -> None:
+        """書き込みのたびにはファイルに書き出さず、flushで1回だけ書き出す"""
+        repo = QueueRepository(tmp_path)
+        index_file = tmp_path / QueueRepository.REPLY_INDEX_FILENAME
+        for event_id in ("event1", "event2", "event3"):
+            repo.add(create_reply(2, event_id))
+
+        assert not index_file.exists()
+        assert repo.flush() == 1
+        assert index_file.exists()
+        assert repo.flush() == 0
+
+    def test_index_is_rebuilt_when_missing(self, tmp_path: Path) -> None:
+        """インデックスファイルがなければキューから作り直す"""
+        repo = QueueRepository(tmp_path)
+        repo.add(create_reply(2, "event1"))
+        repo.flush()
+        (tmp_path / QueueRepository.REPLY_INDEX_FILENAME).unlink()
+
+        assert QueueRepository(tmp_path).has_any_reaction("event1")
+
+    def test_stale_index_is_rebuilt(self, tmp_path: Path) -> None:
+        """flush後にキューファイルが変わっていたらキューから作り直す"""
+        repo = QueueRepository(tmp_path)
+        repo.add(create_reply(2, "event1"))
+        repo.flush()
+        # インデックスを書き出さずに別のエントリーを足す（flush前に落ちた状態）
+        repo.add(create_reply(3, "event2"))
+
+        fresh = QueueRepository(tmp_path)
+        assert fresh.has_replied(2, "event1")
+        assert fresh.has_replied(3, "event2")
+
+    def test_removed_entry_is_not_reloaded(self, tmp_path: Path) -> None:
+        """削除したエントリーはflushしたインデックスにも残らない"""
+        repo = QueueRepository(tmp_path)
+        reply = create_reply(1, "E1")
+        reply.status = QueueStatus.POSTED
+        repo.add(reply)
+        repo.remove_posted({reply.id})
+        repo.add(create_reply(2, "E2"))
+        repo.flush()
+
+        fresh = QueueRepository(tmp_path)
+        assert not fresh.has_replied(1, "E1")
+        assert fresh.has_replied(2, "E2")
+
+    def test_archived_entries_are_pruned(self, tmp_path: Path) -> None:
+        """アーカイブした投稿への反応と、アーカイブした反応はインデックスから消える"""
+        now = datetime(2026, 10, 16, 12, 0)
+        old = now - timedelta(hours=100)
+        repo = QueueRepository(tmp_path)
+        original = QueueEntry(
+            npc_id=1,
+            npc_name="npc001",
+            content="元投稿",
+            status=QueueStatus.POSTED,
+            event_id="event1",
+            created_at=old,
+            posted_at=old,
+        )
+        reply = create_reply(2, "event1")
+        reply.status = QueueStatus.POSTED
+        reply.created_at = reply.posted_at = old
+        repo.add(original)
+        repo.add(reply)
+        assert repo.has_any_reaction("event1")
+
+        assert repo.archive_posted(72, now=now) == 2
+        assert not repo.has_any_reaction("event1")
+        repo.flush()
+        assert "event1" not in (tmp_path / QueueRepository.REPLY_INDEX_FILENAME).read_text()
@@ -0,0 +1,72 @@
+"""SnapshotCache のユニットテスト"""
+
+import json
+import shutil
+from pathlib import Path
+
+from src.infrastructure import ProfileRepository, SnapshotCache
+
+RESIDENTS_DIR = Path(__file__).parents[2] / "npcs" / "residents"
+
+
+def parse_json(path: Path) -> object:
+    """テスト用のパース処理"""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class TestSnapshotCache:
+    """ファイル単位のキャッシュのテスト"""
+
+    def test_unchanged_file_hits_after_reload(self, tmp_path: Path) -> None:
+        """保存したキャッシュは次回起動時にヒットする"""
+        data_file = tmp_path / "state.json"
+        data_file.write_text('{"total_posts": 1}', encoding="utf-8")
+        cache_file = tmp_path / "snapshot.pickle"
+
+        first = SnapshotCache(cache_file)
+        assert first.get(data_file, parse_json) == {"total_posts": 1}
+        first.save()
+
+        second = SnapshotCache(cache_file)
+        assert second.get(data_file, parse_json) == {"total_posts": 1}
+        assert (second.hits, second.misses) == (1, 0)
+
+    def test_changed_file_is_reparsed(self, tmp_path: Path) -> None:
+        """サイズが変わったファイルは読み直す"""
+        data_file = tmp_path / "state.json"
+        data_file.write_text('{"total_posts": 1}', encoding="utf-8")
+        cache = SnapshotCache(tmp_path / "snapshot.pickle")
+        cache.get(data_file, parse_json)
+
+        data_file.write_text('{"total_posts": 10}', encoding="utf-8")
+
+        assert cache.get(data_file, parse_json) == {"total_posts": 10}
+        assert cache.misses == 2
+
+    def test_broken_cache_file_is_ignored(self, tmp_path: Path) -> None:
+        """壊れたキャッシュファイルは無視して作り直す"""
+        cache_file = tmp_path / "snapshot.pickle"
+        cache_file.write_bytes(b"broken")
+
+        cache = SnapshotCache(cache_file)
+        assert cache.hit_ratio == 0.0
+
+
+class TestProfileRepositoryWithSnapshot:
+    """プロフィール読み込みとの組み合わせのテスト"""
+
+    def test_profiles_are_loaded_from_cache(self, tmp_path: Path) -> None:
+        """2回目の起動ではキャッシュから同じプロフィールが得られる"""
+        residents_dir = tmp_path / "residents"
+        shutil.copytree(RESIDENTS_DIR / "npc001", residents_dir / "npc001")
+        cache_file = tmp_path / "snapshot.pickle"
+
+        first_cache = SnapshotCache(cache_file)
+        expected = ProfileRepository(residents_dir, snapshot_cache=first_cache).load_all()
+        first_cache.save()
+
+        cache = SnapshotCache(cache_file)
+        profiles = ProfileRepository(residents_dir, snapshot_cache=cache).load_all()
+
+        assert profiles == expected
+        assert cache.misses == 0
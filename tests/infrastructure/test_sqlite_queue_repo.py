@@ -0,0 +1,127 @@
+"""SqliteQueueRepository のユニットテスト"""
+
+from pathlib import Path
+
+from src.domain import PostType, QueueEntry, QueueStatus, ReplyTarget
+from src.infrastructure import QueueRepository, SqliteQueueRepository
+from src.infrastructure.storage.sqlite_queue_repo import NEXT_SEQ_SQL
+
+
+def create_entry(npc_id: int = 1, content: str = "テスト投稿", **kwargs: object) -> QueueEntry:
+    """テスト用エントリーを作成"""
+    return QueueEntry(npc_id=npc_id, npc_name=f"npc{npc_id:03d}", content=content, **kwargs)
+
+
+class TestSqliteQueueRepositoryBasics:
+    """基本操作のテスト"""
+
+    def test_add_and_get_all_keeps_order(self, tmp_path: Path) -> None:
+        """追加順に取得できる"""
+        repo = SqliteQueueRepository(tmp_path)
+        entries = [create_entry(content=f"投稿{i}") for i in range(3)]
+        for entry in entries:
+            repo.add(entry)
+
+        result = repo.get_all(QueueStatus.PENDING)
+        assert [e.id for e in result] == [e.id for e in entries]
+
+    def test_move_appends_to_target_status(self, tmp_path: Path) -> None:
+        """移動したエントリーは移動先の末尾に並ぶ"""
+        repo = SqliteQueueRepository(tmp_path)
+        first = create_entry(status=QueueStatus.APPROVED)
+        second = create_entry()
+        repo.add(first)
+        repo.add(second)
+
+        approved = repo.approve(second.id, "ok")
+
+        assert approved is not None
+        assert approved.review_note == "ok"
+        assert approved.reviewed_at is not None
+        assert repo.count(QueueStatus.PENDING) == 0
+        assert [e.id for e in repo.get_all(QueueStatus.APPROVED)] == [first.id, second.id]
+
+    def test_move_from_wrong_status_returns_none(self, tmp_path: Path) -> None:
+        """移動元のステータスが違えば移動しない"""
+        repo = SqliteQueueRepository(tmp_path)
+        entry = create_entry()
+        repo.add(entry)
+
+        assert repo.mark_posted(entry.id, "event") is None
+        assert repo.get_by_id(entry.id) == (entry, QueueStatus.PENDING)
+
+    def test_mark_posted_many_keeps_given_order(self, tmp_path: Path) -> None:
+        """まとめて投稿済みにしたエントリーは渡した順に並ぶ"""
+        repo = SqliteQueueRepository(tmp_path)
+        entries = [create_entry(content=f"投稿{i}", status=QueueStatus.APPROVED) for i in range(3)]
+        for entry in entries:
+            repo.add(entry)
+
+        moved = repo.mark_posted_many({entries[2].id: "e2", entries[0].id: "e0", "missing": "x"})
+
+        assert [e.event_id for e in moved] == ["e2", "e0"]
+        assert [e.id for e in repo.get_all(QueueStatus.APPROVED)] == [entries[1].id]
+        assert [e.event_id for e in repo.get_all(QueueStatus.POSTED)] == ["e2", "e0"]
+
+    def test_get_recent_rejected_filters_by_npc(self, tmp_path: Path) -> None:
+        """指定NPCのrejectedだけを新しい順に返す"""
+        repo = SqliteQueueRepository(tmp_path)
+        for i in range(4):
+            repo.add(create_entry(npc_id=1, content=f"却下{i}", status=QueueStatus.REJECTED))
+        repo.add(create_entry(npc_id=2, status=QueueStatus.REJECTED))
+
+        result = repo.get_recent_rejected(1, limit=2)
+        assert [e.content for e in result] == ["却下3", "却下2"]
+
+    def test_summary_counts_all_statuses(self, tmp_path: Path) -> None:
+        """サマリーに全ステータスが含まれる"""
+        repo = SqliteQueueRepository(tmp_path)
+        repo.add(create_entry())
+        repo.add(create_entry(status=QueueStatus.POSTED))
+
+        summary = repo.summary()
+        assert summary[QueueStatus.PENDING.value] == 1
+        assert summary[QueueStatus.POSTED.value] == 1
+        assert summary[QueueStatus.REJECTED.value] == 0
+
+    def test_next_seq_uses_index(self, tmp_path: Path) -> None:
+        """次の並び順はseqのインデックスで引き、テーブル全体を走査しない"""
+        repo = SqliteQueueRepository(tmp_path)
+
+        plan = repo._conn.execute(f"EXPLAIN QUERY PLAN {NEXT_SEQ_SQL}").fetchall()
+        assert any("idx_queue_seq" in row[-1] for row in plan)
+
+
+class TestSqliteQueueRepositoryMigration:
+    """JSONからの移行のテスト"""
+
+    def test_import_from_json(self, tmp_path: Path) -> None:
+        """JSONキューの全エントリーを取り込める"""
+        json_repo = QueueRepository(tmp_path)
+        reply = create_entry(
+            npc_id=2,
+            post_type=PostType.REPLY,
+            reply_to=ReplyTarget(resident="npc001", event_id="abc", content="元投稿"),
+        )
+        json_repo.add(create_entry())
+        json_repo.add(reply)
+        json_repo.approve(reply.id)
+
+        repo = SqliteQueueRepository(tmp_path)
+        imported = repo.import_from_json()
+
+        assert imported[QueueStatus.PENDING.value] == 1
+        assert imported[QueueStatus.APPROVED.value] == 1
+        approved = repo.get_all(QueueStatus.APPROVED)
+        assert approved[0].reply_to is not None
+        assert approved[0].reply_to.event_id == "abc"
+
+    def test_import_twice_does_not_duplicate(self, tmp_path: Path) -> None:
+        """再実行しても重複しない"""
+        QueueRepository(tmp_path).add(create_entry())
+
+        repo = SqliteQueueRepository(tmp_path)
+        repo.import_from_json()
+        repo.import_from_json()
+
+        assert repo.count(QueueStatus.PENDING) == 1
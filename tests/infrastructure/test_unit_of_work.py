@@ -0,0 +1,69 @@
+"""UnitOfWork のユニットテスト"""
+
+import json
+from pathlib import Path
+
+from src.domain import NpcMemory
+from src.infrastructure import MemoryRepository, RelationshipRepository, StateRepository, UnitOfWork
+
+
+class TestUnitOfWork:
+    """読み込みキャッシュと遅延書き込みのテスト"""
+
+    def test_load_returns_same_object(self, tmp_path: Path) -> None:
+        """同じtick中は同じオブジェクトを返し、ファイルは1回しか読まない"""
+        uow = UnitOfWork()
+        repo = MemoryRepository(tmp_path, uow)
+
+        first = repo.load(1)
+        second = repo.load(1)
+
+        assert first is second
+        assert uow.loads == 1
+        assert uow.hits == 1
+
+    def test_save_is_deferred_until_commit(self, tmp_path: Path) -> None:
+        """saveしてもcommitまでファイルは書かれない"""
+        uow = UnitOfWork()
+        repo = MemoryRepository(tmp_path, uow)
+        memory = repo.load(1)
+        memory.add_short_term("一回目")
+        repo.save(memory)
+        memory.add_short_term("二回目")
+        repo.save(memory)
+
+        memory_file = tmp_path / "npc001" / "memory.json"
+        assert not memory_file.exists()
+
+        assert uow.commit() == 1
+        assert uow.dirty_count == 0
+        saved = NpcMemory.model_validate(json.loads(memory_file.read_text(encoding="utf-8")))
+        assert len(saved.short_term) == 2
+
+    def test_affinity_saves_are_flushed_once(self, tmp_path: Path) -> None:
+        """何度保存しても書き出しはファイルごとに1回"""
+        uow = UnitOfWork()
+        repo = RelationshipRepository(tmp_path, uow)
+        for value in (0.1, 0.2, 0.3):
+            affinity = repo.load_affinity("npc001")
+            affinity.targets["npc002"] = value
+            repo.save_affinity(affinity)
+
+        assert uow.commit() == 1
+        assert RelationshipRepository(tmp_path).load_affinity("npc001").targets["npc002"] == 0.3
+
+    def test_unsaved_state_is_visible_in_same_tick(self, tmp_path: Path) -> None:
+        """未書き出しの新規stateも同じtick中は読める"""
+        uow = UnitOfWork()
+        repo = StateRepository(tmp_path, uow)
+        repo.save(repo.create_initial(1))
+
+        assert repo.load(1) is not None
+        assert StateRepository(tmp_path).load(1) is None
+
+    def test_without_unit_of_work_saves_immediately(self, tmp_path: Path) -> None:
+        """ユニットオブワークなしなら従来どおり即時保存"""
+        repo = StateRepository(tmp_path)
+        repo.save(repo.create_initial(1))
+
+        assert StateRepository(tmp_path).load(1) is not None